@@ -0,0 +1,211 @@
+"""
+In-process background jobs for long-running admin operations (CSV import, bulk update-pricing,
+job performance sync). Endpoints submit work and return 202 with a job id; clients poll
+GET /api/jobs/{id} for status and progress.
+
+Jobs run on a thread pool of BACKGROUND_JOB_WORKERS threads (default 2); there is no external
+broker. Records live in memory (the last BACKGROUND_JOB_HISTORY finished jobs, default 200) and
+are mirrored best-effort to public.background_jobs so status survives a restart and can be read
+from any worker. A job left queued/running by a process that died stays that way in the table;
+finished_at is never set for it.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from app.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKGROUND_JOB_WORKERS = 2
+DEFAULT_BACKGROUND_JOB_HISTORY = 200
+# Progress is written to Supabase at most this often per job (status changes are always written).
+_PROGRESS_PERSIST_INTERVAL_SECONDS = 1.0
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+_FINISHED = frozenset({JOB_SUCCEEDED, JOB_FAILED})
+
+# progress(done, total=None, message=None)
+ProgressCallback = Callable[..., None]
+
+
+@dataclass
+class JobRecord:
+    id: str
+    kind: str
+    status: str = JOB_QUEUED
+    progress: dict[str, Any] = field(default_factory=lambda: {"done": 0, "total": None, "message": None})
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: str = field(default_factory=lambda: _now_iso())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    if raw:
+        try:
+            return max(minimum, int(raw))
+        except ValueError:
+            logger.warning("Invalid %s=%r; using default.", name, raw)
+    return default
+
+
+_jobs: "OrderedDict[str, JobRecord]" = OrderedDict()
+_jobs_lock = threading.Lock()
+_job_done: dict[str, threading.Event] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = _env_int("BACKGROUND_JOB_WORKERS", DEFAULT_BACKGROUND_JOB_WORKERS, 1)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="background-job")
+        return _executor
+
+
+def shutdown_background_jobs() -> None:
+    """Stop accepting work; running jobs finish on their threads. Called on app shutdown."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _persist(record: JobRecord) -> None:
+    """Mirror the record to public.background_jobs; failures are logged and otherwise ignored."""
+    row = record.to_dict()
+    row["updated_at"] = _now_iso()
+    try:
+        get_supabase().table("background_jobs").upsert(row, on_conflict="id").execute()
+    except Exception as e:
+        logger.warning("Could not persist background job %s (%s): %s", record.id, record.status, e)
+
+
+def _trim_history() -> None:
+    finished = [jid for jid, rec in _jobs.items() if rec.status in _FINISHED]
+    excess = len(finished) - _env_int("BACKGROUND_JOB_HISTORY", DEFAULT_BACKGROUND_JOB_HISTORY, 0)
+    for jid in finished[: max(0, excess)]:
+        _jobs.pop(jid, None)
+        _job_done.pop(jid, None)
+
+
+def submit_job(
+    kind: str,
+    fn: Callable[[ProgressCallback], dict[str, Any]],
+    created_by: Any = None,
+) -> JobRecord:
+    """
+    Queue fn(progress) on the job pool and return its (queued) record. fn returns the job result dict;
+    an exception marks the job failed with the exception message. A result with success=False is
+    still a succeeded job (the operation ran and reported its own errors).
+    """
+    record = JobRecord(id=str(uuid.uuid4()), kind=kind, created_by=str(created_by) if created_by else None)
+    with _jobs_lock:
+        _jobs[record.id] = record
+        _job_done[record.id] = threading.Event()
+    _persist(record)
+    _get_executor().submit(_run_job, record, fn)
+    return JobRecord(**record.to_dict())
+
+
+def _run_job(record: JobRecord, fn: Callable[[ProgressCallback], dict[str, Any]]) -> None:
+    last_persisted = [0.0]
+
+    def progress(done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        with _jobs_lock:
+            record.progress = {"done": done, "total": total, "message": message}
+        now = time.monotonic()
+        if now - last_persisted[0] >= _PROGRESS_PERSIST_INTERVAL_SECONDS:
+            last_persisted[0] = now
+            _persist(record)
+
+    with _jobs_lock:
+        record.status = JOB_RUNNING
+        record.started_at = _now_iso()
+    _persist(record)
+    last_persisted[0] = time.monotonic()
+    try:
+        result = fn(progress)
+        with _jobs_lock:
+            record.result = result
+            record.status = JOB_SUCCEEDED
+    except Exception as e:
+        logger.exception("Background job %s (%s) failed: %s", record.id, record.kind, e)
+        with _jobs_lock:
+            record.error = str(e) or e.__class__.__name__
+            record.status = JOB_FAILED
+    with _jobs_lock:
+        record.finished_at = _now_iso()
+        done_event = _job_done.get(record.id)
+        _trim_history()
+    _persist(record)
+    if done_event is not None:
+        done_event.set()
+
+
+def _load_persisted_job(job_id: str) -> Optional[dict[str, Any]]:
+    try:
+        resp = (
+            get_supabase()
+            .table("background_jobs")
+            .select("id, kind, status, progress, result, error, created_by, created_at, started_at, finished_at")
+            .eq("id", job_id)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        logger.warning("Could not read background job %s: %s", job_id, e)
+        return None
+    rows = resp.data or []
+    return dict(rows[0]) if rows else None
+
+
+def get_job(job_id: str) -> Optional[dict[str, Any]]:
+    """Current record for job_id: this process's copy if it has one, else the persisted row (None if unknown)."""
+    with _jobs_lock:
+        record = _jobs.get(job_id)
+        if record is not None:
+            return record.to_dict()
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None
+    return _load_persisted_job(job_id)
+
+
+def wait_for_job(job_id: str, timeout: Optional[float] = None) -> Optional[dict[str, Any]]:
+    """Block until a job submitted by this process finishes (or timeout); returns its record."""
+    with _jobs_lock:
+        done_event = _job_done.get(job_id)
+    if done_event is not None:
+        done_event.wait(timeout)
+    return get_job(job_id)
+
+
+def job_accepted_payload(record: JobRecord) -> dict[str, Any]:
+    """Body for a 202 response: the job id plus where to poll."""
+    return {"job_id": record.id, "kind": record.kind, "status": record.status, "status_url": f"/api/jobs/{record.id}"}
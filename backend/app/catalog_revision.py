@@ -0,0 +1,131 @@
+"""
+Catalog revision counter and conditional GET support for catalog endpoints
+(/api/products, /api/quick-quoter/catalog).
+
+The revision is bumped whenever catalog data is written from this process: update-pricing,
+CSV import (both via app.products.invalidate_product_catalog_index) and Quick Quoter repair
+type saves. Rendered catalog responses are cached per revision for CATALOG_INDEX_TTL_SECONDS
+(default 300), which also bounds how long a write made by another worker can go unseen.
+
+ETags are a hash of the response body, so they stay correct across workers whose revision
+counters differ; Last-Modified is when this worker last saw the body change.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Hashable, Optional
+
+from app.http_cache import etag_matches
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_CACHE_TTL_SECONDS = 300.0
+_MAX_RENDERED = 64
+_MAX_LAST_SEEN = 256
+
+
+@dataclass(frozen=True)
+class RenderedCatalog:
+    body: bytes
+    etag: str
+    last_modified: datetime
+    rendered_at: float
+
+
+_revision = 1
+_revision_lock = threading.Lock()
+_rendered: "OrderedDict[tuple, RenderedCatalog]" = OrderedDict()
+# key (without revision) -> (etag, last_modified) of the last body rendered for it
+_last_seen: "OrderedDict[Hashable, tuple[str, datetime]]" = OrderedDict()
+_process_started_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def catalog_cache_ttl_seconds() -> float:
+    """CATALOG_INDEX_TTL_SECONDS (default 300; 0 disables catalog caching)."""
+    raw = os.environ.get("CATALOG_INDEX_TTL_SECONDS", "").strip()
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            logger.warning("Invalid CATALOG_INDEX_TTL_SECONDS=%r; using default.", raw)
+    return DEFAULT_CATALOG_CACHE_TTL_SECONDS
+
+
+def get_catalog_revision() -> int:
+    with _revision_lock:
+        return _revision
+
+
+def bump_catalog_revision() -> int:
+    """Mark catalog data as changed; cached renders are dropped. Returns the new revision."""
+    global _revision
+    with _revision_lock:
+        _revision += 1
+        _rendered.clear()
+        return _revision
+
+
+def render_catalog(key: Hashable, build_payload: Callable[[], Any]) -> RenderedCatalog:
+    """
+    Serialized body + validators for one catalog response. key identifies the response variant
+    (endpoint and query parameters); build_payload is only called on a cache miss.
+    """
+    ttl = catalog_cache_ttl_seconds()
+    now = time.monotonic()
+    with _revision_lock:
+        revision = _revision
+        cached = _rendered.get((revision, key))
+        if cached is not None and ttl > 0 and now - cached.rendered_at < ttl:
+            _rendered.move_to_end((revision, key))
+            return cached
+
+    body = json.dumps(build_payload(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    with _revision_lock:
+        seen = _last_seen.get(key)
+        if seen is not None and seen[0] == etag:
+            last_modified = seen[1]
+        else:
+            last_modified = datetime.now(timezone.utc).replace(microsecond=0) if seen else _process_started_at
+            _last_seen[key] = (etag, last_modified)
+        _last_seen.move_to_end(key)
+        while len(_last_seen) > _MAX_LAST_SEEN:
+            _last_seen.popitem(last=False)
+        rendered = RenderedCatalog(body=body, etag=etag, last_modified=last_modified, rendered_at=time.monotonic())
+        # Only keep it if no write happened while building (the next request renders fresh data).
+        if ttl > 0 and revision == _revision:
+            _rendered[(revision, key)] = rendered
+            while len(_rendered) > _MAX_RENDERED:
+                _rendered.popitem(last=False)
+    return rendered
+
+
+def is_not_modified(rendered: RenderedCatalog, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """RFC 9110 precedence: If-None-Match decides when present, else If-Modified-Since."""
+    if if_none_match:
+        return etag_matches(if_none_match, rendered.etag)
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return rendered.last_modified <= since
+    return False
+
+
+def catalog_headers(rendered: RenderedCatalog) -> dict[str, str]:
+    """Validators plus no-cache, so browsers keep the body but revalidate on every load."""
+    return {
+        "ETag": rendered.etag,
+        "Last-Modified": format_datetime(rendered.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
@@ -1,12 +1,19 @@
 """
 CSV product import. Parses cost/price CSV, derives profile, and upserts into public.products.
+
+The upload is parsed incrementally and handled in chunks of CSV_IMPORT_CHUNK_SIZE rows
+(default 250): one read of the stored rows per chunk, a field-by-field diff, and one multi-row
+upsert of only the rows that changed. Re-importing the same file writes nothing.
 """
 import csv
 import logging
+import os
 import re
 from io import StringIO
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
+from app.pricing import invalidate_pricing_cache
+from app.products import invalidate_product_catalog_index
 from app.supabase_client import get_supabase
 
 logger = logging.getLogger(__name__)
@@ -116,21 +123,19 @@ def _derive_category(name: str) -> str:
     return DEFAULT_CATEGORY
 
 
-def _parse_csv_rows(content: str) -> Tuple[List[dict], List[str]]:
+def _iter_csv_rows(lines: Iterable[str], errors: List[str]) -> Iterator[dict]:
     """
-    Parse CSV content. Returns (rows, errors).
-    Rows are dicts with keys: item_number, servicem8_material_uuid, name, cost_price, price_exc_gst, profile, category.
+    Parse CSV lines one row at a time, appending problems to errors.
+    Yields dicts with keys: item_number, servicem8_material_uuid, name, cost_price, price_exc_gst, profile, category.
     """
-    errors = []
-    rows = []
     try:
-        reader = csv.DictReader(StringIO(content))
+        reader = csv.DictReader(lines)
         raw_headers = reader.fieldnames or []
         headers = [h.strip() for h in raw_headers] if raw_headers else []
         missing = REQUIRED_HEADERS - frozenset(headers)
         if missing:
             errors.append(f"Missing required columns: {', '.join(sorted(missing))}")
-            return rows, errors
+            return
 
         for i, raw_row in enumerate(reader):
             row_num = i + 2  # 1-based, skip header
@@ -153,7 +158,7 @@ def _parse_csv_rows(content: str) -> Tuple[List[dict], List[str]]:
                     continue
                 profile = _derive_profile(item_number, name)
                 category = _derive_category(name)
-                rows.append({
+                yield {
                     "item_number": item_number,
                     "servicem8_material_uuid": (raw_row.get("Servicem8 Material_uuid") or "").strip() or None,
                     "name": name,
@@ -161,60 +166,199 @@ def _parse_csv_rows(content: str) -> Tuple[List[dict], List[str]]:
                     "price_exc_gst": price,
                     "profile": profile,
                     "category": category,
-                })
+                }
             except Exception as e:
                 errors.append(f"Row {row_num}: {e}")
     except csv.Error as e:
         errors.append(f"CSV parse error: {e}")
-    return rows, errors
 
 
-def import_products_from_csv(content: str) -> dict:
+def _parse_csv_rows(content: str) -> Tuple[List[dict], List[str]]:
     """
-    Parse CSV and upsert products into Supabase.
-    Returns {success: bool, imported: int, updated: int, failed: int, errors: list[str]}.
+    Parse CSV content. Returns (rows, errors).
+    Rows are dicts with keys: item_number, servicem8_material_uuid, name, cost_price, price_exc_gst, profile, category.
     """
-    rows, parse_errors = _parse_csv_rows(content)
-    if parse_errors and not rows:
-        return {"success": False, "imported": 0, "updated": 0, "failed": 0, "errors": parse_errors}
+    errors: List[str] = []
+    rows = list(_iter_csv_rows(StringIO(content), errors))
+    return rows, errors
+
+
+DEFAULT_CSV_IMPORT_CHUNK_SIZE = 250
+# Columns written by the import (besides id), compared field by field against the stored row.
+# Only rows where one of these differs are written; the rest are counted as unchanged.
+_PRODUCT_RECORD_FIELDS = (
+    "name", "category", "thumbnail_url", "diagram_url", "cost_price", "price_exc_gst",
+    "item_number", "servicem8_material_uuid", "profile", "active",
+)
 
-    errors = list(parse_errors)
-    imported = 0
-    updated = 0
-    failed = 0
 
-    supabase = get_supabase()
-    for r in rows:
+def _csv_import_chunk_size() -> int:
+    raw = os.environ.get("CSV_IMPORT_CHUNK_SIZE", "").strip()
+    if raw:
         try:
-            # Use item_number as id for CSV products (no collision with gutter, downpipe, etc.)
-            diagram_path = _diagram_url_for_product(r["item_number"])
-            record = {
-                "id": r["item_number"],
-                "name": r["name"],
-                "category": r["category"],
-                "thumbnail_url": diagram_path,
-                "diagram_url": diagram_path,
-                "cost_price": r["cost_price"],
-                "price_exc_gst": r["price_exc_gst"],
-                "item_number": r["item_number"],
-                "servicem8_material_uuid": r["servicem8_material_uuid"],
-                "profile": r["profile"],
-                "active": True,
-            }
-            # Upsert on id (item_number)
-            resp = supabase.table("products").upsert(record, on_conflict="id").execute()
-            if resp.data and len(resp.data) > 0:
-                # Upsert returns the row; we can't easily tell insert vs update from response
-                imported += 1
-        except Exception as e:
-            failed += 1
-            errors.append(f"{r['item_number']}: {e}")
-            logger.warning("Failed to upsert product %s: %s", r["item_number"], e)
+            return max(1, int(raw))
+        except ValueError:
+            logger.warning("Invalid CSV_IMPORT_CHUNK_SIZE=%r; using default.", raw)
+    return DEFAULT_CSV_IMPORT_CHUNK_SIZE
+
 
+def _product_record(r: dict) -> dict:
+    # Use item_number as id for CSV products (no collision with gutter, downpipe, etc.)
+    diagram_path = _diagram_url_for_product(r["item_number"])
     return {
+        "id": r["item_number"],
+        "name": r["name"],
+        "category": r["category"],
+        "thumbnail_url": diagram_path,
+        "diagram_url": diagram_path,
+        "cost_price": r["cost_price"],
+        "price_exc_gst": r["price_exc_gst"],
+        "item_number": r["item_number"],
+        "servicem8_material_uuid": r["servicem8_material_uuid"],
+        "profile": r["profile"],
+        "active": True,
+    }
+
+
+def _same_value(stored: Any, incoming: Any) -> bool:
+    if isinstance(incoming, float) and stored is not None:
+        try:
+            return float(stored) == incoming
+        except (TypeError, ValueError):
+            return False
+    return stored == incoming
+
+
+def _changed_fields(existing: dict, record: dict) -> dict:
+    """{field: {old, new}} for every written field whose stored value differs."""
+    return {
+        f: {"old": existing.get(f), "new": record[f]}
+        for f in _PRODUCT_RECORD_FIELDS
+        if not _same_value(existing.get(f), record[f])
+    }
+
+
+def _fetch_existing_products(supabase: Any, ids: List[str]) -> dict:
+    resp = (
+        supabase.table("products")
+        .select("id, " + ", ".join(_PRODUCT_RECORD_FIELDS))
+        .in_("id", ids)
+        .execute()
+    )
+    return {str(row["id"]): row for row in (resp.data or []) if row.get("id")}
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_products_from_csv(
+    content: Union[str, Iterable[str]],
+    dry_run: bool = False,
+    progress: Optional[Callable[..., None]] = None,
+) -> dict:
+    """
+    Parse CSV and upsert the products that differ from public.products, streaming rows in chunks.
+    content is the CSV text or any iterable of lines (e.g. a text stream over the upload).
+    Returns {success, imported, inserted, updated, unchanged, failed, errors}: imported = valid rows;
+    only inserted + updated rows are written. With dry_run=True nothing is written and the result
+    also has changes: [{id, action: insert|update, fields: {field: {old, new}}}].
+    progress, if given, is called with the number of rows handled after each chunk.
+    """
+    lines = StringIO(content) if isinstance(content, str) else content
+    errors: List[str] = []
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+    changes: Optional[List[dict]] = [] if dry_run else None
+
+    supabase = None
+    for chunk in _chunks(_iter_csv_rows(lines, errors), _csv_import_chunk_size()):
+        if supabase is None:
+            supabase = get_supabase()
+        # A repeated item number within one chunk keeps the last row (as sequential upserts did).
+        records = {r["item_number"]: _product_record(r) for r in chunk}
+        _import_chunk(supabase, list(records.values()), counts, errors, changes)
+        if progress is not None:
+            progress(sum(counts.values()))
+
+    if not dry_run and (counts["inserted"] or counts["updated"]):
+        invalidate_pricing_cache()
+        invalidate_product_catalog_index()
+
+    result = {
         "success": len(errors) == 0,
-        "imported": imported,
-        "updated": 0,  # Supabase upsert doesn't distinguish; we count all as imported
-        "failed": failed,
+        "imported": counts["inserted"] + counts["updated"] + counts["unchanged"],
+        **counts,
         "errors": errors,
     }
+    if dry_run:
+        result["dry_run"] = True
+        result["changes"] = changes
+    return result
+
+
+def _import_chunk(
+    supabase: Any,
+    records: List[dict],
+    counts: dict,
+    errors: List[str],
+    changes: Optional[List[dict]],
+) -> None:
+    """
+    Diff one chunk against the stored rows and upsert the changed ones in one request (row by row
+    if that fails). changes is a list only for dry runs, which collect the change set instead of writing.
+    """
+    ids = [rec["id"] for rec in records]
+    try:
+        existing = _fetch_existing_products(supabase, ids)
+    except Exception as e:
+        if changes is not None:
+            raise
+        logger.warning("Failed to read existing products for CSV chunk; writing all as updated: %s", e)
+        existing = {pid: {} for pid in ids}
+
+    to_write: List[Tuple[dict, str]] = []
+    for rec in records:
+        stored = existing.get(rec["id"])
+        if stored is None:
+            to_write.append((rec, "inserted"))
+            if changes is not None:
+                changes.append({"id": rec["id"], "action": "insert", "fields": _changed_fields({}, rec)})
+            continue
+        diff = _changed_fields(stored, rec)
+        if not diff:
+            counts["unchanged"] += 1
+            continue
+        to_write.append((rec, "updated"))
+        if changes is not None:
+            changes.append({"id": rec["id"], "action": "update", "fields": diff})
+
+    if not to_write:
+        return
+    if changes is not None:
+        for _, outcome in to_write:
+            counts[outcome] += 1
+        return
+
+    try:
+        supabase.table("products").upsert([rec for rec, _ in to_write], on_conflict="id").execute()
+        for _, outcome in to_write:
+            counts[outcome] += 1
+        return
+    except Exception as e:
+        logger.warning("Chunk upsert of %d products failed; retrying row by row: %s", len(to_write), e)
+
+    for rec, outcome in to_write:
+        try:
+            supabase.table("products").upsert(rec, on_conflict="id").execute()
+            counts[outcome] += 1
+        except Exception as e:
+            counts["failed"] += 1
+            errors.append(f"{rec['id']}: {e}")
+            logger.warning("Failed to upsert product %s: %s", rec["id"], e)
@@ -9,10 +9,16 @@ Domain rules (billing):
 
 Rules are configurable via optional rules_config and default to the existing constants.
 Inferred quantities are merged with manually placed items (summed by assetId).
+
+rules_config is compiled once into an immutable CompiledAccessoryRules (memoised by its
+normalised values) and asset IDs are classified once into a memoised asset-kind table,
+so expanding large canvases does no per-element normalisation or regex work.
 """
 import math
 import re
-from typing import Any, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Tuple, Union
 
 # Gutter pattern: GUT-{SC|CL}-MAR-{1.5|3|5}M
 GUTTER_PATTERN = re.compile(r"^GUT-(SC|CL)-MAR-(\d+(?:\.\d+)?)M$", re.IGNORECASE)
@@ -119,65 +125,12 @@ def _parse_gutter(asset_id: str) -> Optional[Tuple[str, float]]:
     return (profile, length_m)
 
 
-def _bracket_product_id(profile: str, rules: dict[str, Any]) -> str:
-    """Map profile code to bracket product id (rule-driven with fallback)."""
-    if profile == "SC":
-        return str(rules["bracket_product_id_sc"])
-    if profile == "CL":
-        return str(rules["bracket_product_id_cl"])
-    return f"BRK-{profile}-MAR"
-
-
-def _saddle_clip_product_id(size: str, rules: dict[str, Any]) -> str:
-    if size == "80":
-        return str(rules["saddle_clip_product_id_80"])
-    return str(rules["saddle_clip_product_id_65"])
-
-
-def _adjustable_clip_product_id(size: str, rules: dict[str, Any]) -> str:
-    if size == "80":
-        return str(rules["adjustable_clip_product_id_80"])
-    return str(rules["adjustable_clip_product_id_65"])
-
-
 def _is_dropper(asset_id: str) -> bool:
     """True if asset is a dropper (id 'dropper' or starts with 'DRP-')."""
     a = (asset_id or "").strip().upper()
     return a == "DROPPER" or a.startswith("DRP-")
 
 
-def _is_saddle_clip(asset_id: str, rules: Optional[dict[str, Any]] = None) -> bool:
-    """True if asset is a saddle clip (SCL-*, or configured saddle product id)."""
-    a = (asset_id or "").strip().upper()
-    if a.startswith("SCL-"):
-        return True
-    if isinstance(rules, dict):
-        mapped = {
-            str(rules.get("saddle_clip_product_id_65") or "").strip().upper(),
-            str(rules.get("saddle_clip_product_id_80") or "").strip().upper(),
-        }
-        mapped.discard("")
-        if a in mapped:
-            return True
-    return False
-
-
-def _is_adjustable_clip(asset_id: str, rules: Optional[dict[str, Any]] = None) -> bool:
-    """True if asset is an adjustable clip (ACL-*, or configured adjustable product id)."""
-    a = (asset_id or "").strip().upper()
-    if a.startswith("ACL-"):
-        return True
-    if isinstance(rules, dict):
-        mapped = {
-            str(rules.get("adjustable_clip_product_id_65") or "").strip().upper(),
-            str(rules.get("adjustable_clip_product_id_80") or "").strip().upper(),
-        }
-        mapped.discard("")
-        if a in mapped:
-            return True
-    return False
-
-
 def _is_downpipe(asset_id: str) -> bool:
     """True if asset is a downpipe (DP-65-*, DP-80-*, DPJ-65, DPJ-80, etc.)."""
     a = (asset_id or "").strip().upper()
@@ -200,18 +153,134 @@ def _is_downpipe_main(asset_id: str) -> bool:
     return (a.startswith("DP-65-") or a.startswith("DP-80-")) and not a.startswith("DPJ-")
 
 
-def _use_adjustable_clips(elements: list[dict[str, Any]], rules: dict[str, Any]) -> bool:
-    mode = str(rules.get("clip_selection_mode") or "auto_by_acl_presence").strip().lower()
-    if mode == "force_adjustable":
-        return True
-    if mode == "force_saddle":
-        return False
-    return any(_is_adjustable_clip(e.get("assetId", ""), rules) for e in elements)
+@dataclass(frozen=True)
+class CompiledAccessoryRules:
+    """Normalised, immutable accessory rules. Build with compile_accessory_rules()."""
+
+    bracket_spacing_mm: int
+    clip_spacing_mm: int
+    screws_per_bracket: int
+    screws_per_dropper: int
+    screws_per_saddle_clip: int
+    screws_per_adjustable_clip: int
+    screw_product_id: str
+    bracket_product_id_sc: str
+    bracket_product_id_cl: str
+    saddle_clip_product_id_65: str
+    saddle_clip_product_id_80: str
+    adjustable_clip_product_id_65: str
+    adjustable_clip_product_id_80: str
+    clip_selection_mode: str
+    # Upper-cased configured clip IDs, used as part of the asset-kind memo key.
+    saddle_clip_ids: frozenset[str]
+    adjustable_clip_ids: frozenset[str]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Plain rules dict (same keys as DEFAULT_GUTTER_ACCESSORY_RULES)."""
+        return {key: getattr(self, key) for key in DEFAULT_GUTTER_ACCESSORY_RULES}
+
+
+def _clip_id_set(*product_ids: str) -> frozenset[str]:
+    return frozenset(pid.strip().upper() for pid in product_ids if pid and pid.strip())
+
+
+@lru_cache(maxsize=32)
+def _compile_normalized_rules(items: tuple[tuple[str, Any], ...]) -> CompiledAccessoryRules:
+    rules = dict(items)
+    return CompiledAccessoryRules(
+        bracket_spacing_mm=int(rules["bracket_spacing_mm"]),
+        clip_spacing_mm=int(rules["clip_spacing_mm"]),
+        screws_per_bracket=int(rules["screws_per_bracket"]),
+        screws_per_dropper=int(rules["screws_per_dropper"]),
+        screws_per_saddle_clip=int(rules["screws_per_saddle_clip"]),
+        screws_per_adjustable_clip=int(rules["screws_per_adjustable_clip"]),
+        screw_product_id=str(rules["screw_product_id"]),
+        bracket_product_id_sc=str(rules["bracket_product_id_sc"]),
+        bracket_product_id_cl=str(rules["bracket_product_id_cl"]),
+        saddle_clip_product_id_65=str(rules["saddle_clip_product_id_65"]),
+        saddle_clip_product_id_80=str(rules["saddle_clip_product_id_80"]),
+        adjustable_clip_product_id_65=str(rules["adjustable_clip_product_id_65"]),
+        adjustable_clip_product_id_80=str(rules["adjustable_clip_product_id_80"]),
+        clip_selection_mode=str(rules["clip_selection_mode"]),
+        saddle_clip_ids=_clip_id_set(rules["saddle_clip_product_id_65"], rules["saddle_clip_product_id_80"]),
+        adjustable_clip_ids=_clip_id_set(rules["adjustable_clip_product_id_65"], rules["adjustable_clip_product_id_80"]),
+    )
+
+
+def compile_accessory_rules(
+    rules_config: Union[None, dict[str, Any], CompiledAccessoryRules] = None,
+) -> CompiledAccessoryRules:
+    """
+    Normalise rules_config (falling back to defaults per field) into an immutable rule object.
+    Identical normalised rule sets share one compiled instance; compiled rules pass through as-is.
+    """
+    if isinstance(rules_config, CompiledAccessoryRules):
+        return rules_config
+    rules = _normalize_rules_config(rules_config)
+    return _compile_normalized_rules(tuple(sorted(rules.items())))
+
+
+class AssetKind(NamedTuple):
+    """Classification of one asset ID under a given set of configured clip IDs."""
+
+    kind: str  # gutter | downpipe | dropper | saddle_clip | adjustable_clip | other
+    gutter_profile: Optional[str]
+    gutter_length_m: Optional[float]
+    clip_size: str  # downpipe clip size ('65' default)
+    is_downpipe_main: bool
+    is_adjustable_clip: bool
+
+
+@lru_cache(maxsize=4096)
+def _classify_asset(
+    asset_id: str,
+    saddle_clip_ids: frozenset[str],
+    adjustable_clip_ids: frozenset[str],
+) -> AssetKind:
+    upper = (asset_id or "").strip().upper()
+    is_adjustable = upper.startswith("ACL-") or upper in adjustable_clip_ids
+    clip_size = _downpipe_clip_size(asset_id) or "65"
+    parsed = _parse_gutter(asset_id)
+    if parsed:
+        kind = "gutter"
+    elif _is_downpipe(asset_id):
+        kind = "downpipe"
+    elif _is_dropper(asset_id):
+        kind = "dropper"
+    elif upper.startswith("SCL-") or upper in saddle_clip_ids:
+        kind = "saddle_clip"
+    elif is_adjustable:
+        kind = "adjustable_clip"
+    else:
+        kind = "other"
+    return AssetKind(
+        kind=kind,
+        gutter_profile=parsed[0] if parsed else None,
+        gutter_length_m=parsed[1] if parsed else None,
+        clip_size=clip_size,
+        is_downpipe_main=_is_downpipe_main(asset_id),
+        is_adjustable_clip=is_adjustable,
+    )
+
+
+def classify_asset(asset_id: str, rules: Optional[CompiledAccessoryRules] = None) -> AssetKind:
+    """Memoised asset-kind lookup for asset_id under the given (or default) rules."""
+    compiled = rules or compile_accessory_rules()
+    return _classify_asset(asset_id, compiled.saddle_clip_ids, compiled.adjustable_clip_ids)
+
+
+def _to_length_mm(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def expand_elements_with_gutter_accessories(
     elements: list[dict],
-    rules_config: Optional[dict[str, Any]] = None,
+    rules_config: Union[None, dict[str, Any], CompiledAccessoryRules] = None,
 ) -> list[dict]:
     """
     Expand elements to include inferred brackets, screws, and downpipe clips.
@@ -226,86 +295,87 @@ def expand_elements_with_gutter_accessories(
       sub-pieces without length_mm add no clips when that size already has measured length.
 
     elements: list of {assetId, quantity, length_mm?: number}
+    rules_config: raw rules dict or a CompiledAccessoryRules from compile_accessory_rules().
     Returns: merged list with same shape, quantities summed by assetId.
     """
-    rules = _normalize_rules_config(rules_config)
-    by_id: dict[str, float] = {}
-    has_adjustable_clip = _use_adjustable_clips(elements, rules)
+    rules = compile_accessory_rules(rules_config)
+    saddle_ids = rules.saddle_clip_ids
+    adjustable_ids = rules.adjustable_clip_ids
 
+    # One classification pass: asset kinds come from the memo table; collect what the
+    # accumulation pass needs (clip mode inputs, downpipe sizes with measured length).
+    prepared: list[tuple[str, AssetKind, float, Optional[float]]] = []
     sizes_with_length: set[str] = set()
-    for e in elements:
-        if _is_downpipe_main(e.get("assetId", "")):
-            lm = e.get("length_mm")
-            if lm is not None:
-                try:
-                    if float(lm) > 0:
-                        size = _downpipe_clip_size(e.get("assetId", "")) or "65"
-                        sizes_with_length.add(size)
-                except (TypeError, ValueError):
-                    pass
-
+    any_adjustable = False
     for e in elements:
         asset_id = e.get("assetId", "")
-        qty = float(e.get("quantity", 0))
+        kind = _classify_asset(asset_id, saddle_ids, adjustable_ids)
+        length_mm = _to_length_mm(e.get("length_mm"))
+        if kind.is_adjustable_clip:
+            any_adjustable = True
+        if kind.is_downpipe_main and length_mm is not None and length_mm > 0:
+            sizes_with_length.add(kind.clip_size)
+        prepared.append((asset_id, kind, e.get("quantity", 0), length_mm))
+
+    if rules.clip_selection_mode == "force_adjustable":
+        has_adjustable_clip = True
+    elif rules.clip_selection_mode == "force_saddle":
+        has_adjustable_clip = False
+    else:
+        has_adjustable_clip = any_adjustable
+
+    screw_product_id = rules.screw_product_id
+    by_id: dict[str, float] = {}
+    for asset_id, kind, raw_qty, length_mm_arg in prepared:
+        qty = float(raw_qty)
         if qty <= 0:
             continue
 
-        length_mm_arg = e.get("length_mm")
-        if length_mm_arg is not None:
-            try:
-                length_mm_arg = float(length_mm_arg)
-            except (TypeError, ValueError):
-                length_mm_arg = None
-
-        parsed = _parse_gutter(asset_id)
-        if parsed:
-            profile, length_m = parsed
+        if kind.kind == "gutter":
             if length_mm_arg is not None and length_mm_arg >= 0:
                 total_mm = length_mm_arg
             else:
-                total_mm = length_m * 1000 * qty
-
-            bracket_spacing_mm = int(rules["bracket_spacing_mm"])
-            brackets_total = 1 + int(total_mm // bracket_spacing_mm)
-            screws_total = brackets_total * int(rules["screws_per_bracket"])
-            bracket_id = _bracket_product_id(profile, rules)
-            screw_product_id = str(rules["screw_product_id"])
+                total_mm = kind.gutter_length_m * 1000 * qty
+
+            brackets_total = 1 + int(total_mm // rules.bracket_spacing_mm)
+            screws_total = brackets_total * rules.screws_per_bracket
+            if kind.gutter_profile == "SC":
+                bracket_id = rules.bracket_product_id_sc
+            elif kind.gutter_profile == "CL":
+                bracket_id = rules.bracket_product_id_cl
+            else:
+                bracket_id = f"BRK-{kind.gutter_profile}-MAR"
 
             by_id[asset_id] = by_id.get(asset_id, 0) + qty
             by_id[bracket_id] = by_id.get(bracket_id, 0) + brackets_total
             by_id[screw_product_id] = by_id.get(screw_product_id, 0) + screws_total
-        elif _is_downpipe(asset_id):
+        elif kind.kind == "downpipe":
             by_id[asset_id] = by_id.get(asset_id, 0) + qty
-            size = _downpipe_clip_size(asset_id) or "65"
+            size = kind.clip_size
 
             if has_adjustable_clip:
-                clip_id = _adjustable_clip_product_id(size, rules)
-                screws_per_clip = int(rules["screws_per_adjustable_clip"])
+                clip_id = rules.adjustable_clip_product_id_80 if size == "80" else rules.adjustable_clip_product_id_65
+                screws_per_clip = rules.screws_per_adjustable_clip
             else:
-                clip_id = _saddle_clip_product_id(size, rules)
-                screws_per_clip = int(rules["screws_per_saddle_clip"])
+                clip_id = rules.saddle_clip_product_id_80 if size == "80" else rules.saddle_clip_product_id_65
+                screws_per_clip = rules.screws_per_saddle_clip
 
-            screw_product_id = str(rules["screw_product_id"])
-            clip_spacing_mm = int(rules["clip_spacing_mm"])
             if length_mm_arg is not None and length_mm_arg > 0:
-                clips = max(1, math.ceil(length_mm_arg / clip_spacing_mm))
+                clips = max(1, math.ceil(length_mm_arg / rules.clip_spacing_mm))
                 by_id[clip_id] = by_id.get(clip_id, 0) + clips
                 by_id[screw_product_id] = by_id.get(screw_product_id, 0) + clips * screws_per_clip
-            elif qty > 0 and size not in sizes_with_length:
+            elif size not in sizes_with_length:
                 by_id[clip_id] = by_id.get(clip_id, 0) + qty
                 by_id[screw_product_id] = by_id.get(screw_product_id, 0) + qty * screws_per_clip
-        elif _is_dropper(asset_id):
+        elif kind.kind == "dropper":
             by_id[asset_id] = by_id.get(asset_id, 0) + qty
-            screw_product_id = str(rules["screw_product_id"])
-            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + int(rules["screws_per_dropper"]) * qty
-        elif _is_saddle_clip(asset_id, rules):
+            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + rules.screws_per_dropper * qty
+        elif kind.kind == "saddle_clip":
             by_id[asset_id] = by_id.get(asset_id, 0) + qty
-            screw_product_id = str(rules["screw_product_id"])
-            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + int(rules["screws_per_saddle_clip"]) * qty
-        elif _is_adjustable_clip(asset_id, rules):
+            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + rules.screws_per_saddle_clip * qty
+        elif kind.kind == "adjustable_clip":
             by_id[asset_id] = by_id.get(asset_id, 0) + qty
-            screw_product_id = str(rules["screw_product_id"])
-            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + int(rules["screws_per_adjustable_clip"]) * qty
+            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + rules.screws_per_adjustable_clip * qty
         else:
             by_id[asset_id] = by_id.get(asset_id, 0) + qty
 
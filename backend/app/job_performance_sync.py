@@ -7,20 +7,29 @@ from JobActivity (filter zero-duration stubs); does not overwrite existing rows.
 payment_date from job for 60.7 period assignment.
 Token expiry: get_tokens() refreshes when < 5 min; on 401 we retry once with fresh tokens (59.20).
 """
+import hashlib
 import logging
-from datetime import datetime, timezone
-from typing import Any, Optional
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, Optional
 
 import httpx
 
-from app.quotes import get_active_quote_for_job
+from app.products import get_material_cost_map
+from app.quotes import get_active_quotes_for_jobs
 from app.supabase_client import get_supabase
 from app.servicem8 import (
+    get_http_client_stats,
     get_sync_user_id,
     get_tokens,
-    list_jobs,
+    iter_job_pages,
     list_job_materials,
+    list_job_materials_bulk,
     list_job_activities,
+    list_job_activities_bulk,
     get_staff_uuid_to_technician_id_map,
 )
 
@@ -50,43 +59,17 @@ def _parse_payment_date(job: dict[str, Any]) -> Optional[str]:
 
 
 def _compute_materials_cost_from_job_materials(
-    supabase: Any,
+    cost_by_material_uuid: dict[str, float],
     job_materials: list[dict[str, Any]],
 ) -> float:
     """
     Sum materials cost for job_performance.materials_cost (59.7). Prefer our DB cost per line
-    (product.cost_price * quantity) where product.servicem8_material_uuid matches; else use
-    ServiceM8 line cost (displayed_cost or cost). Returns 0 if job_materials is empty or on error.
+    (product.cost_price * quantity) where product.servicem8_material_uuid matches (the run's
+    material cost map, app.products.get_material_cost_map); else use ServiceM8 line cost
+    (displayed_cost or cost). Returns 0 if job_materials is empty.
     """
     if not job_materials:
         return 0.0
-    material_uuids = [
-        (m.get("material_uuid") or m.get("uuid") or "").strip()
-        for m in job_materials
-    ]
-    material_uuids = [u for u in material_uuids if u]
-    product_cost_by_uuid: dict[str, float] = {}
-    if material_uuids:
-        try:
-            resp = (
-                supabase.table("products")
-                .select("servicem8_material_uuid, cost_price")
-                .in_("servicem8_material_uuid", material_uuids)
-                .execute()
-            )
-            for r in (resp.data or []):
-                uuid_val = (r.get("servicem8_material_uuid") or "").strip()
-                cost = r.get("cost_price")
-                if uuid_val and cost is not None:
-                    try:
-                        product_cost_by_uuid[uuid_val] = float(cost)
-                    except (TypeError, ValueError):
-                        pass
-        except Exception as e:
-            logger.debug(
-                "Products lookup by servicem8_material_uuid failed (using ServiceM8 cost only): %s",
-                e,
-            )
     total = 0.0
     for m in job_materials:
         mat_uuid = (m.get("material_uuid") or m.get("uuid") or "").strip()
@@ -94,7 +77,7 @@ def _compute_materials_cost_from_job_materials(
             qty = float(m.get("quantity") or 0)
         except (TypeError, ValueError):
             qty = 0.0
-        our_cost = product_cost_by_uuid.get(mat_uuid) if mat_uuid else None
+        our_cost = cost_by_material_uuid.get(mat_uuid) if mat_uuid else None
         if our_cost is not None:
             total += our_cost * qty
         else:
@@ -166,16 +149,489 @@ SYNC_OWNED_COLUMNS = frozenset({
 })
 
 
-def run_sync() -> dict[str, Any]:
+DEFAULT_SYNC_CONCURRENCY = 8
+# From this many jobs per run, materials/activities are fetched with paged bulk listings
+# (a handful of calls) instead of two calls per job.
+DEFAULT_SYNC_BULK_FETCH_MIN_JOBS = 50
+_MAX_REPORTED_JOB_ERRORS = 20
+# Jobs per batch: each batch costs one job_performance select, one quotes select, one or two
+# job_performance upserts and one job_personnel select + insert, whatever its size.
+DEFAULT_SYNC_BATCH_SIZE = 200
+# Rows per multi-row job_performance upsert / job_personnel insert.
+_SYNC_DB_CHUNK_SIZE = 500
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            logger.warning("Invalid %s=%r; using default.", name, raw)
+    return default
+
+
+@dataclass
+class _SyncContext:
+    """State shared by the per-job workers of one run."""
+    supabase: Any
+    access_token: str
+    staff_uuid_to_technician_id: dict[str, Optional[str]]
+    # servicem8_material_uuid -> our cost_price, loaded once per run
+    material_costs: dict[str, float] = field(default_factory=dict)
+    # job_uuid -> records, when prefetched in bulk for the run (None: fetch per job)
+    materials_by_job: Optional[dict[str, list[dict[str, Any]]]] = None
+    activities_by_job: Optional[dict[str, list[dict[str, Any]]]] = None
+
+    def job_materials(self, job_uuid: str) -> list[dict[str, Any]]:
+        if self.materials_by_job is not None:
+            return self.materials_by_job.get(job_uuid, [])
+        return self.servicem8(list_job_materials, job_uuid)
+
+    def job_activities(self, job_uuid: str) -> list[dict[str, Any]]:
+        if self.activities_by_job is not None:
+            return self.activities_by_job.get(job_uuid, [])
+        return self.servicem8(list_job_activities, job_uuid)
+
+    def servicem8(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call a per-job ServiceM8 fetch; strict, so an error that survives make_api_request's retries
+        fails the job (and holds the watermark) instead of syncing it with missing data.
+        """
+        return fn(self.access_token, *args, strict=True)
+
+
+@dataclass
+class _PreparedJob:
+    """One job's job_performance row (and job_personnel inputs), built before the batch is written."""
+    job: dict[str, Any]
+    row: dict[str, Any]
+    job_uuid: str
+    quote_row: Optional[dict[str, Any]]
+    activities: list[dict[str, Any]]
+
+
+def _job_label(job: dict[str, Any]) -> str:
+    return (job.get("generated_job_id") or job.get("uuid") or "?").strip()
+
+
+def _prepare_job(
+    ctx: _SyncContext,
+    job: dict[str, Any],
+    existing_row: Optional[dict[str, Any]],
+    quote_row: Optional[dict[str, Any]],
+) -> Optional[_PreparedJob]:
+    """
+    Build the job_performance row for one ServiceM8 job from its prefetched existing row and active
+    quote plus its ServiceM8 materials (and activities for the job_personnel baseline).
+    Returns None when the job has no generated_job_id. Raises on failure; the pipeline records the
+    error and carries on with other jobs.
+    """
+    job_uuid = (job.get("uuid") or "").strip()
+    generated_job_id = (job.get("generated_job_id") or "").strip()
+    if not generated_job_id:
+        return None
+    quote_id: Optional[str] = str(quote_row["id"]) if quote_row and quote_row.get("id") else None
+    labour_hours = float(quote_row["labour_hours"]) if quote_row and quote_row.get("labour_hours") is not None else 0.0
+    quoted_labor_minutes = int(round(labour_hours * 60)) if quote_row else 0
+
+    # Merge with existing row if present (preserve admin-edited fields)
+    row = dict(existing_row) if existing_row else {}
+    # Overlay only sync-owned columns
+    row["servicem8_job_id"] = generated_job_id[:32]
+    row["servicem8_job_uuid"] = job_uuid if job_uuid else None
+    row["quote_id"] = quote_id
+    row["quoted_labor_minutes"] = quoted_labor_minutes
+    row["status"] = "draft"
+    # 59.7: invoiced_revenue_exc_gst from job total_invoice_amount (inc GST → ex-GST)
+    raw_revenue = job.get("total_invoice_amount")
+    if raw_revenue is None:
+        row["invoiced_revenue_exc_gst"] = 0
+    else:
+        try:
+            row["invoiced_revenue_exc_gst"] = round(float(raw_revenue) / GST_DIVISOR, 2)
+        except (TypeError, ValueError):
+            row["invoiced_revenue_exc_gst"] = 0
+    # 59.7: materials_cost from JobMaterials (our DB cost with ServiceM8 fallback)
+    if job_uuid:
+        job_materials = ctx.job_materials(job_uuid)
+        row["materials_cost"] = _compute_materials_cost_from_job_materials(ctx.material_costs, job_materials)
+    else:
+        row["materials_cost"] = 0
+    # 59.29: payment_date for 60.7 period assignment (cut-off 11:59 PM last Sunday)
+    row["payment_date"] = _parse_payment_date(job)
+    # Remove read-only / auto columns so Supabase doesn't complain
+    row.pop("created_at", None)
+    # 59.8: activities for the job_personnel baseline; a ServiceM8 error fails the job so the next run retries it
+    activities = ctx.job_activities(job_uuid) if job_uuid and ctx.staff_uuid_to_technician_id else []
+    return _PreparedJob(job=job, row=row, job_uuid=job_uuid, quote_row=quote_row, activities=activities)
+
+
+def _personnel_rows(
+    prepared: _PreparedJob,
+    job_performance_id: Any,
+    existing_tech_ids: set[str],
+    staff_uuid_to_technician_id: dict[str, Optional[str]],
+) -> list[dict[str, Any]]:
+    """
+    New job_personnel baseline rows for one job (59.8): onsite minutes per mapped staff from its
+    activities, then sellers from the quote's created_by / co_seller_user_id (59.26). Technicians
+    that already have a row for the job are skipped (existing rows are never overwritten).
+    """
+    seen = set(existing_tech_ids)
+    rows: list[dict[str, Any]] = []
+    for staff_uuid, total_minutes in _aggregate_activity_minutes_by_staff(prepared.activities).items():
+        technician_id = staff_uuid_to_technician_id.get(staff_uuid)
+        if not technician_id or technician_id in seen:
+            continue
+        rows.append(
+            {
+                "job_performance_id": job_performance_id,
+                "technician_id": technician_id,
+                "is_seller": False,
+                "is_executor": False,
+                "onsite_minutes": total_minutes,
+                "travel_shopping_minutes": 0,
+            }
+        )
+        seen.add(technician_id)
+    quote_row = prepared.quote_row or {}
+    for user_id in (quote_row.get("created_by"), quote_row.get("co_seller_user_id")):
+        tech_id_str = str(user_id).strip() if user_id else ""
+        if not tech_id_str or tech_id_str in seen:
+            continue
+        rows.append(
+            {
+                "job_performance_id": job_performance_id,
+                "technician_id": tech_id_str,
+                "is_seller": True,
+                "is_executor": False,
+                "onsite_minutes": 0,
+                "travel_shopping_minutes": 0,
+            }
+        )
+        seen.add(tech_id_str)
+    return rows
+
+
+def _upsert_job_performance_rows(
+    supabase: Any, prepared: list[_PreparedJob]
+) -> tuple[dict[str, Any], list[tuple[_PreparedJob, Exception]]]:
+    """
+    Upsert the batch's job_performance rows. Rows that already exist (full column set, with id) and
+    new rows (sync-owned columns only) go in separate calls so every multi-row payload has one
+    column set. A failed call is retried row by row to isolate the bad rows.
+    Returns (servicem8_job_id -> job_performance id, [(job, error)] for rows that failed).
+    """
+    ids: dict[str, Any] = {}
+    failed: list[tuple[_PreparedJob, Exception]] = []
+    existing = [p for p in prepared if "id" in p.row]
+    new = [p for p in prepared if "id" not in p.row]
+    for group in (existing, new):
+        for start in range(0, len(group), _SYNC_DB_CHUNK_SIZE):
+            chunk = group[start:start + _SYNC_DB_CHUNK_SIZE]
+            try:
+                resp = supabase.table("job_performance").upsert(
+                    [p.row for p in chunk], on_conflict="servicem8_job_id"
+                ).execute()
+                written = resp.data or []
+            except Exception as e:
+                logger.warning("job_performance_sync: chunk upsert of %d rows failed (%s); retrying per row", len(chunk), e)
+                written = []
+                for p in chunk:
+                    try:
+                        resp = supabase.table("job_performance").upsert(p.row, on_conflict="servicem8_job_id").execute()
+                        written.extend(resp.data or [])
+                    except Exception as row_e:
+                        failed.append((p, row_e))
+            for r in written:
+                if r.get("servicem8_job_id") and r.get("id") is not None:
+                    ids[str(r["servicem8_job_id"])] = r["id"]
+    return ids, failed
+
+
+def _insert_job_personnel(
+    ctx: _SyncContext, prepared: list[_PreparedJob], job_performance_ids: dict[str, Any]
+) -> None:
+    """
+    Baseline job_personnel for the batch: one select of existing rows, one multi-row insert.
+    Failures are logged and never fail the jobs (the baseline is re-attempted on the next sync
+    of the job, and only missing technicians are added).
+    """
+    targets = [
+        (p, job_performance_ids[p.row["servicem8_job_id"]])
+        for p in prepared
+        if p.row["servicem8_job_id"] in job_performance_ids and p.job_uuid
+    ]
+    if not targets or not ctx.staff_uuid_to_technician_id:
+        return
+    supabase = ctx.supabase
+    try:
+        resp = (
+            supabase.table("job_personnel")
+            .select("job_performance_id, technician_id")
+            .in_("job_performance_id", [jp_id for _, jp_id in targets])
+            .execute()
+        )
+    except Exception as e:
+        logger.warning("job_personnel baseline: could not read existing rows for %d jobs: %s", len(targets), e)
+        return
+    existing: dict[str, set[str]] = {}
+    for r in resp.data or []:
+        if r.get("technician_id"):
+            existing.setdefault(str(r["job_performance_id"]), set()).add(str(r["technician_id"]))
+    rows: list[dict[str, Any]] = []
+    for p, jp_id in targets:
+        rows.extend(_personnel_rows(p, jp_id, existing.get(str(jp_id), set()), ctx.staff_uuid_to_technician_id))
+    for start in range(0, len(rows), _SYNC_DB_CHUNK_SIZE):
+        chunk = rows[start:start + _SYNC_DB_CHUNK_SIZE]
+        try:
+            supabase.table("job_personnel").insert(chunk).execute()
+        except Exception as e:
+            logger.warning("job_personnel baseline: bulk insert of %d rows failed (%s); retrying per row", len(chunk), e)
+            for row in chunk:
+                try:
+                    supabase.table("job_personnel").insert(row).execute()
+                except Exception as row_e:
+                    logger.warning(
+                        "job_personnel insert failed for technician_id=%s, job_performance_id=%s: %s",
+                        row["technician_id"],
+                        row["job_performance_id"],
+                        row_e,
+                    )
+
+
+def _prefetch_batch(supabase: Any, jobs: list[dict[str, Any]]) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+    """Existing job_performance rows and active quotes for a batch: servicem8_job_id -> row, one query each."""
+    job_ids = sorted({(j.get("generated_job_id") or "").strip()[:32] for j in jobs} - {""})
+    if not job_ids:
+        return {}, {}
+    resp = supabase.table("job_performance").select("*").in_("servicem8_job_id", job_ids).execute()
+    existing = {str(r["servicem8_job_id"]): dict(r) for r in (resp.data or []) if r.get("servicem8_job_id")}
+    return existing, get_active_quotes_for_jobs(supabase, job_ids)
+
+
+def _sync_batch(
+    ctx: _SyncContext,
+    pool: ThreadPoolExecutor,
+    jobs: list[dict[str, Any]],
+    on_job_done: Callable[[], None],
+) -> tuple[int, list[dict[str, Any]], list[tuple[dict[str, Any], Exception]]]:
+    """
+    Sync one batch: prefetch its existing rows and quotes, build rows concurrently (ServiceM8 calls),
+    then write them set-based. Returns (rows upserted, jobs synced, [(job, error)] for failed jobs).
+    """
+    try:
+        existing_by_id, quotes_by_id = _prefetch_batch(ctx.supabase, jobs)
+    except Exception as e:
+        logger.warning("job_performance_sync: prefetch for a batch of %d jobs failed: %s", len(jobs), e)
+        for _ in jobs:
+            on_job_done()
+        return 0, [], [(job, e) for job in jobs]
+
+    def prepare(job: dict[str, Any]) -> Optional[_PreparedJob]:
+        job_id = (job.get("generated_job_id") or "").strip()[:32]
+        return _prepare_job(ctx, job, existing_by_id.get(job_id), quotes_by_id.get(job_id))
+
+    prepared: list[_PreparedJob] = []
+    synced: list[dict[str, Any]] = []
+    failed: list[tuple[dict[str, Any], Exception]] = []
+    futures = {pool.submit(prepare, job): job for job in jobs}
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            p = future.result()
+            if p is None:
+                synced.append(job)  # nothing to write (no generated_job_id)
+            else:
+                prepared.append(p)
+        except Exception as e:
+            failed.append((job, e))
+        on_job_done()
+
+    # Duplicate generated_job_ids in one batch: last one wins (a multi-row upsert cannot touch a row twice).
+    by_job_id = {p.row["servicem8_job_id"]: p for p in prepared}
+    for p in prepared:
+        if by_job_id[p.row["servicem8_job_id"]] is not p:
+            synced.append(p.job)
+    prepared = list(by_job_id.values())
+
+    ids, write_failures = _upsert_job_performance_rows(ctx.supabase, prepared)
+    failed.extend((p.job, e) for p, e in write_failures)
+    failed_rows = {id(p) for p, _ in write_failures}
+    synced.extend(p.job for p in prepared if id(p) not in failed_rows)
+    _insert_job_personnel(ctx, [p for p in prepared if id(p) not in failed_rows], ids)
+    return len(prepared) - len(write_failures), synced, failed
+
+
+SYNC_STATE_NAME = "job_performance"
+# Re-list jobs edited up to this long before the stored watermark (clock skew, edits mid-run);
+# their fingerprints are unchanged, so the overlap costs a listing, not a re-sync.
+_WATERMARK_OVERLAP = timedelta(minutes=10)
+_SERVICEM8_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_SYNC_STATE_CHUNK_SIZE = 500
+
+
+def _job_fingerprint(job: dict[str, Any]) -> str:
+    """What must change on the ServiceM8 side for a job to be re-synced (incremental mode)."""
+    parts = (job.get("edit_date"), job.get("total_invoice_amount"), job.get("status"))
+    return hashlib.sha1("|".join("" if p is None else str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def _load_sync_watermark(supabase: Any) -> Optional[str]:
+    """Largest ServiceM8 edit_date seen by the last fully successful run (None = never / unavailable)."""
+    try:
+        resp = (
+            supabase.table("servicem8_sync_state")
+            .select("watermark")
+            .eq("sync_name", SYNC_STATE_NAME)
+            .limit(1)
+            .execute()
+        )
+        rows = resp.data or []
+        return (rows[0].get("watermark") or None) if rows else None
+    except Exception as e:
+        logger.warning("job_performance_sync: could not read sync watermark (running full): %s", e)
+        return None
+
+
+def _save_sync_watermark(supabase: Any, watermark: Optional[str], summary: dict[str, Any]) -> None:
+    try:
+        supabase.table("servicem8_sync_state").upsert(
+            {
+                "sync_name": SYNC_STATE_NAME,
+                "watermark": watermark,
+                "last_run_at": datetime.now(timezone.utc).isoformat(),
+                "last_result": summary,
+            },
+            on_conflict="sync_name",
+        ).execute()
+    except Exception as e:
+        logger.warning("job_performance_sync: could not save sync watermark: %s", e)
+
+
+def _listing_cutoff(watermark: Optional[str]) -> Optional[str]:
+    """edit_date filter value for an incremental listing: watermark minus the overlap window."""
+    if not watermark:
+        return None
+    try:
+        parsed = datetime.strptime(str(watermark).strip()[:19], _SERVICEM8_DATETIME_FORMAT)
+    except ValueError:
+        logger.warning("job_performance_sync: unparseable watermark %r; running full", watermark)
+        return None
+    return (parsed - _WATERMARK_OVERLAP).strftime(_SERVICEM8_DATETIME_FORMAT)
+
+
+def _load_job_fingerprints(supabase: Any, job_uuids: list[str]) -> dict[str, str]:
+    """job_uuid -> fingerprint stored by the last successful sync of that job."""
+    out: dict[str, str] = {}
+    for start in range(0, len(job_uuids), _SYNC_STATE_CHUNK_SIZE):
+        chunk = job_uuids[start:start + _SYNC_STATE_CHUNK_SIZE]
+        try:
+            resp = (
+                supabase.table("servicem8_job_sync_state")
+                .select("servicem8_job_uuid, fingerprint")
+                .in_("servicem8_job_uuid", chunk)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning("job_performance_sync: could not read job fingerprints (syncing all): %s", e)
+            return {}
+        for r in resp.data or []:
+            if r.get("servicem8_job_uuid") and r.get("fingerprint"):
+                out[str(r["servicem8_job_uuid"])] = str(r["fingerprint"])
+    return out
+
+
+def _save_job_fingerprints(supabase: Any, jobs: list[dict[str, Any]]) -> None:
+    synced_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {
+            "servicem8_job_uuid": (job.get("uuid") or "").strip(),
+            "fingerprint": _job_fingerprint(job),
+            "edit_date": job.get("edit_date"),
+            "synced_at": synced_at,
+        }
+        for job in jobs
+        if (job.get("uuid") or "").strip()
+    ]
+    for start in range(0, len(rows), _SYNC_STATE_CHUNK_SIZE):
+        try:
+            supabase.table("servicem8_job_sync_state").upsert(
+                rows[start:start + _SYNC_STATE_CHUNK_SIZE], on_conflict="servicem8_job_uuid"
+            ).execute()
+        except Exception as e:
+            logger.warning("job_performance_sync: could not save job fingerprints: %s", e)
+            return
+
+
+SYNC_JOB_STATUSES = ("Completed", "Invoiced")
+
+
+def _iter_listed_batches(
+    access_token: str, edited_since: Optional[str], batch_size: int
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Completed + Invoiced jobs (optionally edited since a time) in batches of batch_size, streamed as the
+    two concurrent listings deliver pages; only one batch is held at a time. Jobs are deduped by uuid
+    within a batch; a job seen in both listings in different batches is synced twice, which is harmless.
+    """
+    batch: dict[str, dict[str, Any]] = {}
+    for _status, page in iter_job_pages(access_token, SYNC_JOB_STATUSES, edited_since):
+        for job in page:
+            uid = (job.get("uuid") or "").strip()
+            if uid and uid not in batch:
+                batch[uid] = job
+                if len(batch) >= batch_size:
+                    yield list(batch.values())
+                    batch = {}
+    if batch:
+        yield list(batch.values())
+
+
+def run_sync(progress: Optional[Callable[..., None]] = None, full: bool = False) -> dict[str, Any]:
     """
     Run one pass of job_performance sync: list Completed/Invoiced jobs from ServiceM8,
     resolve active quote per job, upsert into job_performance (merge-before-upsert).
-    Returns a summary dict: success (bool), jobs_processed (int), rows_upserted (int), error (str or None).
+    Incremental by default: only jobs edited since the last successful run's watermark are listed
+    (public.servicem8_sync_state), and listed jobs whose fingerprint (edit_date, invoice amount,
+    status) matches public.servicem8_job_sync_state are skipped. full=True lists and syncs every job
+    (picks up changes made only on our side, e.g. a new final quote or product cost).
+    The listing is streamed: jobs are synced in batches of SERVICEM8_SYNC_BATCH_SIZE (default 200)
+    as pages arrive, so memory is bounded by the batch and syncing overlaps pagination. Per batch,
+    existing job_performance rows, active quotes and job fingerprints are prefetched, rows are
+    upserted and job_personnel baseline rows inserted in multi-row calls (database round trips grow
+    with batches, not jobs), and in a batch with at least SERVICEM8_SYNC_BULK_FETCH_MIN_JOBS changed
+    jobs (default 50) materials and activities come from paged bulk listings instead of two calls per
+    job; the listings are filtered to the batch's jobs as they stream and dropped with the batch.
+    Rows are built by SERVICEM8_SYNC_CONCURRENCY workers (default 8); their ServiceM8 calls go
+    through app.servicem8's shared rate limiter and retries. A failing job is recorded and skipped;
+    the others still sync. A listing that fails after retries stops the run: batches already synced
+    stay synced, but success is False and the watermark does not advance.
+    Returns a summary dict: success (bool, False if any job failed), mode ("incremental" | "full"),
+    jobs_listed (int), jobs_skipped_unchanged (int), jobs_processed (int, jobs synced this run),
+    rows_upserted (int), jobs_failed (int), job_errors (first 20 "job_id: error"), elapsed_seconds,
+    jobs_per_second, throttle_wait_seconds, servicem8_retries, servicem8_rate_limited, error (str or None).
+    The last three are process-wide ServiceM8 client counters over the run (app.servicem8.get_http_client_stats).
+    progress, if given, is called as progress(done, None) as jobs finish (background job runner;
+    the total is unknown while the listing streams).
     """
+    started = time.monotonic()
     result: dict[str, Any] = {
         "success": False,
+        "mode": "full" if full else "incremental",
+        "watermark": None,
+        "jobs_listed": 0,
+        "jobs_skipped_unchanged": 0,
         "jobs_processed": 0,
         "rows_upserted": 0,
+        "jobs_failed": 0,
+        "job_errors": [],
+        "elapsed_seconds": 0.0,
+        "jobs_per_second": 0.0,
+        "throttle_wait_seconds": 0.0,
+        "servicem8_retries": 0,
+        "servicem8_rate_limited": 0,
         "error": None,
     }
     sync_user_id = get_sync_user_id()
@@ -191,165 +647,135 @@ def run_sync() -> dict[str, Any]:
     access_token = tokens["access_token"]
     supabase = get_supabase()
 
-    # List Completed and Invoiced jobs; merge and dedupe by uuid. Retry once on 401 with fresh token (59.20).
+    watermark = None if full else _load_sync_watermark(supabase)
+    edited_since = _listing_cutoff(watermark)
+    if edited_since is None:
+        result["mode"] = "full"
+
+    client_stats_before = get_http_client_stats()
+    batch_size = max(1, int(_env_number("SERVICEM8_SYNC_BATCH_SIZE", DEFAULT_SYNC_BATCH_SIZE)))
+    # Completed + Invoiced listing, streamed in batches. Retry once on 401 with fresh token (59.20);
+    # the first batch is pulled before anything is synced, so the retry never repeats work.
+    batches = _iter_listed_batches(access_token, edited_since, batch_size)
     try:
-        completed = list_jobs(access_token, "Completed")
-        invoiced = list_jobs(access_token, "Invoiced")
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 401 and sync_user_id:
+        try:
+            batch = next(batches, None)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 401:
+                raise
             tokens = get_tokens(sync_user_id)
-            if tokens:
-                access_token = tokens["access_token"]
-                logger.info("job_performance_sync: 401 on first request; retrying with refreshed token")
-                completed = list_jobs(access_token, "Completed")
-                invoiced = list_jobs(access_token, "Invoiced")
-            else:
+            if not tokens:
                 result["error"] = "ServiceM8 token expired; refresh failed (reconnect ServiceM8 in app)"
                 logger.warning("job_performance_sync: %s", result["error"])
                 return result
-        else:
-            result["error"] = str(e)
-            logger.warning("job_performance_sync: %s", result["error"])
-            return result
-
-    seen_uuids: set[str] = set()
-    jobs: list[dict[str, Any]] = []
-    for j in completed + invoiced:
-        uid = (j.get("uuid") or "").strip()
-        if uid and uid not in seen_uuids:
-            seen_uuids.add(uid)
-            jobs.append(j)
-
-    result["jobs_processed"] = len(jobs)
-    rows_upserted = 0
+            access_token = tokens["access_token"]
+            logger.info("job_performance_sync: 401 on first request; retrying with refreshed token")
+            batches = _iter_listed_batches(access_token, edited_since, batch_size)
+            batch = next(batches, None)
+    except httpx.HTTPError as e:
+        result["error"] = f"ServiceM8 job listing failed: {e}"
+        logger.warning("job_performance_sync: %s", result["error"])
+        return result
+
     # 59.8: staff_uuid -> technician_id once per run (reused for job_personnel baseline)
     staff_uuid_to_technician_id: dict[str, Optional[str]] = {}
     try:
         staff_uuid_to_technician_id = get_staff_uuid_to_technician_id_map(access_token)
     except Exception as e:
         logger.warning("job_personnel baseline: could not build staff map: %s", e)
+    workers = max(1, int(_env_number("SERVICEM8_SYNC_CONCURRENCY", DEFAULT_SYNC_CONCURRENCY)))
+    ctx = _SyncContext(supabase, access_token, staff_uuid_to_technician_id)
+    # 59.7: our product costs by ServiceM8 material uuid, once per run (no per-job products lookups)
     try:
-        for job in jobs:
-            job_uuid = (job.get("uuid") or "").strip()
-            generated_job_id = (job.get("generated_job_id") or "").strip()
-            if not generated_job_id:
-                continue
-            # Active quote
-            quote_row = get_active_quote_for_job(supabase, generated_job_id)
-            quote_id: Optional[str] = str(quote_row["id"]) if quote_row and quote_row.get("id") else None
-            labour_hours = float(quote_row["labour_hours"]) if quote_row and quote_row.get("labour_hours") is not None else 0.0
-            quoted_labor_minutes = int(round(labour_hours * 60)) if quote_row else 0
-
-            # Merge with existing row if present (preserve admin-edited fields)
-            existing = (
-                supabase.table("job_performance")
-                .select("*")
-                .eq("servicem8_job_id", generated_job_id[:32])
-                .limit(1)
-                .execute()
-            )
-            existing_rows = (existing.data or []) if hasattr(existing, "data") else []
-            if existing_rows:
-                row = dict(existing_rows[0])
-            else:
-                row = {}
-            # Overlay only sync-owned columns
-            row["servicem8_job_id"] = generated_job_id[:32]
-            row["servicem8_job_uuid"] = job_uuid if job_uuid else None
-            row["quote_id"] = quote_id
-            row["quoted_labor_minutes"] = quoted_labor_minutes
-            row["status"] = "draft"
-            # 59.7: invoiced_revenue_exc_gst from job total_invoice_amount (inc GST → ex-GST)
-            raw_revenue = job.get("total_invoice_amount")
-            if raw_revenue is None:
-                row["invoiced_revenue_exc_gst"] = 0
-            else:
-                try:
-                    row["invoiced_revenue_exc_gst"] = round(float(raw_revenue) / GST_DIVISOR, 2)
-                except (TypeError, ValueError):
-                    row["invoiced_revenue_exc_gst"] = 0
-            # 59.7: materials_cost from JobMaterials (our DB cost with ServiceM8 fallback)
-            if job_uuid:
-                job_materials = list_job_materials(access_token, job_uuid)
-                row["materials_cost"] = _compute_materials_cost_from_job_materials(supabase, job_materials)
+        ctx.material_costs = get_material_cost_map(supabase)
+    except Exception as e:
+        logger.warning("job_performance_sync: could not load product costs (using ServiceM8 cost only): %s", e)
+    bulk_fetch_min_jobs = _env_number("SERVICEM8_SYNC_BULK_FETCH_MIN_JOBS", DEFAULT_SYNC_BULK_FETCH_MIN_JOBS)
+
+    done = 0
+    max_edit_date = watermark or ""
+    listing_error: Optional[Exception] = None
+    if progress is not None:
+        progress(0, None)
+
+    def job_done() -> None:
+        nonlocal done
+        done += 1
+        if progress is not None:
+            progress(done, None)
+
+    def record_failures(failed: list[tuple[dict[str, Any], Exception]]) -> None:
+        for job, e in failed:
+            job_id = _job_label(job)
+            logger.warning("job_performance_sync: job %s failed: %s", job_id, e)
+            result["jobs_failed"] += 1
+            if len(result["job_errors"]) < _MAX_REPORTED_JOB_ERRORS:
+                result["job_errors"].append(f"{job_id}: {e}")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-sync") as pool:
+        while batch is not None:
+            result["jobs_listed"] += len(batch)
+            max_edit_date = max([max_edit_date] + [str(j["edit_date"]) for j in batch if j.get("edit_date")])
+            if full:
+                jobs = batch
             else:
-                row["materials_cost"] = 0
-            # 59.29: payment_date for 60.7 period assignment (cut-off 11:59 PM last Sunday)
-            payment_date_iso = _parse_payment_date(job)
-            row["payment_date"] = payment_date_iso
-            # Remove read-only / auto columns so Supabase doesn't complain
-            row.pop("created_at", None)
-            upsert_resp = supabase.table("job_performance").upsert(
-                row, on_conflict="servicem8_job_id"
-            ).execute()
-            rows_upserted += 1
-            # 59.8: job_personnel baseline from JobActivity (insert only when no row exists)
-            job_performance_id = None
-            if upsert_resp.data and len(upsert_resp.data) > 0:
-                job_performance_id = upsert_resp.data[0].get("id")
-            if job_performance_id and job_uuid and staff_uuid_to_technician_id:
+                fingerprints = _load_job_fingerprints(supabase, [(j.get("uuid") or "").strip() for j in batch])
+                jobs = [j for j in batch if fingerprints.get((j.get("uuid") or "").strip()) != _job_fingerprint(j)]
+                result["jobs_skipped_unchanged"] += len(batch) - len(jobs)
+            result["jobs_processed"] += len(jobs)
+            # Bulk listings are paged per batch and keep only this batch's jobs (lines of other jobs are
+            # dropped while streaming), and batch_ctx goes with the batch, so memory stays bounded.
+            batch_ctx = ctx
+            job_uuids = [u for u in ((j.get("uuid") or "").strip() for j in jobs) if u]
+            if job_uuids and len(job_uuids) >= bulk_fetch_min_jobs:
                 try:
-                    activities = list_job_activities(access_token, job_uuid)
-                    minutes_by_staff = _aggregate_activity_minutes_by_staff(activities)
-                    existing_personnel = (
-                        supabase.table("job_personnel")
-                        .select("technician_id")
-                        .eq("job_performance_id", job_performance_id)
-                        .execute()
-                    )
-                    existing_tech_ids = {
-                        str(r["technician_id"]) for r in (existing_personnel.data or []) if r.get("technician_id")
-                    }
-                    for staff_uuid, total_minutes in minutes_by_staff.items():
-                        technician_id = staff_uuid_to_technician_id.get(staff_uuid)
-                        if not technician_id or technician_id in existing_tech_ids:
-                            continue
-                        supabase.table("job_personnel").insert(
-                            {
-                                "job_performance_id": job_performance_id,
-                                "technician_id": technician_id,
-                                "is_seller": False,
-                                "is_executor": False,
-                                "onsite_minutes": total_minutes,
-                                "travel_shopping_minutes": 0,
-                            }
-                        ).execute()
-                        existing_tech_ids.add(technician_id)
-                    # 59.26: seller pre-population from quote created_by and co_seller_user_id
-                    for user_id in (quote_row.get("created_by"), quote_row.get("co_seller_user_id")):
-                        if not user_id:
-                            continue
-                        tech_id_str = str(user_id).strip()
-                        if not tech_id_str or tech_id_str in existing_tech_ids:
-                            continue
-                        try:
-                            supabase.table("job_personnel").insert(
-                                {
-                                    "job_performance_id": job_performance_id,
-                                    "technician_id": tech_id_str,
-                                    "is_seller": True,
-                                    "is_executor": False,
-                                    "onsite_minutes": 0,
-                                    "travel_shopping_minutes": 0,
-                                }
-                            ).execute()
-                            existing_tech_ids.add(tech_id_str)
-                        except Exception as seller_e:
-                            logger.warning(
-                                "job_personnel seller insert failed for technician_id=%s, job_performance_id=%s: %s",
-                                tech_id_str,
-                                job_performance_id,
-                                seller_e,
-                            )
-                except Exception as e:
-                    logger.warning(
-                        "job_personnel baseline failed for job_performance_id=%s: %s",
-                        job_performance_id,
-                        e,
+                    batch_ctx = replace(
+                        ctx,
+                        materials_by_job=list_job_materials_bulk(access_token, job_uuids),
+                        activities_by_job=(
+                            list_job_activities_bulk(access_token, job_uuids) if staff_uuid_to_technician_id else None
+                        ),
                     )
-        result["rows_upserted"] = rows_upserted
+                except httpx.HTTPError as e:
+                    logger.warning("job_performance_sync: bulk materials/activities fetch failed: %s", e)
+                    record_failures([(job, e) for job in jobs])
+                    jobs = []
+            if jobs:
+                upserted, synced, failed = _sync_batch(batch_ctx, pool, jobs, job_done)
+                result["rows_upserted"] += upserted
+                record_failures(failed)
+                _save_job_fingerprints(supabase, synced)
+            try:
+                batch = next(batches, None)
+            except httpx.HTTPError as e:
+                listing_error = e
+                batch = None
+
+    elapsed = time.monotonic() - started
+    result["elapsed_seconds"] = round(elapsed, 3)
+    result["jobs_per_second"] = round(result["jobs_processed"] / elapsed, 2) if elapsed > 0 else 0.0
+    client_stats = get_http_client_stats()
+    result["throttle_wait_seconds"] = round(
+        max(0.0, client_stats["throttle_wait_seconds"] - client_stats_before["throttle_wait_seconds"]), 3
+    )
+    result["servicem8_retries"] = client_stats["retries"] - client_stats_before["retries"]
+    result["servicem8_rate_limited"] = client_stats["rate_limited"] - client_stats_before["rate_limited"]
+    # Advance the watermark only when the listing completed and nothing failed: otherwise the
+    # unseen / failed jobs must be listed again next run.
+    new_watermark = max_edit_date or None
+    if listing_error is not None:
+        result["error"] = f"ServiceM8 job listing failed: {listing_error}"
+        logger.warning("job_performance_sync: %s", result["error"])
+        new_watermark = watermark
+    elif result["jobs_failed"]:
+        result["error"] = f"{result['jobs_failed']} of {result['jobs_processed']} jobs failed"
+        new_watermark = watermark
+    else:
         result["success"] = True
-    except Exception as e:
-        logger.exception("job_performance_sync failed: %s", e)
-        result["error"] = str(e)
+    result["watermark"] = new_watermark
+    _save_sync_watermark(
+        supabase,
+        new_watermark,
+        {k: result[k] for k in ("success", "mode", "jobs_listed", "jobs_processed", "jobs_failed", "elapsed_seconds")},
+    )
     return result
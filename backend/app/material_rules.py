@@ -4,14 +4,30 @@ Admin material-rules service.
 Covers:
 - Quick Quoter repair types and part templates (catalog tables)
 - Measured-length accessory inference rules for /api/calculate-quote
+- In-process measured rules snapshot read by quotes (loaded at startup, refreshed in the
+  background, swapped when rules are saved) so quotes never wait on the database for rules
 """
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass
 from datetime import datetime, timezone
+import logging
+import threading
+import time
 import uuid as uuid_lib
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 
-from app.gutter_accessories import DEFAULT_GUTTER_ACCESSORY_RULES, VALID_CLIP_SELECTION_MODES
+from app.gutter_accessories import (
+    DEFAULT_GUTTER_ACCESSORY_RULES,
+    VALID_CLIP_SELECTION_MODES,
+    CompiledAccessoryRules,
+    compile_accessory_rules,
+)
+from app.catalog_revision import bump_catalog_revision
+from app.pricing import invalidate_pricing_cache
+
+logger = logging.getLogger(__name__)
 
 VALID_QUICK_QUOTER_PROFILES = {"SC", "CL"}
 VALID_QUICK_QUOTER_SIZES = {65, 80}
@@ -560,6 +576,7 @@ def save_quick_quoter_repair_types(
         for row in rows
     ]
     supabase.table("quick_quoter_repair_types").upsert(to_upsert, on_conflict="id").execute()
+    bump_catalog_revision()
 
     return _list_quick_quoter_repair_types(supabase)
 
@@ -691,17 +708,35 @@ def _serialize_measured_rules(row: dict[str, Any]) -> dict[str, Any]:
     return out
 
 
+_MEASURED_RULES_COLUMNS = (
+    "id, bracket_spacing_mm, clip_spacing_mm, screws_per_bracket, "
+    "screws_per_dropper, screws_per_saddle_clip, screws_per_adjustable_clip, "
+    "screw_product_id, bracket_product_id_sc, bracket_product_id_cl, "
+    "saddle_clip_product_id_65, saddle_clip_product_id_80, "
+    "adjustable_clip_product_id_65, adjustable_clip_product_id_80, "
+    "clip_selection_mode, updated_at, updated_by"
+)
+
+
 def get_measured_material_rules(supabase: Any) -> Optional[dict[str, Any]]:
     resp = (
         supabase.table("measured_material_rules")
-        .select(
-            "id, bracket_spacing_mm, clip_spacing_mm, screws_per_bracket, "
-            "screws_per_dropper, screws_per_saddle_clip, screws_per_adjustable_clip, "
-            "screw_product_id, bracket_product_id_sc, bracket_product_id_cl, "
-            "saddle_clip_product_id_65, saddle_clip_product_id_80, "
-            "adjustable_clip_product_id_65, adjustable_clip_product_id_80, "
-            "clip_selection_mode, updated_at, updated_by"
-        )
+        .select(_MEASURED_RULES_COLUMNS)
+        .eq("id", 1)
+        .limit(1)
+        .execute()
+    )
+    rows = resp.data or []
+    if not rows:
+        return None
+    return _serialize_measured_rules(dict(rows[0]))
+
+
+async def get_measured_material_rules_async(supabase: Any) -> Optional[dict[str, Any]]:
+    """get_measured_material_rules on an async client (app.supabase_client.get_async_supabase)."""
+    resp = await (
+        supabase.table("measured_material_rules")
+        .select(_MEASURED_RULES_COLUMNS)
         .eq("id", 1)
         .limit(1)
         .execute()
@@ -720,10 +755,7 @@ def get_measured_material_rules_or_defaults(supabase: Any) -> dict[str, Any]:
 
 
 def get_measured_material_rules_for_quote(supabase: Any) -> Optional[dict[str, Any]]:
-    rules = get_measured_material_rules(supabase)
-    if not rules:
-        return None
-    return {key: rules.get(key) for key in DEFAULT_GUTTER_ACCESSORY_RULES}
+    return _rules_for_quote(get_measured_material_rules(supabase))
 
 
 def _normalize_measured_rules(payload: Any) -> dict[str, Any]:
@@ -837,5 +869,218 @@ def save_measured_material_rules(
         "updated_by": actor_user_id,
     }
     supabase.table("measured_material_rules").upsert(payload_to_save, on_conflict="id").execute()
+    invalidate_pricing_cache()
+
+    saved = get_measured_material_rules_or_defaults(supabase)
+    _publish_measured_rules_snapshot(_rules_for_quote(saved), saved.get("updated_at"))
+    return saved
+
+
+DEFAULT_MEASURED_RULES_REFRESH_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class MeasuredRulesSnapshot:
+    """
+    Measured rules as used by quotes. version 0 = built-in defaults (never loaded);
+    each published change gets the next version. rules is None when defaults apply.
+    """
+
+    version: int
+    rules: Optional[dict[str, Any]]
+    compiled: CompiledAccessoryRules
+    updated_at: Optional[str]
+    source: str  # "database" | "default"
+
+
+def build_measured_rules_snapshot(
+    rules: Optional[dict[str, Any]],
+    *,
+    version: int,
+    updated_at: Optional[str] = None,
+) -> MeasuredRulesSnapshot:
+    return MeasuredRulesSnapshot(
+        version=version,
+        rules=dict(rules) if rules else None,
+        compiled=compile_accessory_rules(rules),
+        updated_at=updated_at,
+        source="database" if rules else "default",
+    )
+
+
+_measured_rules_snapshot = build_measured_rules_snapshot(None, version=0)
+_measured_rules_snapshot_lock = threading.Lock()
+_measured_rules_snapshot_stats: dict[str, Any] = {
+    "last_refresh_at": None,
+    "last_refresh_error": None,
+    "refresh_failures": 0,
+}
+_measured_rules_refresher: Optional[threading.Thread] = None
+_measured_rules_refresher_stop = threading.Event()
+# Cold loads (snapshot never loaded, e.g. the startup load failed) are single-flight: one load at a
+# time (a lock for sync callers, one shared task per event loop for async ones); after a failure,
+# callers get the defaults for MEASURED_RULES_COLD_RETRY_SECONDS before one of them tries again.
+MEASURED_RULES_COLD_RETRY_SECONDS = 5.0
+_cold_load_lock = threading.Lock()
+_cold_load_retry_at = 0.0
+_cold_load_task: Optional[asyncio.Task] = None
+
+
+def _rules_for_quote(rules: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    if not rules:
+        return None
+    return {key: rules.get(key) for key in DEFAULT_GUTTER_ACCESSORY_RULES}
+
+
+def _publish_measured_rules_snapshot(
+    rules: Optional[dict[str, Any]],
+    updated_at: Optional[str],
+) -> MeasuredRulesSnapshot:
+    """Atomically swap in new rules. The version only moves when rules or updated_at change."""
+    global _measured_rules_snapshot
+    with _measured_rules_snapshot_lock:
+        current = _measured_rules_snapshot
+        if current.version > 0 and current.rules == (rules or None) and current.updated_at == updated_at:
+            return current
+        snapshot = build_measured_rules_snapshot(rules, version=current.version + 1, updated_at=updated_at)
+        _measured_rules_snapshot = snapshot
+    logger.info("Measured rules snapshot v%s published (source=%s)", snapshot.version, snapshot.source)
+    return snapshot
+
+
+def get_measured_rules_snapshot() -> MeasuredRulesSnapshot:
+    """Current measured rules snapshot. Never touches the database."""
+    return _measured_rules_snapshot
+
+
+def _record_refresh_failure(error: Exception) -> None:
+    with _measured_rules_snapshot_lock:
+        _measured_rules_snapshot_stats["refresh_failures"] += 1
+        _measured_rules_snapshot_stats["last_refresh_error"] = str(error)
+
+
+def _publish_refreshed_rules(rules: Optional[dict[str, Any]]) -> MeasuredRulesSnapshot:
+    snapshot = _publish_measured_rules_snapshot(_rules_for_quote(rules), (rules or {}).get("updated_at"))
+    with _measured_rules_snapshot_lock:
+        _measured_rules_snapshot_stats["last_refresh_at"] = _now_iso()
+        _measured_rules_snapshot_stats["last_refresh_error"] = None
+    return snapshot
+
+
+def refresh_measured_rules_snapshot(supabase: Any) -> MeasuredRulesSnapshot:
+    """
+    Reload measured rules from the database and publish them if changed.
+    On failure the previous snapshot stays in place and the error is recorded (then re-raised).
+    """
+    try:
+        rules = get_measured_material_rules(supabase)
+    except Exception as e:
+        _record_refresh_failure(e)
+        raise
+    return _publish_refreshed_rules(rules)
+
+
+async def refresh_measured_rules_snapshot_async(supabase: Any) -> MeasuredRulesSnapshot:
+    """refresh_measured_rules_snapshot on an async client."""
+    try:
+        rules = await get_measured_material_rules_async(supabase)
+    except Exception as e:
+        _record_refresh_failure(e)
+        raise
+    return _publish_refreshed_rules(rules)
+
+
+def _cold_load_due() -> bool:
+    return _measured_rules_snapshot.version == 0 and time.monotonic() >= _cold_load_retry_at
+
+
+def _cold_load_failed(error: Exception) -> None:
+    global _cold_load_retry_at
+    _cold_load_retry_at = time.monotonic() + MEASURED_RULES_COLD_RETRY_SECONDS
+    logger.warning("Measured material rules unavailable; using defaults for quote inference: %s", error)
+
+
+def ensure_measured_rules_snapshot(get_supabase: Callable[[], Any]) -> MeasuredRulesSnapshot:
+    """
+    Current snapshot, loaded first if it has never been loaded. Concurrent callers wait for one load
+    instead of each reading the database; after a failed load the defaults are returned without
+    retrying for MEASURED_RULES_COLD_RETRY_SECONDS. Never raises.
+    """
+    if not _cold_load_due():
+        return _measured_rules_snapshot
+    with _cold_load_lock:
+        if _cold_load_due():
+            try:
+                return refresh_measured_rules_snapshot(get_supabase())
+            except Exception as e:
+                _cold_load_failed(e)
+    return _measured_rules_snapshot
+
+
+async def _cold_load_async(get_async_supabase: Callable[[], Awaitable[Any]]) -> MeasuredRulesSnapshot:
+    try:
+        return await refresh_measured_rules_snapshot_async(await get_async_supabase())
+    except Exception as e:
+        _cold_load_failed(e)
+        return _measured_rules_snapshot
+
+
+async def ensure_measured_rules_snapshot_async(
+    get_async_supabase: Callable[[], Awaitable[Any]],
+) -> MeasuredRulesSnapshot:
+    """ensure_measured_rules_snapshot for async handlers: concurrent callers await one shared load."""
+    global _cold_load_task
+    if not _cold_load_due():
+        return _measured_rules_snapshot
+    loop = asyncio.get_running_loop()
+    task = _cold_load_task
+    if task is None or task.done() or task.get_loop() is not loop:
+        task = loop.create_task(_cold_load_async(get_async_supabase))
+        _cold_load_task = task
+    # shield: a cancelled request must not cancel the load other requests are waiting on.
+    return await asyncio.shield(task)
+
+
+def get_measured_rules_snapshot_stats() -> dict[str, Any]:
+    snapshot = _measured_rules_snapshot
+    with _measured_rules_snapshot_lock:
+        stats = dict(_measured_rules_snapshot_stats)
+    return {
+        "version": snapshot.version,
+        "source": snapshot.source,
+        "updated_at": snapshot.updated_at,
+        "refresher_running": bool(_measured_rules_refresher and _measured_rules_refresher.is_alive()),
+        **stats,
+    }
+
+
+def start_measured_rules_refresher(
+    get_supabase: Callable[[], Any],
+    interval_seconds: float = DEFAULT_MEASURED_RULES_REFRESH_SECONDS,
+) -> None:
+    """Refresh the snapshot every interval_seconds on a daemon thread (picks up saves from other workers).
+    interval_seconds <= 0 disables the refresher (snapshot then changes only on startup and local saves)."""
+    global _measured_rules_refresher
+    if interval_seconds <= 0:
+        return
+    if _measured_rules_refresher and _measured_rules_refresher.is_alive():
+        return
+    _measured_rules_refresher_stop.clear()
+
+    def _run() -> None:
+        while not _measured_rules_refresher_stop.wait(interval_seconds):
+            try:
+                refresh_measured_rules_snapshot(get_supabase())
+            except Exception as e:
+                logger.warning(
+                    "Measured rules background refresh failed; keeping snapshot v%s: %s",
+                    _measured_rules_snapshot.version,
+                    e,
+                )
+
+    _measured_rules_refresher = threading.Thread(target=_run, name="measured-rules-refresher", daemon=True)
+    _measured_rules_refresher.start()
+
 
-    return get_measured_material_rules_or_defaults(supabase)
+def stop_measured_rules_refresher() -> None:
+    _measured_rules_refresher_stop.set()
@@ -1,13 +1,23 @@
 """
 Product pricing for quote generation. Reads cost_price, markup_percentage, unit from Supabase (public.products).
+
+Pricing is served from an in-process read-through cache: each product row is kept for
+PRICING_CACHE_TTL_SECONDS (default 300; 0 disables) and the whole cache is dropped by
+invalidate_pricing_cache() whenever pricing, the CSV import or measured rules are saved.
+The cache version is bumped on every invalidation so in-flight loads never store stale rows.
 """
 import logging
-from typing import TypedDict
+import os
+import threading
+import time
+from typing import Any, Optional, TypedDict
 
-from app.supabase_client import get_supabase
+from app.supabase_client import get_async_supabase, get_supabase
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PRICING_CACHE_TTL_SECONDS = 300.0
+
 
 class ProductPricing(TypedDict):
     id: str
@@ -17,45 +27,254 @@ class ProductPricing(TypedDict):
     unit: str
 
 
-def get_product_pricing(product_ids: list[str]) -> dict[str, ProductPricing]:
-    """
-    Return pricing for the given product IDs. Queries public.products for
-    id, name, cost_price, markup_percentage, unit. Missing products are logged
-    and omitted from the result.
-    """
-    if not product_ids:
-        return {}
-    supabase = get_supabase()
-    try:
-        query = supabase.table("products").select(
-            "id, name, cost_price, markup_percentage, unit"
-        ).in_("id", product_ids)
-        resp = query.execute()
-        rows = resp.data or []
-    except Exception as e:
-        logger.exception("Failed to fetch product pricing from Supabase: %s", e)
-        raise
+# product_id -> (loaded_at, pricing or None when the product is missing / has no cost_price)
+_pricing_cache: dict[str, tuple[float, Optional[ProductPricing]]] = {}
+_pricing_cache_lock = threading.Lock()
+_pricing_cache_version = 1
+_pricing_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _pricing_cache_ttl_seconds() -> float:
+    raw = os.environ.get("PRICING_CACHE_TTL_SECONDS", "").strip()
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            logger.warning("Invalid PRICING_CACHE_TTL_SECONDS=%r; using default.", raw)
+    return DEFAULT_PRICING_CACHE_TTL_SECONDS
+
+
+def _row_to_pricing(row: dict[str, Any]) -> Optional[ProductPricing]:
+    pid = row.get("id")
+    cost = row.get("cost_price")
+    # Allow 0; treat None as missing for quote calculation
+    if cost is None:
+        logger.warning("Product %s has no cost_price; skipping for pricing.", pid)
+        return None
+    return {
+        "id": str(pid),
+        "name": row.get("name", ""),
+        "cost_price": float(cost),
+        "markup_percentage": float(row.get("markup_percentage") or 0),
+        "unit": row.get("unit") or "each",
+    }
 
+
+_PRICING_COLUMNS = "id, name, cost_price, markup_percentage, unit"
+
+
+def _pricing_from_rows(product_ids: list[str], rows: list[dict[str, Any]]) -> dict[str, Optional[ProductPricing]]:
+    """Every requested ID is present in the result (None if missing or unusable)."""
+    fetched: dict[str, Optional[ProductPricing]] = {pid: None for pid in product_ids}
     found_ids = set()
-    result = {}
     for r in rows:
         pid = r.get("id")
         if not pid:
             continue
-        found_ids.add(pid)
-        cost = r.get("cost_price")
-        # Allow 0; treat None as missing for quote calculation
-        if cost is None:
-            logger.warning("Product %s has no cost_price; skipping for pricing.", pid)
-            continue
-        result[str(pid)] = {
-            "id": str(pid),
-            "name": r.get("name", ""),
-            "cost_price": float(cost),
-            "markup_percentage": float(r.get("markup_percentage") or 0),
-            "unit": r.get("unit") or "each",
-        }
+        found_ids.add(str(pid))
+        fetched[str(pid)] = _row_to_pricing(r)
     missing = set(product_ids) - found_ids
     if missing:
         logger.warning("Products not found for pricing: %s", missing)
+    return fetched
+
+
+def _fetch_product_pricing(product_ids: list[str]) -> dict[str, Optional[ProductPricing]]:
+    """Query public.products for the given IDs."""
+    supabase = get_supabase()
+    try:
+        resp = supabase.table("products").select(_PRICING_COLUMNS).in_("id", product_ids).execute()
+        rows = resp.data or []
+    except Exception as e:
+        logger.exception("Failed to fetch product pricing from Supabase: %s", e)
+        raise
+    return _pricing_from_rows(product_ids, rows)
+
+
+async def _fetch_product_pricing_async(product_ids: list[str]) -> dict[str, Optional[ProductPricing]]:
+    """Async variant of _fetch_product_pricing on the shared async client."""
+    supabase = await get_async_supabase()
+    try:
+        resp = await supabase.table("products").select(_PRICING_COLUMNS).in_("id", product_ids).execute()
+        rows = resp.data or []
+    except Exception as e:
+        logger.exception("Failed to fetch product pricing from Supabase: %s", e)
+        raise
+    return _pricing_from_rows(product_ids, rows)
+
+
+def _lookup_cached_pricing(product_ids: list[str]) -> tuple[dict[str, ProductPricing], list[str], int, float]:
+    """Split requested IDs into cached pricing and IDs to fetch. Returns (cached, to_fetch, version, ttl)."""
+    requested = list(dict.fromkeys(str(pid) for pid in product_ids))
+    ttl = _pricing_cache_ttl_seconds()
+    now = time.monotonic()
+
+    result: dict[str, ProductPricing] = {}
+    to_fetch: list[str] = []
+    with _pricing_cache_lock:
+        version = _pricing_cache_version
+        for pid in requested:
+            entry = _pricing_cache.get(pid)
+            if entry is None or ttl <= 0 or now - entry[0] >= ttl:
+                to_fetch.append(pid)
+            elif entry[1] is not None:
+                result[pid] = entry[1]
+        _pricing_cache_stats["misses" if to_fetch else "hits"] += 1
+    return result, to_fetch, version, ttl
+
+
+def _store_fetched_pricing(
+    result: dict[str, ProductPricing],
+    fetched: dict[str, Optional[ProductPricing]],
+    version: int,
+    ttl: float,
+) -> dict[str, ProductPricing]:
+    loaded_at = time.monotonic()
+    with _pricing_cache_lock:
+        # An invalidation while we were fetching means these rows may predate the write; don't keep them.
+        if ttl > 0 and version == _pricing_cache_version:
+            for pid, pricing in fetched.items():
+                _pricing_cache[pid] = (loaded_at, pricing)
+    for pid, pricing in fetched.items():
+        if pricing is not None:
+            result[pid] = pricing
     return result
+
+
+def get_product_pricing(product_ids: list[str]) -> dict[str, ProductPricing]:
+    """
+    Return pricing for the given product IDs. Queries public.products for
+    id, name, cost_price, markup_percentage, unit. Missing products are logged
+    and omitted from the result.
+    Cached rows are served from memory; only expired or unseen IDs hit Supabase.
+    """
+    if not product_ids:
+        return {}
+    result, to_fetch, version, ttl = _lookup_cached_pricing(product_ids)
+    if not to_fetch:
+        return result
+    return _store_fetched_pricing(result, _fetch_product_pricing(to_fetch), version, ttl)
+
+
+async def get_product_pricing_async(product_ids: list[str]) -> dict[str, ProductPricing]:
+    """get_product_pricing for async handlers: same cache, misses are read with the async client."""
+    if not product_ids:
+        return {}
+    result, to_fetch, version, ttl = _lookup_cached_pricing(product_ids)
+    if not to_fetch:
+        return result
+    return _store_fetched_pricing(result, await _fetch_product_pricing_async(to_fetch), version, ttl)
+
+
+def invalidate_pricing_cache() -> int:
+    """Drop all cached pricing and bump the cache version. Returns the new version."""
+    global _pricing_cache_version
+    with _pricing_cache_lock:
+        _pricing_cache.clear()
+        _pricing_cache_version += 1
+        _pricing_cache_stats["invalidations"] += 1
+        return _pricing_cache_version
+
+
+def get_pricing_cache_version() -> int:
+    """Current pricing cache version (bumped by every invalidation)."""
+    with _pricing_cache_lock:
+        return _pricing_cache_version
+
+
+def get_pricing_cache_ttl_seconds() -> float:
+    """Seconds a cached price is reused (PRICING_CACHE_TTL_SECONDS); 0 means caching is off."""
+    return _pricing_cache_ttl_seconds()
+
+
+def get_pricing_cache_stats() -> dict[str, Any]:
+    """Hit/miss counters for the pricing cache (one lookup = one get_product_pricing call)."""
+    with _pricing_cache_lock:
+        hits = _pricing_cache_stats["hits"]
+        misses = _pricing_cache_stats["misses"]
+        lookups = hits + misses
+        return {
+            "version": _pricing_cache_version,
+            "entries": len(_pricing_cache),
+            "ttl_seconds": _pricing_cache_ttl_seconds(),
+            "hits": hits,
+            "misses": misses,
+            "invalidations": _pricing_cache_stats["invalidations"],
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+DEFAULT_UPDATE_PRICING_CHUNK_SIZE = 500
+
+
+def _is_missing_function(e: Exception) -> bool:
+    """True when PostgREST reports the called database function does not exist (migration not applied)."""
+    return getattr(e, "code", None) in ("PGRST202", "42883")
+
+
+def _update_pricing_chunk_by_price_pair(supabase: Any, chunk: list[dict[str, Any]]) -> list[str]:
+    """Fallback without the bulk_update_product_pricing function: one UPDATE ... WHERE id IN per price pair."""
+    by_price: dict[tuple[Any, Any], list[str]] = {}
+    for item in chunk:
+        by_price.setdefault((item["cost_price"], item["markup_percentage"]), []).append(item["id"])
+    written: list[str] = []
+    for (cost_price, markup_percentage), pids in by_price.items():
+        resp = (
+            supabase.table("products")
+            .update({"cost_price": cost_price, "markup_percentage": markup_percentage})
+            .in_("id", pids)
+            .execute()
+        )
+        written.extend(str(row["id"]) for row in (resp.data or []) if row.get("id"))
+    return written
+
+
+def update_product_pricing(updates: list[dict[str, Any]], progress: Optional[Any] = None) -> dict[str, Any]:
+    """
+    Write cost_price / markup_percentage for many products: one call per UPDATE_PRICING_CHUNK_SIZE
+    products (default 500) to public.bulk_update_product_pricing (docs/product_pricing_rpc_migration.sql),
+    a single UPDATE ... FROM over the chunk's rows, whatever their prices. Only the price columns are
+    written, so concurrent edits to other columns survive and a product deleted meanwhile is not re-created.
+    Without the function (migration not applied) each chunk falls back to one UPDATE per distinct price pair.
+    updates: [{id, cost_price, markup_percentage}] (already validated; a repeated id keeps the last entry).
+    Returns {success: True, updated, not_found: [ids no row was updated for]}. progress(done, total) per chunk.
+    Does not invalidate caches; callers do that (also on failure, since earlier writes may have landed).
+    """
+    latest: dict[str, dict[str, Any]] = {}
+    for item in updates:
+        latest[str(item["id"])] = item
+    chunk_size = DEFAULT_UPDATE_PRICING_CHUNK_SIZE
+    raw = os.environ.get("UPDATE_PRICING_CHUNK_SIZE", "").strip()
+    if raw:
+        try:
+            chunk_size = max(1, int(raw))
+        except ValueError:
+            logger.warning("Invalid UPDATE_PRICING_CHUNK_SIZE=%r; using default.", raw)
+
+    rows = [
+        {"id": pid, "cost_price": item["cost_price"], "markup_percentage": item["markup_percentage"]}
+        for pid, item in latest.items()
+    ]
+    supabase = get_supabase()
+    use_rpc = True
+    written: set[str] = set()
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if use_rpc:
+            try:
+                resp = supabase.rpc("bulk_update_product_pricing", {"updates": chunk}).execute()
+                written.update(str(row["id"]) for row in (resp.data or []) if row.get("id"))
+            except Exception as e:
+                if not _is_missing_function(e):
+                    raise
+                logger.warning(
+                    "update_product_pricing: bulk_update_product_pricing missing (apply "
+                    "docs/product_pricing_rpc_migration.sql); updating per price pair: %s", e
+                )
+                use_rpc = False
+        if not use_rpc:
+            written.update(_update_pricing_chunk_by_price_pair(supabase, chunk))
+        if progress is not None:
+            progress(start + len(chunk), len(rows))
+    not_found = [pid for pid in latest if pid not in written]
+    return {"success": True, "updated": len(latest) - len(not_found), "not_found": not_found}
@@ -1,10 +1,25 @@
 """
-Marley product definitions. Always reads from Supabase (public.products).
+Marley product definitions, read from Supabase (public.products).
+
+/api/products is served from a process-local catalog index: the table is read once, then
+search / category / profile filters run in memory. The index is rebuilt after
+invalidate_product_catalog_index() (update-pricing, CSV import; also bumps the catalog
+revision) or when it is older than CATALOG_INDEX_TTL_SECONDS (default 300; 0 rebuilds on
+every call), which picks up changes made by other workers.
+
+The job performance sync prices ServiceM8 job materials from get_material_cost_map(), one
+products query per run; with MATERIAL_COST_CACHE_TTL_SECONDS set the map is also kept
+process-wide until the catalog revision changes or the TTL passes.
 """
+import itertools
 import logging
+import os
+import threading
+import time
 from pathlib import Path
 from typing import Optional, TypedDict
 
+from app.catalog_revision import bump_catalog_revision, catalog_cache_ttl_seconds, get_catalog_revision
 from app.supabase_client import get_supabase
 
 logger = logging.getLogger(__name__)
@@ -49,27 +64,184 @@ def _row_to_product(row: dict) -> Product:
     }
 
 
+_PRODUCT_COLUMNS = "id, name, category, thumbnail_url, diagram_url, profile"
+# Search matches substrings of name or id; postings are kept for every 1-3 character slice, and
+# longer queries intersect the postings of their 3-character slices before a final substring check.
+_MAX_GRAM = 3
+
+
+_index_build_ids = itertools.count(1)
+
+
+class ProductCatalogIndex:
+    """Immutable in-memory index over the products table (built by build_product_catalog_index)."""
+
+    def __init__(self, rows: list[dict]):
+        self.build_id = next(_index_build_ids)
+        self.products: tuple[Product, ...] = tuple(_row_to_product(r) for r in rows)
+        self._names = tuple(p["name"].lower() for p in self.products)
+        self._ids = tuple(p["id"].lower() for p in self.products)
+        grams: dict[str, set[int]] = {}
+        by_category: dict[str, list[int]] = {}
+        by_profile: dict[Optional[str], list[int]] = {}
+        for i, row in enumerate(rows):
+            for text in (self._names[i], self._ids[i]):
+                for n in range(1, _MAX_GRAM + 1):
+                    for start in range(len(text) - n + 1):
+                        grams.setdefault(text[start:start + n], set()).add(i)
+            by_category.setdefault(self.products[i]["category"], []).append(i)
+            # Profile filter matches the stored column (NULL profiles are listed as "other" but not filtered as it).
+            by_profile.setdefault(row.get("profile"), []).append(i)
+        self._grams = {g: frozenset(ids) for g, ids in grams.items()}
+        self._by_category = {c: frozenset(ids) for c, ids in by_category.items()}
+        self._by_profile = {p: frozenset(ids) for p, ids in by_profile.items()}
+
+    def _search_candidates(self, q: str) -> frozenset[int]:
+        if len(q) <= _MAX_GRAM:
+            return self._grams.get(q, frozenset())
+        postings = []
+        for start in range(len(q) - _MAX_GRAM + 1):
+            ids = self._grams.get(q[start:start + _MAX_GRAM])
+            if not ids:
+                return frozenset()
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return frozenset(i for i in candidates if q in self._names[i] or q in self._ids[i])
+
+    def query(
+        self,
+        search: Optional[str] = None,
+        category: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> list[Product]:
+        """Same filters as get_products; results keep table order."""
+        selected: Optional[frozenset[int]] = None
+        if profile and profile in ("storm_cloud", "classic", "other"):
+            selected = self._by_profile.get(profile, frozenset())
+        if category:
+            bucket = self._by_category.get(category, frozenset())
+            selected = bucket if selected is None else selected & bucket
+        if search:
+            matches = self._search_candidates(search.lower())
+            selected = matches if selected is None else selected & matches
+        if selected is None:
+            return list(self.products)
+        return [self.products[i] for i in sorted(selected)]
+
+
+_catalog_index: Optional[ProductCatalogIndex] = None
+_catalog_index_built_at = 0.0
+_catalog_index_generation = 0
+_catalog_index_lock = threading.Lock()
+
+
+def build_product_catalog_index() -> ProductCatalogIndex:
+    """Read the full products table and index it. Raises on Supabase errors."""
+    supabase = get_supabase()
+    resp = supabase.table("products").select(_PRODUCT_COLUMNS).execute()
+    return ProductCatalogIndex(resp.data or [])
+
+
+def get_product_catalog_index() -> ProductCatalogIndex:
+    """Current catalog index, building it on first use, after invalidation or once the TTL has passed."""
+    global _catalog_index, _catalog_index_built_at
+    index = _catalog_index
+    ttl = catalog_cache_ttl_seconds()
+    if index is not None and ttl > 0 and time.monotonic() - _catalog_index_built_at < ttl:
+        return index
+    with _catalog_index_lock:
+        index = _catalog_index
+        if index is not None and ttl > 0 and time.monotonic() - _catalog_index_built_at < ttl:
+            return index
+        generation = _catalog_index_generation
+        index = build_product_catalog_index()
+        # Don't publish an index read before a concurrent invalidation; the next call rebuilds.
+        if generation == _catalog_index_generation:
+            _catalog_index = index
+            _catalog_index_built_at = time.monotonic()
+        return index
+
+
+def invalidate_product_catalog_index() -> None:
+    """Drop the catalog index (the next /api/products call rebuilds it) and bump the catalog revision."""
+    global _catalog_index, _catalog_index_generation
+    _catalog_index = None
+    _catalog_index_generation += 1
+    bump_catalog_revision()
+
+
+DEFAULT_MATERIAL_COST_CACHE_TTL_SECONDS = 0.0
+# (catalog revision, loaded_at monotonic, servicem8_material_uuid -> cost_price)
+_material_costs: Optional[tuple[int, float, dict[str, float]]] = None
+_material_costs_lock = threading.Lock()
+
+
+def material_cost_cache_ttl_seconds() -> float:
+    """MATERIAL_COST_CACHE_TTL_SECONDS (default 0: no process-wide cache, load once per sync run)."""
+    raw = os.environ.get("MATERIAL_COST_CACHE_TTL_SECONDS", "").strip()
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            logger.warning("Invalid MATERIAL_COST_CACHE_TTL_SECONDS=%r; using default.", raw)
+    return DEFAULT_MATERIAL_COST_CACHE_TTL_SECONDS
+
+
+def load_material_cost_map(supabase) -> dict[str, float]:
+    """servicem8_material_uuid -> cost_price for every product that has both, in one query. Raises on Supabase errors."""
+    resp = supabase.table("products").select("servicem8_material_uuid, cost_price").execute()
+    costs: dict[str, float] = {}
+    for r in resp.data or []:
+        uuid_val = (r.get("servicem8_material_uuid") or "").strip()
+        cost = r.get("cost_price")
+        if not uuid_val or cost is None:
+            continue
+        try:
+            costs[uuid_val] = float(cost)
+        except (TypeError, ValueError):
+            pass
+    return costs
+
+
+def get_material_cost_map(supabase=None) -> dict[str, float]:
+    """
+    Material cost map for pricing ServiceM8 job materials (treat as read-only; it may be shared).
+    Served from the process-wide cache while the catalog revision is unchanged (update-pricing and
+    CSV import bump it) and younger than MATERIAL_COST_CACHE_TTL_SECONDS; otherwise loaded fresh.
+    """
+    global _material_costs
+    supabase = supabase or get_supabase()
+    ttl = material_cost_cache_ttl_seconds()
+    if ttl <= 0:
+        return load_material_cost_map(supabase)
+    revision = get_catalog_revision()
+    with _material_costs_lock:
+        cached = _material_costs
+    if cached is not None and cached[0] == revision and time.monotonic() - cached[1] < ttl:
+        return cached[2]
+    costs = load_material_cost_map(supabase)
+    with _material_costs_lock:
+        _material_costs = (revision, time.monotonic(), costs)
+    return costs
+
+
+def invalidate_material_cost_map() -> None:
+    """Drop the process-wide material cost map (catalog revision bumps also make it stale)."""
+    global _material_costs
+    with _material_costs_lock:
+        _material_costs = None
+
+
 def get_products(
     search: Optional[str] = None,
     category: Optional[str] = None,
     profile: Optional[str] = None,
 ) -> list[Product]:
-    """Return products from Supabase (public.products). Optional search, category, profile filter."""
-    supabase = get_supabase()
+    """Return products from the catalog index (public.products). Optional search, category, profile filter."""
     try:
-        query = supabase.table("products").select("id, name, category, thumbnail_url, diagram_url, profile")
-        if profile and profile in ("storm_cloud", "classic", "other"):
-            query = query.eq("profile", profile)
-        resp = query.execute()
-        rows = resp.data or []
-        out = [_row_to_product(r) for r in rows]
+        index = get_product_catalog_index()
     except Exception as e:
         logger.exception("Failed to fetch products from Supabase: %s", e)
-        out = []
-
-    if search:
-        q = search.lower()
-        out = [p for p in out if q in p["name"].lower() or q in p["id"].lower()]
-    if category:
-        out = [p for p in out if p["category"] == category]
-    return out
+        return []
+    return index.query(search=search, category=category, profile=profile)
@@ -0,0 +1,100 @@
+"""
+Quote line pricing shared by /api/calculate-quote and /api/calculate-quote/batch.
+Takes already-expanded material elements (see gutter_accessories) plus labour lines and
+prices them from a pricing map (app.pricing.get_product_pricing). No I/O happens here.
+"""
+from typing import Any
+
+from app.pricing import ProductPricing
+
+
+class QuotePricingError(ValueError):
+    """Raised when a quote line references a product that is missing or has no pricing."""
+
+    def __init__(self, product_id: str, message: str):
+        super().__init__(message)
+        self.product_id = product_id
+
+
+def quote_product_ids(elements_for_quote: list[dict[str, Any]], labour_elements: list[dict[str, Any]]) -> set[str]:
+    """Every product ID a quote needs pricing for (expanded materials + labour)."""
+    return {e["assetId"] for e in elements_for_quote} | {e["assetId"] for e in labour_elements}
+
+
+def _running_sum(values: list[float]) -> float:
+    """Left-to-right float sum (same result as `total += v`; builtin sum() compensates on 3.12+)."""
+    total = 0.0
+    for v in values:
+        total += v
+    return total
+
+
+def _sell_price_column(product_ids: list[str], pricing: dict[str, ProductPricing]) -> list[float]:
+    """Per-line sell price; each distinct product is priced (and rounded) once."""
+    sell_by_id: dict[str, float] = {}
+    for pid in product_ids:
+        if pid not in sell_by_id:
+            p = pricing[pid]
+            sell_by_id[pid] = round(p["cost_price"] * (1 + p["markup_percentage"] / 100), 2)
+    return [sell_by_id[pid] for pid in product_ids]
+
+
+def build_quote(
+    elements_for_quote: list[dict[str, Any]],
+    labour_elements: list[dict[str, Any]],
+    pricing: dict[str, ProductPricing],
+) -> dict[str, Any]:
+    """
+    Price materials and labour. Sell price = cost × (1 + markup%), rounded to 2 dp per unit;
+    line totals and subtotals are rounded to 2 dp. Labour quantity is hours.
+    Lines are priced column-wise (ids, quantities, sell prices, line totals) so a take-off
+    with thousands of lines is priced in a few list passes; results are identical to
+    pricing each line in turn.
+    Raises QuotePricingError for the first product not present in pricing.
+    """
+    material_ids = [e["assetId"] for e in elements_for_quote]
+    for pid in material_ids:
+        if pid not in pricing:
+            raise QuotePricingError(pid, f"Product {pid} not found or missing pricing")
+    labour_ids = [e["assetId"] for e in labour_elements]
+    for pid in labour_ids:
+        if pid not in pricing:
+            raise QuotePricingError(pid, f"Labour product {pid} not found or missing pricing")
+
+    # Materials
+    material_qtys = [e["quantity"] for e in elements_for_quote]
+    material_sell = _sell_price_column(material_ids, pricing)
+    material_totals = [round(sp * qty, 2) for sp, qty in zip(material_sell, material_qtys)]
+    materials = [
+        {
+            "id": pid,
+            "name": pricing[pid]["name"],
+            "qty": qty,
+            "cost_price": pricing[pid]["cost_price"],
+            "markup_percentage": pricing[pid]["markup_percentage"],
+            "sell_price": sp,
+            "line_total": lt,
+        }
+        for pid, qty, sp, lt in zip(material_ids, material_qtys, material_sell, material_totals)
+    ]
+    materials_subtotal = round(_running_sum(material_totals), 2)
+
+    # Labour from labour_elements (priced via products, e.g. REP-LAB)
+    labour_qtys = [e["quantity"] for e in labour_elements]
+    labour_sell = _sell_price_column(labour_ids, pricing)
+    labour_totals = [round(sp * hours, 2) for sp, hours in zip(labour_sell, labour_qtys)]
+    labour_hours = _running_sum(labour_qtys)
+    labour_subtotal = round(_running_sum(labour_totals), 2)
+    # Sell price per hour for display: first non-zero labour rate
+    labour_rate = next((sp for sp in labour_sell if sp != 0), 0.0)
+
+    total = round(materials_subtotal + labour_subtotal, 2)
+
+    return {
+        "materials": materials,
+        "materials_subtotal": materials_subtotal,
+        "labour_hours": labour_hours,
+        "labour_rate": labour_rate,
+        "labour_subtotal": labour_subtotal,
+        "total": total,
+    }
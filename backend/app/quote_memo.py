@@ -0,0 +1,132 @@
+"""
+Memoised /api/calculate-quote results.
+
+The quote modal recalculates on every edit and re-open, so the same canvas is quoted many times.
+A request is keyed by a canonical hash of its elements and labour lines plus the pricing cache
+version and measured rules snapshot version; computed responses are kept in a bounded LRU
+(QUOTE_MEMO_MAX_ENTRIES, default 512; 0 disables). Entries live no longer than the pricing cache
+TTL so a memoised quote is never older than the prices it would otherwise be built from.
+
+Each response also gets a strong ETag (hash of the response body) so clients can send
+If-None-Match and receive 304 when nothing changed.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.pricing import get_pricing_cache_ttl_seconds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUOTE_MEMO_MAX_ENTRIES = 512
+
+# key -> (stored_at, response payload, etag); most recently used last
+_quote_memo: "OrderedDict[str, tuple[float, dict[str, Any], str]]" = OrderedDict()
+_quote_memo_lock = threading.Lock()
+_quote_memo_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _quote_memo_max_entries() -> int:
+    raw = os.environ.get("QUOTE_MEMO_MAX_ENTRIES", "").strip()
+    if raw:
+        try:
+            return max(0, int(raw))
+        except ValueError:
+            logger.warning("Invalid QUOTE_MEMO_MAX_ENTRIES=%r; using default.", raw)
+    return DEFAULT_QUOTE_MEMO_MAX_ENTRIES
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def quote_request_key(
+    raw_elements: list[dict[str, Any]],
+    labour_elements: list[dict[str, Any]],
+    *,
+    pricing_version: int,
+    rules_version: int,
+) -> str:
+    """
+    Canonical hash of one quote request. Element order is kept (it decides the order of quote lines);
+    key order within each element and int/float spelling of quantities do not matter.
+    """
+    def _element(e: dict[str, Any]) -> list[Any]:
+        length_mm = e.get("length_mm")
+        return [
+            str(e.get("assetId") or ""),
+            float(e.get("quantity") or 0),
+            float(length_mm) if length_mm is not None else None,
+        ]
+
+    canonical = _canonical_json(
+        {
+            "elements": [_element(e) for e in raw_elements],
+            "labour": [_element(e) for e in labour_elements],
+            "pricing_version": pricing_version,
+            "rules_version": rules_version,
+        }
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def quote_etag(payload: dict[str, Any]) -> str:
+    """Strong ETag for a quote response body."""
+    digest = hashlib.sha256(_canonical_json(payload).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def get_memoised_quote(key: str) -> Optional[tuple[dict[str, Any], str]]:
+    """Cached (payload, etag) for key, or None when absent or older than the pricing cache TTL."""
+    ttl = get_pricing_cache_ttl_seconds()
+    now = time.monotonic()
+    with _quote_memo_lock:
+        entry = _quote_memo.get(key)
+        if entry is None or now - entry[0] >= ttl:
+            if entry is not None:
+                del _quote_memo[key]
+            _quote_memo_stats["misses"] += 1
+            return None
+        _quote_memo.move_to_end(key)
+        _quote_memo_stats["hits"] += 1
+        return entry[1], entry[2]
+
+
+def memoise_quote(key: str, payload: dict[str, Any]) -> str:
+    """Store a computed response under key (evicting least recently used entries). Returns its ETag."""
+    etag = quote_etag(payload)
+    max_entries = _quote_memo_max_entries()
+    if max_entries <= 0 or get_pricing_cache_ttl_seconds() <= 0:
+        return etag
+    with _quote_memo_lock:
+        _quote_memo[key] = (time.monotonic(), payload, etag)
+        _quote_memo.move_to_end(key)
+        while len(_quote_memo) > max_entries:
+            _quote_memo.popitem(last=False)
+            _quote_memo_stats["evictions"] += 1
+    return etag
+
+
+def clear_quote_memo() -> None:
+    with _quote_memo_lock:
+        _quote_memo.clear()
+
+
+def get_quote_memo_stats() -> dict[str, Any]:
+    with _quote_memo_lock:
+        hits = _quote_memo_stats["hits"]
+        misses = _quote_memo_stats["misses"]
+        lookups = hits + misses
+        return {
+            "entries": len(_quote_memo),
+            "max_entries": _quote_memo_max_entries(),
+            "hits": hits,
+            "misses": misses,
+            "evictions": _quote_memo_stats["evictions"],
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
@@ -101,3 +101,52 @@ def get_active_quote_for_job(supabase: Any, servicem8_job_id: str) -> Optional[d
     except Exception as e:
         logger.warning("get_active_quote_for_job failed for servicem8_job_id=%s: %s", job_id, e)
         return None
+
+
+# Rows per read of get_active_quotes_for_jobs: Supabase's default PostgREST max-rows, so a full page
+# means there may be more. Ids per read are capped too (they travel in the URL).
+_ACTIVE_QUOTES_PAGE_SIZE = 1000
+_ACTIVE_QUOTES_ID_CHUNK_SIZE = 200
+
+
+def _active_quote_key(row: dict[str, Any]) -> tuple[bool, bool, bool, str]:
+    """
+    Sort key (higher wins) matching get_active_quote_for_job's ORDER BY is_final_quote DESC,
+    updated_at DESC, where Postgres puts NULLs first in a descending sort.
+    """
+    final = row.get("is_final_quote")
+    updated_at = row.get("updated_at")
+    return (final is None, bool(final), updated_at is None, str(updated_at or ""))
+
+
+def get_active_quotes_for_jobs(supabase: Any, servicem8_job_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Active quote per ServiceM8 job for many jobs (job_performance sync batches): servicem8_job_id -> row,
+    chosen as in get_active_quote_for_job. Quotes are read in id chunks and paged, so a job with many
+    quotes can't push others past the server's row cap. Jobs without a quote are absent. Raises on query
+    failure so the caller can fail the batch rather than sync it without quotes.
+    """
+    job_ids = sorted({str(j).strip()[:32] for j in servicem8_job_ids if j and str(j).strip()})
+    active: dict[str, dict[str, Any]] = {}
+    for start in range(0, len(job_ids), _ACTIVE_QUOTES_ID_CHUNK_SIZE):
+        chunk = job_ids[start:start + _ACTIVE_QUOTES_ID_CHUNK_SIZE]
+        offset = 0
+        while True:
+            resp = (
+                supabase.table("quotes")
+                .select("id, labour_hours, created_by, co_seller_user_id, servicem8_job_id, is_final_quote, updated_at")
+                .in_("servicem8_job_id", chunk)
+                .order("id")
+                .range(offset, offset + _ACTIVE_QUOTES_PAGE_SIZE - 1)
+                .execute()
+            )
+            rows = resp.data or []
+            for row in rows:
+                job_id = str(row.get("servicem8_job_id") or "")
+                current = active.get(job_id)
+                if current is None or _active_quote_key(row) > _active_quote_key(current):
+                    active[job_id] = row
+            if len(rows) < _ACTIVE_QUOTES_PAGE_SIZE:
+                break
+            offset += _ACTIVE_QUOTES_PAGE_SIZE
+    return active
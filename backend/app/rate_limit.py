@@ -0,0 +1,56 @@
+"""
+Thread-safe token bucket used to pace outbound ServiceM8 API calls (app.servicem8.make_api_request).
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    rate tokens per second, up to burst tokens banked. acquire() blocks until a token is available
+    and returns the seconds it waited. rate <= 0 means unlimited (acquire only waits out a pause).
+    pause(seconds) holds every caller back until then, e.g. for a 429 Retry-After.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+        self.acquired = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """No tokens are handed out for the next `seconds` (extends, never shortens, a current pause)."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> float:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self.rate <= 0:
+                    self.acquired += 1
+                    self.waited_seconds += waited
+                    return waited
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.acquired += 1
+                        self.waited_seconds += waited
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
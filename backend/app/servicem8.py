@@ -1,21 +1,35 @@
 """
 ServiceM8 OAuth 2.0 integration for Quote App.
 See https://developer.servicem8.com/docs/authentication
+
+All HTTP calls (API, token endpoint, attachments) go through one process-wide pooled httpx.Client
+(keep-alive; HTTP/2 when the h2 package is installed) so sync and add-to-job reuse connections
+instead of paying a TCP + TLS handshake per request.
+
+API calls (make_api_request) are paced by one process-wide token bucket and retried on 429 / 5xx /
+transport errors with jittered exponential backoff, honouring Retry-After. See _send_api.
 """
 import base64
 import hashlib
 import hmac
+import importlib.util
 import logging
 import os
+import queue
+import random
 import secrets
+import threading
 import time
 import uuid as uuid_module
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Optional
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterable, Iterator, Optional
 from urllib.parse import urlencode
 
 import httpx
 
+from app.rate_limit import TokenBucket
 from app.supabase_client import get_supabase
 
 logger = logging.getLogger(__name__)
@@ -23,6 +37,247 @@ logger = logging.getLogger(__name__)
 # ServiceM8 OAuth endpoints
 AUTHORIZE_URL = "https://go.servicem8.com/oauth/authorize"
 TOKEN_URL = "https://go.servicem8.com/oauth/access_token"
+API_BASE_URL = "https://api.servicem8.com"
+
+DEFAULT_HTTP_TIMEOUT_SECONDS = 30.0
+DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+DEFAULT_HTTP_MAX_CONNECTIONS = 20
+DEFAULT_HTTP_MAX_KEEPALIVE = 10
+_HTTP_KEEPALIVE_EXPIRY_SECONDS = 30.0
+DEFAULT_RATE_PER_SECOND = 8.0
+DEFAULT_RATE_BURST = 8
+DEFAULT_MAX_RETRIES = 4
+_RETRY_BASE_SECONDS = 0.5
+_RETRY_MAX_SECONDS = 30.0
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+_rate_limiter: Optional[TokenBucket] = None
+_rate_limiter_lock = threading.Lock()
+_http_stats_lock = threading.Lock()
+_http_stats: dict[str, Any] = {
+    "requests": 0,
+    "errors": 0,
+    "total_seconds": 0.0,
+    "http_versions": {},
+    "clients_created": 0,
+    "retries": 0,
+    "retries_by_reason": {},
+    "rate_limited": 0,
+    "gave_up": 0,
+    "backoff_seconds": 0.0,
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    if raw:
+        try:
+            return max(0.0, float(raw))
+        except ValueError:
+            logger.warning("Invalid %s=%r; using default.", name, raw)
+    return default
+
+
+def api_base_url() -> str:
+    """SERVICEM8_API_BASE_URL when set (e.g. benchmarks.servicem8_simulator for offline load tests), else API_BASE_URL."""
+    return os.environ.get("SERVICEM8_API_BASE_URL", "").strip().rstrip("/") or API_BASE_URL
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Shared pooled client for ServiceM8. Timeouts: SERVICEM8_HTTP_TIMEOUT_SECONDS (default 30; connect 10).
+    Pool: SERVICEM8_HTTP_MAX_CONNECTIONS (default 20), SERVICEM8_HTTP_MAX_KEEPALIVE (default 10).
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None or _http_client.is_closed:
+            timeout = _env_float("SERVICEM8_HTTP_TIMEOUT_SECONDS", DEFAULT_HTTP_TIMEOUT_SECONDS)
+            _http_client = httpx.Client(
+                http2=_http2_available(),
+                timeout=httpx.Timeout(timeout, connect=min(timeout, DEFAULT_HTTP_CONNECT_TIMEOUT_SECONDS)),
+                limits=httpx.Limits(
+                    max_connections=int(_env_float("SERVICEM8_HTTP_MAX_CONNECTIONS", DEFAULT_HTTP_MAX_CONNECTIONS)) or None,
+                    max_keepalive_connections=int(_env_float("SERVICEM8_HTTP_MAX_KEEPALIVE", DEFAULT_HTTP_MAX_KEEPALIVE)),
+                    keepalive_expiry=_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+            with _http_stats_lock:
+                _http_stats["clients_created"] += 1
+        return _http_client
+
+
+def close_http_client() -> None:
+    """Close the pooled client (app shutdown); the next call opens a new one."""
+    global _http_client
+    with _http_client_lock:
+        client, _http_client = _http_client, None
+    if client is not None:
+        client.close()
+
+
+def _send(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """One request on the pooled client, recorded in the pool stats."""
+    started = time.perf_counter()
+    try:
+        resp = get_http_client().request(method, url, **kwargs)
+    except Exception:
+        with _http_stats_lock:
+            _http_stats["requests"] += 1
+            _http_stats["errors"] += 1
+            _http_stats["total_seconds"] += time.perf_counter() - started
+        raise
+    with _http_stats_lock:
+        _http_stats["requests"] += 1
+        _http_stats["total_seconds"] += time.perf_counter() - started
+        versions = _http_stats["http_versions"]
+        versions[resp.http_version] = versions.get(resp.http_version, 0) + 1
+    return resp
+
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Process-wide token bucket for ServiceM8 API calls: SERVICEM8_RATE_PER_SECOND (default 8; 0 = unlimited)
+    with bursts of SERVICEM8_RATE_BURST (default 8). A 429 pauses it for every caller.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = TokenBucket(
+                _env_float("SERVICEM8_RATE_PER_SECOND", DEFAULT_RATE_PER_SECOND),
+                burst=int(_env_float("SERVICEM8_RATE_BURST", DEFAULT_RATE_BURST)),
+            )
+        return _rate_limiter
+
+
+def reset_rate_limiter() -> None:
+    """Drop the limiter so the next call re-reads its settings (tests, config changes)."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = None
+
+
+def _retry_after_seconds(resp: httpx.Response) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date); None when absent or unparseable."""
+    raw = (resp.headers.get("retry-after") or "").strip()
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number attempt (0-based)."""
+    return random.uniform(0, min(_RETRY_MAX_SECONDS, _RETRY_BASE_SECONDS * (2 ** attempt)))
+
+
+def _record_retry(reason: str, delay: float) -> None:
+    with _http_stats_lock:
+        _http_stats["retries"] += 1
+        by_reason = _http_stats["retries_by_reason"]
+        by_reason[reason] = by_reason.get(reason, 0) + 1
+        _http_stats["backoff_seconds"] += delay
+        if reason == "429":
+            _http_stats["rate_limited"] += 1
+
+
+def _send_api(method: str, url: str, retry_unsafe: bool, **kwargs: Any) -> httpx.Response:
+    """
+    One API call under the shared rate limiter, retried up to SERVICEM8_MAX_RETRIES times (default 4).
+    Retried: 429 (always; ServiceM8 rejected it unprocessed), 5xx and read/other transport errors
+    (only when retry_unsafe, i.e. the request is idempotent), and connect errors (never sent).
+    Waits Retry-After when the response gives one, else jittered exponential backoff; a 429 also
+    pauses the limiter so concurrent callers back off together. When retries run out the last
+    response is returned (callers raise_for_status) or the last transport error raised.
+    """
+    limiter = get_rate_limiter()
+    max_retries = int(_env_float("SERVICEM8_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            resp = _send(method, url, **kwargs)
+        except httpx.TransportError as e:
+            retryable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)) or retry_unsafe
+            if not retryable or attempt >= max_retries:
+                if retryable:
+                    with _http_stats_lock:
+                        _http_stats["gave_up"] += 1
+                raise
+            delay = _backoff_seconds(attempt)
+            logger.info("ServiceM8 %s %s: %s; retry %d in %.2fs", method, url, e.__class__.__name__, attempt + 1, delay)
+            _record_retry("transport", delay)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        status = resp.status_code
+        if status not in _RETRYABLE_STATUSES or (status != 429 and not retry_unsafe):
+            return resp
+        if attempt >= max_retries:
+            with _http_stats_lock:
+                _http_stats["gave_up"] += 1
+            logger.warning("ServiceM8 %s %s: %s after %d retries; giving up", method, url, status, attempt)
+            return resp
+        retry_after = _retry_after_seconds(resp)
+        delay = min(_RETRY_MAX_SECONDS, retry_after) if retry_after is not None else _backoff_seconds(attempt)
+        if status == 429:
+            limiter.pause(delay)
+        logger.info("ServiceM8 %s %s: %s; retry %d in %.2fs", method, url, status, attempt + 1, delay)
+        _record_retry(str(status), delay)
+        resp.close()
+        if status != 429:
+            time.sleep(delay)  # 429: the paused limiter does the waiting on the next acquire
+        attempt += 1
+
+
+def get_http_client_stats() -> dict[str, Any]:
+    """
+    Pool stats for monitoring: request/error counts, mean latency, HTTP versions, open connections,
+    retries (by reason: status code or "transport"), 429s, calls that gave up after retrying, and
+    seconds spent in retry backoff and waiting on the rate limiter (throttle_wait_seconds).
+    """
+    with _http_stats_lock:
+        stats = {
+            **_http_stats,
+            "http_versions": dict(_http_stats["http_versions"]),
+            "retries_by_reason": dict(_http_stats["retries_by_reason"]),
+        }
+    requests = stats["requests"]
+    stats["mean_ms"] = round(stats.pop("total_seconds") / requests * 1000, 2) if requests else 0.0
+    stats["backoff_seconds"] = round(stats["backoff_seconds"], 3)
+    with _rate_limiter_lock:
+        limiter = _rate_limiter
+    stats["throttle_wait_seconds"] = round(limiter.waited_seconds, 3) if limiter is not None else 0.0
+    stats["http2_enabled"] = _http2_available()
+    connections = None
+    with _http_client_lock:
+        client = _http_client
+    if client is not None and not client.is_closed:
+        try:
+            # httpcore pool internals; best effort (not part of httpx's public API).
+            pool_connections = client._transport._pool.connections
+            connections = {
+                "open": len(pool_connections),
+                "idle": sum(1 for c in pool_connections if c.is_idle()),
+            }
+        except Exception:
+            connections = None
+    stats["connections"] = connections
+    return stats
 
 # Scopes for quote sync (Add to Job), attachments, and future job/materials/schedule operations
 DEFAULT_SCOPES = [
@@ -208,8 +463,7 @@ def exchange_code_for_tokens(code: str, redirect_uri: Optional[str] = None) -> d
         "code": code,
         "redirect_uri": redirect_uri,
     }
-    with httpx.Client() as client:
-        resp = client.post(TOKEN_URL, data=data)
+    resp = _send("POST", TOKEN_URL, data=data)
     resp.raise_for_status()
     return resp.json()
 
@@ -226,8 +480,7 @@ def refresh_access_token(refresh_token: str) -> dict[str, Any]:
         "client_secret": app_secret,
         "refresh_token": refresh_token,
     }
-    with httpx.Client() as client:
-        resp = client.post(TOKEN_URL, data=data)
+    resp = _send("POST", TOKEN_URL, data=data)
     resp.raise_for_status()
     return resp.json()
 
@@ -373,9 +626,10 @@ def make_api_request(
     params: Optional[dict[str, Any]] = None,
     json_data: Optional[dict[str, Any]] = None,
     use_bearer_header: bool = True,
+    idempotent: Optional[bool] = None,
 ) -> httpx.Response:
     """
-    Make a ServiceM8 API request with access token.
+    Make a ServiceM8 API request with access token (rate limited and retried; see _send_api).
     
     Per ServiceM8 docs (https://developer.servicem8.com/docs/authentication):
     - Option 1: Authorization header with "Bearer {token}" (recommended)
@@ -383,17 +637,19 @@ def make_api_request(
     
     Args:
         method: HTTP method (GET, POST, PUT, DELETE)
-        endpoint: API endpoint path (e.g. "/api_1.0/job.json")
+        endpoint: API endpoint path (e.g. "/api_1.0/job.json"), joined to api_base_url()
         access_token: OAuth access token
         params: Query parameters (for GET) or form data (for POST)
         json_data: JSON body (for POST/PUT)
         use_bearer_header: If True, use Authorization header; else use POST param
+        idempotent: Whether 5xx / read errors may be retried. Default: True for GET, PUT and DELETE,
+            and for a POST whose JSON body carries a client-generated uuid (a repeat updates the
+            same record instead of creating a duplicate).
     
     Returns:
-        httpx.Response
+        httpx.Response (the last attempt's, after any retries)
     """
-    base_url = "https://api.servicem8.com"
-    url = f"{base_url}{endpoint}"
+    url = f"{api_base_url()}{endpoint}"
     
     headers = {"Content-Type": "application/json"}
     
@@ -407,20 +663,22 @@ def make_api_request(
             params["access_token"] = access_token
         data = json_data if json_data else params
     
-    with httpx.Client() as client:
-        if method.upper() == "GET":
-            resp = client.get(url, params=params, headers=headers)
-        elif method.upper() == "POST":
-            if json_data:
-                resp = client.post(url, json=json_data, headers=headers)
-            else:
-                resp = client.post(url, data=data, headers=headers)
-        elif method.upper() == "PUT":
-            resp = client.put(url, json=json_data, headers=headers)
-        elif method.upper() == "DELETE":
-            resp = client.delete(url, params=params, headers=headers)
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method != "POST" or bool(json_data and json_data.get("uuid"))
+    if method == "GET":
+        resp = _send_api("GET", url, idempotent, params=params, headers=headers)
+    elif method == "POST":
+        if json_data:
+            resp = _send_api("POST", url, idempotent, json=json_data, headers=headers)
         else:
-            raise ValueError(f"Unsupported method: {method}")
+            resp = _send_api("POST", url, idempotent, data=data, headers=headers)
+    elif method == "PUT":
+        resp = _send_api("PUT", url, idempotent, json=json_data, headers=headers)
+    elif method == "DELETE":
+        resp = _send_api("DELETE", url, idempotent, params=params, headers=headers)
+    else:
+        raise ValueError(f"Unsupported method: {method}")
     
     return resp
 
@@ -473,40 +731,137 @@ def fetch_job_by_uuid(access_token: str, job_uuid: str) -> Optional[dict[str, An
         return None
 
 
-def list_jobs(access_token: str, status: str) -> list[dict[str, Any]]:
+def _fetch_page(
+    access_token: str, endpoint: str, filter_expr: Optional[str], cursor: str
+) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """One page of a cursor-paginated listing: (records, next cursor or None)."""
+    params: dict[str, Any] = {"cursor": cursor}
+    if filter_expr:
+        params["$filter"] = filter_expr
+    resp = make_api_request("GET", endpoint, access_token, params=params)
+    resp.raise_for_status()
+    data = resp.json()
+    # ServiceM8 returns next page cursor in header (case may vary)
+    next_cursor = resp.headers.get("x-next-cursor") or resp.headers.get("X-Next-Cursor")
+    return (data if isinstance(data, list) else []), (next_cursor or None)
+
+
+def iter_pages(
+    access_token: str, endpoint: str, filter_expr: Optional[str] = None, prefetch: bool = True
+) -> Iterator[list[dict[str, Any]]]:
     """
-    List ServiceM8 jobs filtered by status (e.g. 'Completed', 'Invoiced').
-    Uses cursor-based pagination (cursor=-1 then x-next-cursor header). Returns all pages merged.
+    Yield each page of a cursor-paginated listing (cursor=-1 then the x-next-cursor header).
+    With prefetch, the next page is requested on a helper thread as soon as its cursor is known, so
+    it downloads while the caller works on the current page (the cursor chain itself is sequential).
+    Raises httpx.HTTPError if a page still fails after make_api_request's retries.
     """
+    if not prefetch:
+        cursor: Optional[str] = "-1"
+        while cursor is not None:
+            page, cursor = _fetch_page(access_token, endpoint, filter_expr, cursor)
+            yield page
+        return
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="servicem8-page") as pool:
+        future: Optional[Future] = pool.submit(_fetch_page, access_token, endpoint, filter_expr, "-1")
+        while future is not None:
+            page, next_cursor = future.result()
+            future = pool.submit(_fetch_page, access_token, endpoint, filter_expr, next_cursor) if next_cursor else None
+            yield page
+
+
+def _jobs_filter(status: str, edited_since: Optional[str]) -> str:
+    # ServiceM8 requires value in single quotes; only `and` is supported for combining filters
+    filter_expr = f"status eq '{status}'"
+    if edited_since:
+        filter_expr += f" and edit_date gt '{edited_since}'"
+    return filter_expr
+
+
+def iter_jobs(access_token: str, status: str, edited_since: Optional[str] = None) -> Iterator[dict[str, Any]]:
+    """Jobs with the given status (optionally edited after edited_since), yielded page by page; see list_jobs."""
     status = str(status).strip()
     if not status:
-        return []
-    # ServiceM8 requires value in single quotes
-    filter_expr = f"status eq '{status}'"
-    all_jobs: list[dict[str, Any]] = []
-    cursor: Optional[str] = "-1"
+        return
+    for page in iter_pages(access_token, "/api_1.0/job.json", _jobs_filter(status, edited_since)):
+        yield from page
+
+
+_PAGES_DONE = object()
+
+
+def iter_job_pages(
+    access_token: str, statuses: Iterable[str], edited_since: Optional[str] = None
+) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+    """
+    Walk the job listings for several statuses (e.g. Completed and Invoiced) concurrently, one thread
+    per status, yielding (status, page) in arrival order. A small bounded queue keeps at most a couple
+    of pages per status waiting, so memory stays flat however long the listings are. The first error
+    from any listing is raised (after which the other listings are abandoned); 401s propagate so the
+    caller can refresh its token.
+    """
+    statuses = [str(s).strip() for s in statuses if s and str(s).strip()]
+    if not statuses:
+        return
+    pages: "queue.Queue[tuple[str, Any]]" = queue.Queue(maxsize=2 * len(statuses))
+    stop = threading.Event()
+
+    def put(item: tuple[str, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def walk(status: str) -> None:
+        try:
+            for page in iter_pages(access_token, "/api_1.0/job.json", _jobs_filter(status, edited_since)):
+                if not put((status, page)):
+                    return
+            put((status, _PAGES_DONE))
+        except Exception as e:
+            put((status, e))
+
+    for status in statuses:
+        threading.Thread(target=walk, args=(status,), name=f"servicem8-jobs-{status}", daemon=True).start()
+    remaining = len(statuses)
     try:
-        while cursor is not None:
-            params: dict[str, Any] = {"$filter": filter_expr}
-            if cursor:
-                params["cursor"] = cursor
-            resp = make_api_request("GET", "/api_1.0/job.json", access_token, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            page = data if isinstance(data, list) else []
-            all_jobs.extend(page)
-            # ServiceM8 returns next page cursor in header (case may vary)
-            next_cursor = resp.headers.get("x-next-cursor") or resp.headers.get("X-Next-Cursor")
-            cursor = next_cursor if next_cursor else None
-        return all_jobs
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 401:
-            raise  # Caller may retry with fresh token (59.20)
-        logger.warning("ServiceM8 list_jobs failed for status=%s: %s", status, e)
-        return all_jobs
-    except Exception as e:
+        while remaining:
+            status, item = pages.get()
+            if item is _PAGES_DONE:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                logger.warning("ServiceM8 job listing failed for status=%s: %s", status, item)
+                raise item
+            else:
+                yield status, item
+    finally:
+        stop.set()
+
+
+def list_jobs(access_token: str, status: str, edited_since: Optional[str] = None) -> list[dict[str, Any]]:
+    """
+    List ServiceM8 jobs filtered by status (e.g. 'Completed', 'Invoiced').
+    edited_since ('YYYY-MM-DD HH:MM:SS', ServiceM8 edit_date format) limits the listing to jobs
+    edited after that time (incremental sync).
+    Uses cursor-based pagination (cursor=-1 then x-next-cursor header). Returns all pages merged;
+    iter_jobs / iter_job_pages stream them instead.
+    Each page is retried by make_api_request; if one still fails the error is raised (httpx.HTTPError)
+    rather than returning the pages read so far, so a sync never mistakes a partial listing for a full one.
+    """
+    try:
+        return list(iter_jobs(access_token, status, edited_since))
+    except httpx.HTTPError as e:
+        # 401: caller may retry with fresh token (59.20)
         logger.warning("ServiceM8 list_jobs failed for status=%s: %s", status, e)
-        return all_jobs  # Return what we have so far
+        raise
+
+
+def iter_staff(access_token: str) -> Iterator[dict[str, Any]]:
+    """ServiceM8 staff yielded page by page (GET /api_1.0/staff.json). Raises httpx.HTTPError on failure."""
+    for page in iter_pages(access_token, "/api_1.0/staff.json", prefetch=False):
+        yield from page
 
 
 def list_staff(access_token: str) -> list[dict[str, Any]]:
@@ -515,10 +870,7 @@ def list_staff(access_token: str) -> list[dict[str, Any]]:
     GET /api_1.0/staff.json. Returns list of staff dicts (uuid, email, first, last, etc.).
     """
     try:
-        resp = make_api_request("GET", "/api_1.0/staff.json", access_token)
-        resp.raise_for_status()
-        data = resp.json()
-        return data if isinstance(data, list) else []
+        return list(iter_staff(access_token))
     except Exception as e:
         logger.warning("ServiceM8 list_staff failed: %s", e)
         return []
@@ -601,59 +953,119 @@ def _build_email_to_user_id_map(emails: set[str]) -> dict[str, str]:
     return out
 
 
-def list_job_materials(access_token: str, job_uuid: str) -> list[dict[str, Any]]:
-    """
-    List ServiceM8 job materials (line items) for a job. Used for job_performance.materials_cost (59.7).
-    GET /api_1.0/jobmaterial.json with $filter=job_uuid eq '<job_uuid>'. Returns list of raw JobMaterial dicts.
-    On error or invalid job_uuid returns [] so sync can continue with materials_cost=0.
-    """
+def _job_uuid_filter(job_uuid: str) -> Optional[str]:
+    """$filter for one job's child records, or None when job_uuid is empty / not a UUID (no API call)."""
     job_uuid = str(job_uuid).strip()
     if not job_uuid:
-        return []
+        return None
     try:
         uuid_module.UUID(job_uuid)
     except (ValueError, TypeError):
-        logger.debug("list_job_materials: invalid job_uuid format, skipping API call")
-        return []
-    filter_expr = f"job_uuid eq '{job_uuid}'"
+        logger.debug("invalid job_uuid format %r, skipping API call", job_uuid)
+        return None
+    return f"job_uuid eq '{job_uuid}'"
+
+
+def iter_job_materials(access_token: str, job_uuid: str) -> Iterator[dict[str, Any]]:
+    """One job's materials yielded page by page (see list_job_materials). Raises httpx.HTTPError on failure."""
+    filter_expr = _job_uuid_filter(job_uuid)
+    if filter_expr:
+        for page in iter_pages(access_token, "/api_1.0/jobmaterial.json", filter_expr, prefetch=False):
+            yield from page
+
+
+def iter_job_activities(access_token: str, job_uuid: str) -> Iterator[dict[str, Any]]:
+    """One job's activities yielded page by page (see list_job_activities). Raises httpx.HTTPError on failure."""
+    filter_expr = _job_uuid_filter(job_uuid)
+    if filter_expr:
+        for page in iter_pages(access_token, "/api_1.0/jobactivity.json", filter_expr, prefetch=False):
+            yield from page
+
+
+def list_job_materials(access_token: str, job_uuid: str, strict: bool = False) -> list[dict[str, Any]]:
+    """
+    List ServiceM8 job materials (line items) for a job. Used for job_performance.materials_cost (59.7).
+    GET /api_1.0/jobmaterial.json with $filter=job_uuid eq '<job_uuid>'. Returns list of raw JobMaterial dicts.
+    On error or invalid job_uuid returns [] so callers can continue with materials_cost=0; strict=True
+    re-raises errors instead (the sync fails the job rather than storing a cost of 0).
+    """
     try:
-        params: dict[str, Any] = {"$filter": filter_expr}
-        resp = make_api_request("GET", "/api_1.0/jobmaterial.json", access_token, params=params)
-        resp.raise_for_status()
-        data = resp.json()
-        return data if isinstance(data, list) else []
+        return list(iter_job_materials(access_token, job_uuid))
     except Exception as e:
         logger.warning("ServiceM8 list_job_materials failed for job_uuid=%s: %s", job_uuid, e)
+        if strict:
+            raise
         return []
 
 
-def list_job_activities(access_token: str, job_uuid: str) -> list[dict[str, Any]]:
+def list_job_activities(access_token: str, job_uuid: str, strict: bool = False) -> list[dict[str, Any]]:
     """
     List ServiceM8 job activities (schedule/time) for a job. Used for job_personnel baseline (59.8).
     GET /api_1.0/jobactivity.json with $filter=job_uuid eq '<job_uuid>'. Returns list of raw JobActivity dicts.
     Assignee field: staff_uuid. Duration/start/end field names to be confirmed from API response.
-    On error or invalid job_uuid returns [] so sync can continue.
+    On error or invalid job_uuid returns [] so callers can continue; strict=True re-raises errors instead.
     """
-    job_uuid = str(job_uuid).strip()
-    if not job_uuid:
-        return []
     try:
-        uuid_module.UUID(job_uuid)
-    except (ValueError, TypeError):
-        logger.debug("list_job_activities: invalid job_uuid format, skipping API call")
-        return []
-    filter_expr = f"job_uuid eq '{job_uuid}'"
-    try:
-        params: dict[str, Any] = {"$filter": filter_expr}
-        resp = make_api_request("GET", "/api_1.0/jobactivity.json", access_token, params=params)
-        resp.raise_for_status()
-        data = resp.json()
-        return data if isinstance(data, list) else []
+        return list(iter_job_activities(access_token, job_uuid))
     except Exception as e:
         logger.warning("ServiceM8 list_job_activities failed for job_uuid=%s: %s", job_uuid, e)
+        if strict:
+            raise
         return []
 
 
+def _group_by_job_uuid(
+    records: Iterable[dict[str, Any]], job_uuids: Optional[Iterable[str]]
+) -> dict[str, list[dict[str, Any]]]:
+    wanted = {str(u).strip() for u in job_uuids if u} if job_uuids is not None else None
+    grouped: dict[str, list[dict[str, Any]]] = {u: [] for u in wanted} if wanted is not None else {}
+    for record in records:
+        job_uuid = str(record.get("job_uuid") or "").strip()
+        if not job_uuid or (wanted is not None and job_uuid not in wanted):
+            continue
+        grouped.setdefault(job_uuid, []).append(record)
+    return grouped
+
+
+def _list_grouped_by_job(
+    access_token: str,
+    endpoint: str,
+    job_uuids: Optional[Iterable[str]],
+    edited_since: Optional[str],
+) -> dict[str, list[dict[str, Any]]]:
+    # ServiceM8 filters only combine with `and` (no `or` / `in`), so many jobs cannot be named in one
+    # filter: stream the whole listing (optionally an edit_date window) and keep only the wanted jobs.
+    filter_expr = f"edit_date gt '{edited_since}'" if edited_since else None
+    records = (r for page in iter_pages(access_token, endpoint, filter_expr) for r in page)
+    return _group_by_job_uuid(records, job_uuids)
+
+
+def list_job_materials_bulk(
+    access_token: str,
+    job_uuids: Optional[Iterable[str]] = None,
+    edited_since: Optional[str] = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Job materials for many jobs in a few paged calls instead of one call per job (job performance sync).
+    Pages through /api_1.0/jobmaterial.json (only lines edited after edited_since, if given) and returns
+    job_uuid -> list of raw JobMaterial dicts. With job_uuids, only those jobs are kept and each has an
+    entry (empty list when it has no materials). Raises httpx.HTTPError if a page fails after retries.
+    """
+    return _list_grouped_by_job(access_token, "/api_1.0/jobmaterial.json", job_uuids, edited_since)
+
+
+def list_job_activities_bulk(
+    access_token: str,
+    job_uuids: Optional[Iterable[str]] = None,
+    edited_since: Optional[str] = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Job activities for many jobs in a few paged calls (job_personnel baseline); same contract as
+    list_job_materials_bulk over /api_1.0/jobactivity.json.
+    """
+    return _list_grouped_by_job(access_token, "/api_1.0/jobactivity.json", job_uuids, edited_since)
+
+
 def create_job_activity(
     access_token: str,
     job_uuid: str,
@@ -766,6 +1178,7 @@ def add_job_material(
     """
     mat_uuid = material_uuid or ADD_TO_JOB_DEFAULT_MATERIAL_UUID
     payload = {
+        "uuid": str(uuid_module.uuid4()),  # client-generated so a retried POST cannot add the line twice
         "job_uuid": job_uuid,
         "material_uuid": mat_uuid,
         "name": name,
@@ -797,6 +1210,7 @@ def add_job_note(access_token: str, job_uuid: str, note_text: str) -> tuple[bool
     Returns (success, error_message).
     """
     payload = {
+        "uuid": str(uuid_module.uuid4()),  # client-generated so a retried POST cannot add the note twice
         "related_object": "job",
         "related_object_uuid": job_uuid,
         "note": note_text,
@@ -829,11 +1243,10 @@ def upload_job_attachment(
     Requires OAuth scope: manage_attachments.
     Returns (success, error_message, response_body).
     """
-    base_url = "https://api.servicem8.com"
     headers = {"Authorization": f"Bearer {access_token}"}
 
     # Step 1: Create attachment record (metadata only, no file)
-    create_url = f"{base_url}/api_1.0/Attachment.json"
+    create_url = f"{api_base_url()}/api_1.0/Attachment.json"
     create_payload = {
         "related_object": "job",
         "related_object_uuid": job_uuid,
@@ -842,12 +1255,12 @@ def upload_job_attachment(
         "active": True,
     }
     try:
-        with httpx.Client() as client:
-            create_resp = client.post(
-                create_url,
-                json=create_payload,
-                headers={**headers, "Content-Type": "application/json", "Accept": "application/json"},
-            )
+        create_resp = _send(
+            "POST",
+            create_url,
+            json=create_payload,
+            headers={**headers, "Content-Type": "application/json", "Accept": "application/json"},
+        )
         create_resp.raise_for_status()
     except httpx.HTTPStatusError as e:
         err_body = e.response.text
@@ -868,11 +1281,10 @@ def upload_job_attachment(
     logger.info("ServiceM8 attachment record created: uuid=%s", attachment_uuid)
 
     # Step 2: Submit file data to Attachment/{uuid}.file
-    file_url = f"{base_url}/api_1.0/Attachment/{attachment_uuid}.file"
+    file_url = f"{api_base_url()}/api_1.0/Attachment/{attachment_uuid}.file"
     files = {"file": (attachment_name, image_bytes, "image/png")}
     try:
-        with httpx.Client() as client:
-            file_resp = client.post(file_url, files=files, headers=headers)
+        file_resp = _send("POST", file_url, files=files, headers=headers)
         file_resp.raise_for_status()
     except httpx.HTTPStatusError as e:
         err_body = e.response.text
@@ -18,13 +18,10 @@ def _load_dotenv() -> None:
 _load_dotenv()
 
 _supabase_client = None
+_async_supabase_client = None
 
 
-def get_supabase():
-    """Return the Supabase client. Uses service_role key if set, else anon key (read-only). Raises if URL and at least one key are missing."""
-    global _supabase_client
-    if _supabase_client is not None:
-        return _supabase_client
+def _supabase_credentials() -> tuple[str, str]:
     url = os.environ.get("SUPABASE_URL", "").strip()
     key = (
         os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "").strip()
@@ -36,7 +33,42 @@ def get_supabase():
             "SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY (anon is enough for products). "
             "Get keys from: Supabase dashboard → Jacks Quote App → Settings → API."
         )
+    return url, key
+
+
+def get_supabase():
+    """Return the Supabase client. Uses service_role key if set, else anon key (read-only). Raises if URL and at least one key are missing."""
+    global _supabase_client
+    if _supabase_client is not None:
+        return _supabase_client
+    url, key = _supabase_credentials()
     from supabase import create_client
     client = create_client(url, key)
     _supabase_client = client
     return _supabase_client
+
+
+async def get_async_supabase():
+    """
+    Return the shared async Supabase client for async request handlers (e.g. /api/calculate-quote).
+    One client per process, so all awaiting requests share its HTTP connection pool instead of
+    holding threadpool workers on blocking reads. Same credentials and errors as get_supabase().
+    """
+    global _async_supabase_client
+    if _async_supabase_client is not None:
+        return _async_supabase_client
+    url, key = _supabase_credentials()
+    from supabase import acreate_client
+    client = await acreate_client(url, key)
+    # Another request may have created one while we awaited; keep the first so there is one pool.
+    if _async_supabase_client is None:
+        _async_supabase_client = client
+    return _async_supabase_client
+
+
+async def close_async_supabase() -> None:
+    """Close the async client's connection pool (app shutdown)."""
+    global _async_supabase_client
+    client, _async_supabase_client = _async_supabase_client, None
+    if client is not None:
+        await client.postgrest.aclose()
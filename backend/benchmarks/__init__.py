@@ -0,0 +1 @@
+# Performance benchmarks for the backend (not collected by the unit test runner)
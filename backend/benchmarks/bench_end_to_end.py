@@ -0,0 +1,289 @@
+"""
+End-to-end Supabase round-trip benchmark. The quote, bonus dashboard and job performance sync paths
+run hermetically against the in-memory Supabase stand-in (benchmarks/stub_supabase.py), the sync
+also against the local ServiceM8 simulator (benchmarks/servicem8_simulator.py). Each scenario
+reports wall time and Supabase round trips, total and by "<op> <table>", so a change that turns a
+batched read back into per-row queries shows up as a jump in the count rather than only as latency
+in production.
+
+  calculate_quote_cold  POST /api/calculate-quote with an empty pricing cache
+  calculate_quote_warm  the same request again (pricing cache and rules snapshot warm)
+  bonus_dashboard       GET /api/bonus/technician/dashboard over a period of --jobs jobs
+  job_sync_full         run_sync(full=True) over --jobs simulated ServiceM8 jobs
+  job_sync_incremental  run_sync() straight after (nothing changed in ServiceM8)
+
+--latency-ms is slept on every Supabase round trip (the simulator has its own --latency-ms).
+
+Usage (from backend/):
+  python -m benchmarks.bench_end_to_end [--jobs 200] [--latency-ms 0] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as backend_main  # noqa: E402
+from app import job_performance_sync, pricing, products, servicem8  # noqa: E402
+from app.gutter_accessories import DEFAULT_GUTTER_ACCESSORY_RULES  # noqa: E402
+from app.material_rules import refresh_measured_rules_snapshot  # noqa: E402
+from benchmarks.servicem8_simulator import ServiceM8Simulator, SimulatorConfig  # noqa: E402
+from benchmarks.stub_supabase import AsyncStubSupabase, StubSupabase, product_rows  # noqa: E402
+from benchmarks.synthetic import synthetic_elements, synthetic_product_ids  # noqa: E402
+
+_PERIOD_ID = "00000000-0000-4000-8000-000000000001"
+_ADMIN_ID = "00000000-0000-4000-8000-00000000a000"
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    elapsed_ms: float
+    round_trips: int
+    calls: dict[str, int] = field(default_factory=dict)
+
+
+def _measure(scenario: str, stubs: list[StubSupabase], fn: Callable[[], Any]) -> ScenarioResult:
+    for stub in stubs:
+        stub.reset_stats()
+    t0 = time.perf_counter()
+    fn()
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    calls: dict[str, int] = {}
+    for stub in stubs:
+        for key, n in stub.calls.items():
+            calls[key] = calls.get(key, 0) + n
+    return ScenarioResult(
+        scenario=scenario,
+        elapsed_ms=round(elapsed_ms, 2),
+        round_trips=sum(calls.values()),
+        calls=dict(sorted(calls.items())),
+    )
+
+
+def run_quote(latency: float = 0.0, elements: int = 100) -> list[ScenarioResult]:
+    """calculate-quote cold then warm for one synthetic diagram."""
+    diagram = synthetic_elements(elements, seed=elements)
+    tables = {
+        "products": product_rows(synthetic_product_ids(diagram)),
+        "measured_material_rules": [
+            {"id": 1, **DEFAULT_GUTTER_ACCESSORY_RULES, "updated_at": "2026-01-01T00:00:00+00:00", "updated_by": None}
+        ],
+    }
+    stub = StubSupabase(tables, latency=latency)
+    async_stub = AsyncStubSupabase(tables, latency=latency)
+
+    async def _get_async_stub():
+        return async_stub
+
+    body = {"elements": diagram, "labour_elements": [{"assetId": "REP-LAB", "quantity": 3.5}]}
+    with patch.object(pricing, "get_supabase", return_value=stub), patch.object(
+        pricing, "get_async_supabase", _get_async_stub
+    ), patch.object(backend_main, "get_async_supabase", _get_async_stub), patch.dict(
+        os.environ, {"QUOTE_MEMO_MAX_ENTRIES": "0"}
+    ):
+        refresh_measured_rules_snapshot(stub)
+        pricing.invalidate_pricing_cache()
+        client = TestClient(backend_main.app)
+
+        def _calculate():
+            resp = client.post("/api/calculate-quote", json=body)
+            if resp.status_code != 200:
+                raise RuntimeError(f"calculate-quote failed: {resp.status_code} {resp.text[:200]}")
+
+        cold = _measure("calculate_quote_cold", [stub, async_stub], _calculate)
+        warm = _measure("calculate_quote_warm", [stub, async_stub], _calculate)
+    return [cold, warm]
+
+
+def dashboard_tables(jobs: int, technicians: int = 8) -> tuple[dict[str, list[dict[str, Any]]], list[dict[str, Any]]]:
+    """Bonus tables for one open period of `jobs` jobs (half linked, half by created_at) and its auth users."""
+    tech_ids = [str(uuid.UUID(int=0xBEEF0000 + i, version=4)) for i in range(technicians)]
+    job_rows, personnel = [], []
+    for i in range(jobs):
+        job_id = str(uuid.UUID(int=0xC0DE0000 + i, version=4))
+        job_rows.append(
+            {
+                "id": job_id,
+                "servicem8_job_id": str(10000 + i),
+                "servicem8_job_uuid": None,
+                "bonus_period_id": _PERIOD_ID if i % 2 == 0 else None,
+                "status": "verified",
+                "created_at": f"2026-01-{1 + i % 14:02d}T09:00:00+00:00",
+                "invoiced_revenue_exc_gst": 1000 + (i % 7) * 150,
+                "materials_cost": 200 + (i % 5) * 20,
+                "quoted_labor_minutes": 120,
+                "is_callback": False,
+                "callback_reason": None,
+                "callback_cost": 0,
+                "standard_parts_runs": i % 2,
+                "seller_fault_parts_runs": 0,
+                "missed_materials_cost": 0,
+                "is_upsell": True,
+            }
+        )
+        for role, tech in (("seller", tech_ids[i % technicians]), ("executor", tech_ids[(i + 1) % technicians])):
+            personnel.append(
+                {
+                    "id": f"{job_id}-{role}",
+                    "job_performance_id": job_id,
+                    "technician_id": tech,
+                    "is_seller": role == "seller",
+                    "is_executor": role == "executor",
+                    "is_spotter": False,
+                    "onsite_minutes": 90 if role == "executor" else 0,
+                    "travel_shopping_minutes": 15 if role == "executor" else 0,
+                }
+            )
+    tables = {
+        "bonus_periods": [
+            {
+                "id": _PERIOD_ID,
+                "period_name": "Jan 1-14",
+                "start_date": "2026-01-01",
+                "end_date": "2026-01-14",
+                "status": "open",
+                "created_at": "2026-01-01T00:00:00+00:00",
+            }
+        ],
+        "job_performance": job_rows,
+        "job_personnel": personnel,
+        "servicem8_staff": [
+            {"email": f"tech{i}@example.com", "first_name": "Tech", "last_name": str(i), "active": True}
+            for i in range(technicians)
+        ],
+    }
+    users = [
+        {"id": tid, "email": f"tech{i}@example.com", "user_metadata": {"full_name": f"Tech {i}"}}
+        for i, tid in enumerate(tech_ids)
+    ]
+    return tables, users
+
+
+def run_dashboard(jobs: int = 200, latency: float = 0.0) -> list[ScenarioResult]:
+    """Technician dashboard (admin viewing the first technician) for the seeded open period."""
+    tables, users = dashboard_tables(jobs)
+    stub = StubSupabase(tables, latency=latency, users=users)
+    backend_main.app.dependency_overrides[backend_main._require_bonus_dashboard_reader] = lambda: (_ADMIN_ID, "admin")
+    try:
+        with patch.object(backend_main, "get_supabase", return_value=stub), patch.dict(
+            os.environ, {"SUPABASE_SERVICE_ROLE_KEY": "stub"}
+        ):
+            client = TestClient(backend_main.app)
+
+            def _dashboard():
+                resp = client.get("/api/bonus/technician/dashboard", params={"technician_id": users[0]["id"]})
+                if resp.status_code != 200:
+                    raise RuntimeError(f"dashboard failed: {resp.status_code} {resp.text[:200]}")
+                if resp.json()["ledger"]["job_count"] == 0:
+                    raise RuntimeError("dashboard returned an empty ledger")
+
+            return [_measure("bonus_dashboard", [stub], _dashboard)]
+    finally:
+        backend_main.app.dependency_overrides.pop(backend_main._require_bonus_dashboard_reader, None)
+
+
+def run_sync(jobs: int = 200, latency: float = 0.0, batch_size: int = 200) -> list[ScenarioResult]:
+    """Full then incremental job performance sync: ServiceM8 simulator + Supabase stand-in."""
+    config = SimulatorConfig(jobs=jobs, materials_per_job=4, activities_per_job=2, staff=8)
+    with ServiceM8Simulator(config) as sim:
+        material_uuids = sorted({m["material_uuid"] for m in sim.data["jobmaterials"]})
+        tables: dict[str, list[dict[str, Any]]] = {
+            "products": [
+                {"id": f"P{i}", "servicem8_material_uuid": mu, "cost_price": 5 + i % 9}
+                for i, mu in enumerate(material_uuids)
+            ],
+            "quotes": [
+                {
+                    "id": str(uuid.UUID(int=0xF00D0000 + i, version=4)),
+                    "servicem8_job_id": job["generated_job_id"],
+                    "labour_hours": 2.5,
+                    "created_by": _ADMIN_ID,
+                    "co_seller_user_id": None,
+                    "is_final_quote": True,
+                    "updated_at": "2026-01-01T00:00:00+00:00",
+                }
+                for i, job in enumerate(sim.data["jobs"])
+                if i % 2 == 0
+            ],
+        }
+        users = [
+            {"id": str(uuid.UUID(int=0xBEEF0000 + i, version=4)), "email": s["email"]}
+            for i, s in enumerate(sim.data["staff"])
+        ]
+        stub = StubSupabase(tables, latency=latency, users=users)
+        env = {
+            "SERVICEM8_API_BASE_URL": sim.url,
+            "SERVICEM8_RATE_PER_SECOND": "0",
+            "SERVICEM8_SYNC_BATCH_SIZE": str(batch_size),
+        }
+        with patch.dict(os.environ, env), patch.object(job_performance_sync, "get_supabase", return_value=stub), patch.object(
+            servicem8, "get_supabase", return_value=stub
+        ), patch.object(products, "get_supabase", return_value=stub), patch.object(
+            job_performance_sync, "get_sync_user_id", return_value=_ADMIN_ID
+        ), patch.object(
+            job_performance_sync, "get_tokens", return_value={"access_token": "stub-token"}
+        ):
+            servicem8.reset_rate_limiter()
+            servicem8.close_http_client()
+            products.invalidate_material_cost_map()
+            outcome: dict[str, Any] = {}
+
+            def _sync(full: bool) -> Callable[[], None]:
+                def _run() -> None:
+                    result = job_performance_sync.run_sync(full=full)
+                    if not result["success"]:
+                        raise RuntimeError(f"sync failed: {result['error'] or result['job_errors']}")
+                    outcome[full] = result
+
+                return _run
+
+            try:
+                full = _measure("job_sync_full", [stub], _sync(True))
+                incremental = _measure("job_sync_incremental", [stub], _sync(False))
+            finally:
+                servicem8.close_http_client()
+                servicem8.reset_rate_limiter()
+                products.invalidate_material_cost_map()
+    if outcome[True]["jobs_processed"] != jobs:
+        raise RuntimeError(f"full sync processed {outcome[True]['jobs_processed']} of {jobs} jobs")
+    return [full, incremental]
+
+
+def run(jobs: int = 200, latency: float = 0.0) -> list[ScenarioResult]:
+    return run_quote(latency) + run_dashboard(jobs, latency) + run_sync(jobs, latency)
+
+
+def _print_results(results: list[ScenarioResult]) -> None:
+    print(f"{'scenario':<24}{'ms':>10}{'trips':>8}  by table")
+    for r in results:
+        detail = ", ".join(f"{key}={n}" for key, n in r.calls.items())
+        print(f"{r.scenario:<24}{r.elapsed_ms:>10.1f}{r.round_trips:>8}  {detail}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end Supabase round-trip benchmark")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs in the bonus period and in ServiceM8")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency per Supabase round trip")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.jobs, args.latency_ms / 1000)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        _print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Micro-benchmark: accessory expansion before/after compiled rules (user-003).
+
+Compares the previous expand_elements_with_gutter_accessories (rules normalised and every
+asset re-classified on each call; frozen copy below as _legacy_expand) with the current
+compiled-rules implementation on synthetic diagrams, and checks both give identical output.
+
+Usage (from backend/):
+  python -m benchmarks.bench_gutter_accessories [--elements 1000] [--repeat 200]
+"""
+import argparse
+import math
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.gutter_accessories import (
+    _downpipe_clip_size,
+    _is_downpipe,
+    _is_downpipe_main,
+    _is_dropper,
+    _normalize_rules_config,
+    _parse_gutter,
+    compile_accessory_rules,
+    expand_elements_with_gutter_accessories,
+)
+from benchmarks.synthetic import synthetic_elements
+
+SAMPLE_RULES = {
+    "bracket_spacing_mm": 400,
+    "clip_spacing_mm": 1200,
+    "screws_per_bracket": 3,
+    "screws_per_dropper": 4,
+    "screws_per_saddle_clip": 2,
+    "screws_per_adjustable_clip": 2,
+    "screw_product_id": "SCR-SS",
+    "bracket_product_id_sc": "BRK-SC-MAR",
+    "bracket_product_id_cl": "BRK-CL-MAR",
+    "saddle_clip_product_id_65": "SCL-65",
+    "saddle_clip_product_id_80": "SCL-80",
+    "adjustable_clip_product_id_65": "ACL-65",
+    "adjustable_clip_product_id_80": "ACL-80",
+    "clip_selection_mode": "auto_by_acl_presence",
+}
+
+
+def _legacy_is_clip(asset_id: str, rules: dict[str, Any], prefix: str, keys: tuple[str, str]) -> bool:
+    a = (asset_id or "").strip().upper()
+    if a.startswith(prefix):
+        return True
+    mapped = {str(rules.get(k) or "").strip().upper() for k in keys}
+    mapped.discard("")
+    return a in mapped
+
+
+def _legacy_is_saddle_clip(asset_id: str, rules: dict[str, Any]) -> bool:
+    return _legacy_is_clip(asset_id, rules, "SCL-", ("saddle_clip_product_id_65", "saddle_clip_product_id_80"))
+
+
+def _legacy_is_adjustable_clip(asset_id: str, rules: dict[str, Any]) -> bool:
+    return _legacy_is_clip(asset_id, rules, "ACL-", ("adjustable_clip_product_id_65", "adjustable_clip_product_id_80"))
+
+
+def _legacy_expand(elements: list[dict], rules_config: Optional[dict[str, Any]] = None) -> list[dict]:
+    """Pre-compiled-rules implementation, kept verbatim in behaviour for comparison."""
+    rules = _normalize_rules_config(rules_config)
+    by_id: dict[str, float] = {}
+    mode = rules["clip_selection_mode"]
+    if mode == "force_adjustable":
+        has_adjustable_clip = True
+    elif mode == "force_saddle":
+        has_adjustable_clip = False
+    else:
+        has_adjustable_clip = any(_legacy_is_adjustable_clip(e.get("assetId", ""), rules) for e in elements)
+
+    sizes_with_length: set[str] = set()
+    for e in elements:
+        if _is_downpipe_main(e.get("assetId", "")):
+            lm = e.get("length_mm")
+            if lm is not None:
+                try:
+                    if float(lm) > 0:
+                        sizes_with_length.add(_downpipe_clip_size(e.get("assetId", "")) or "65")
+                except (TypeError, ValueError):
+                    pass
+
+    for e in elements:
+        asset_id = e.get("assetId", "")
+        qty = float(e.get("quantity", 0))
+        if qty <= 0:
+            continue
+        length_mm_arg = e.get("length_mm")
+        if length_mm_arg is not None:
+            try:
+                length_mm_arg = float(length_mm_arg)
+            except (TypeError, ValueError):
+                length_mm_arg = None
+        screw_product_id = str(rules["screw_product_id"])
+        parsed = _parse_gutter(asset_id)
+        if parsed:
+            profile, length_m = parsed
+            if length_mm_arg is not None and length_mm_arg >= 0:
+                total_mm = length_mm_arg
+            else:
+                total_mm = length_m * 1000 * qty
+            brackets_total = 1 + int(total_mm // int(rules["bracket_spacing_mm"]))
+            screws_total = brackets_total * int(rules["screws_per_bracket"])
+            if profile == "SC":
+                bracket_id = str(rules["bracket_product_id_sc"])
+            elif profile == "CL":
+                bracket_id = str(rules["bracket_product_id_cl"])
+            else:
+                bracket_id = f"BRK-{profile}-MAR"
+            by_id[asset_id] = by_id.get(asset_id, 0) + qty
+            by_id[bracket_id] = by_id.get(bracket_id, 0) + brackets_total
+            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + screws_total
+        elif _is_downpipe(asset_id):
+            by_id[asset_id] = by_id.get(asset_id, 0) + qty
+            size = _downpipe_clip_size(asset_id) or "65"
+            if has_adjustable_clip:
+                clip_id = str(rules["adjustable_clip_product_id_80" if size == "80" else "adjustable_clip_product_id_65"])
+                screws_per_clip = int(rules["screws_per_adjustable_clip"])
+            else:
+                clip_id = str(rules["saddle_clip_product_id_80" if size == "80" else "saddle_clip_product_id_65"])
+                screws_per_clip = int(rules["screws_per_saddle_clip"])
+            if length_mm_arg is not None and length_mm_arg > 0:
+                clips = max(1, math.ceil(length_mm_arg / int(rules["clip_spacing_mm"])))
+                by_id[clip_id] = by_id.get(clip_id, 0) + clips
+                by_id[screw_product_id] = by_id.get(screw_product_id, 0) + clips * screws_per_clip
+            elif size not in sizes_with_length:
+                by_id[clip_id] = by_id.get(clip_id, 0) + qty
+                by_id[screw_product_id] = by_id.get(screw_product_id, 0) + qty * screws_per_clip
+        elif _is_dropper(asset_id):
+            by_id[asset_id] = by_id.get(asset_id, 0) + qty
+            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + int(rules["screws_per_dropper"]) * qty
+        elif _legacy_is_saddle_clip(asset_id, rules):
+            by_id[asset_id] = by_id.get(asset_id, 0) + qty
+            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + int(rules["screws_per_saddle_clip"]) * qty
+        elif _legacy_is_adjustable_clip(asset_id, rules):
+            by_id[asset_id] = by_id.get(asset_id, 0) + qty
+            by_id[screw_product_id] = by_id.get(screw_product_id, 0) + int(rules["screws_per_adjustable_clip"]) * qty
+        else:
+            by_id[asset_id] = by_id.get(asset_id, 0) + qty
+    return [{"assetId": aid, "quantity": qty} for aid, qty in by_id.items() if qty > 0]
+
+
+def _per_call_us(fn, repeat: int) -> float:
+    fn()  # warm memo tables
+    best = min(timeit.repeat(fn, number=repeat, repeat=5))
+    return best / repeat * 1e6
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--elements", type=int, default=1000, help="Elements per synthetic diagram (default 1000)")
+    parser.add_argument("--repeat", type=int, default=200, help="Expansions per timing sample (default 200)")
+    args = parser.parse_args(argv)
+
+    elements = synthetic_elements(args.elements)
+    compiled = compile_accessory_rules(SAMPLE_RULES)
+
+    legacy_out = _legacy_expand(elements, SAMPLE_RULES)
+    if legacy_out != expand_elements_with_gutter_accessories(elements, rules_config=SAMPLE_RULES):
+        print("MISMATCH: compiled expansion differs from legacy expansion", file=sys.stderr)
+        return 1
+
+    legacy_us = _per_call_us(lambda: _legacy_expand(elements, SAMPLE_RULES), args.repeat)
+    raw_us = _per_call_us(lambda: expand_elements_with_gutter_accessories(elements, rules_config=SAMPLE_RULES), args.repeat)
+    compiled_us = _per_call_us(lambda: expand_elements_with_gutter_accessories(elements, rules_config=compiled), args.repeat)
+
+    print(f"Synthetic diagram: {args.elements} elements -> {len(legacy_out)} quote lines")
+    print(f"  legacy expansion            {legacy_us:10.1f} us/call")
+    print(f"  compiled (raw rules dict)   {raw_us:10.1f} us/call  ({legacy_us / raw_us:.2f}x)")
+    print(f"  compiled (precompiled)      {compiled_us:10.1f} us/call  ({legacy_us / compiled_us:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Quote path benchmark suite: synthetic diagrams from 10 to 10,000 elements (gutters, downpipes,
+droppers, clips, fittings) through
+
+  expand           expand_elements_with_gutter_accessories with the compiled measured rules
+  calculate_quote  POST /api/calculate-quote end to end (in-memory Supabase stub, warm pricing
+                   cache, quote memo off so every call is computed)
+
+For each case it reports ops/sec, p50/p99 latency, peak traced allocation per call (tracemalloc)
+and Supabase round trips per call, then compares against the stored baseline
+(benchmarks/baselines/quote_path.json). A case slower than baseline p50 by more than
+--tolerance, or allocating more than --alloc-tolerance over baseline, is a regression and the
+run exits 1. Baselines are machine-specific: refresh them with --update-baseline on the machine
+that runs the check.
+
+Usage (from backend/):
+  python -m benchmarks.bench_quote_path [--sizes 10,100,1000,10000] [--quick]
+  python -m benchmarks.bench_quote_path --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main as backend_main  # noqa: E402
+from app import pricing  # noqa: E402
+from app.gutter_accessories import DEFAULT_GUTTER_ACCESSORY_RULES, expand_elements_with_gutter_accessories  # noqa: E402
+from app.material_rules import get_measured_rules_snapshot, refresh_measured_rules_snapshot  # noqa: E402
+from benchmarks.stub_supabase import AsyncStubSupabase, StubSupabase, product_rows  # noqa: E402
+from benchmarks.synthetic import synthetic_elements, synthetic_product_ids  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "quote_path.json"
+# Timed calls per case, by diagram size (scaled down by --quick).
+ITERATIONS = {10: 400, 100: 200, 1000: 50, 10000: 12}
+
+
+@dataclass
+class CaseResult:
+    case: str
+    elements: int
+    iterations: int
+    ops_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    peak_alloc_kib: float
+    round_trips_per_call: float
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _peak_alloc_kib(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - base) / 1024
+
+
+def _run_case(case: str, size: int, fn: Callable[[], Any], iterations: int, stub: Any) -> CaseResult:
+    fn()  # warm caches (pricing cache, classification memo)
+    trips_before = stub.round_trips
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    round_trips = (stub.round_trips - trips_before) / iterations
+    return CaseResult(
+        case=case,
+        elements=size,
+        iterations=iterations,
+        ops_per_sec=round(1000 / statistics.fmean(samples), 2),
+        p50_ms=round(_percentile(samples, 50), 4),
+        p99_ms=round(_percentile(samples, 99), 4),
+        peak_alloc_kib=round(_peak_alloc_kib(fn), 1),
+        round_trips_per_call=round(round_trips, 3),
+    )
+
+
+def run_suite(sizes: tuple[int, ...] = DEFAULT_SIZES, quick: bool = False) -> list[CaseResult]:
+    """Run every case for every size; Supabase is the in-memory stub throughout."""
+    all_elements = {size: synthetic_elements(size, seed=size) for size in sizes}
+    product_ids: set[str] = set()
+    for elements in all_elements.values():
+        product_ids |= synthetic_product_ids(elements)
+    tables = {
+        "products": product_rows(product_ids),
+        "measured_material_rules": [
+            {"id": 1, **DEFAULT_GUTTER_ACCESSORY_RULES, "updated_at": "2026-01-01T00:00:00+00:00", "updated_by": None}
+        ],
+    }
+    stub = StubSupabase(tables)
+    async_stub = AsyncStubSupabase(tables)
+
+    async def _get_async_stub():
+        return async_stub
+
+    class _Trips:
+        @property
+        def round_trips(self) -> int:
+            return stub.round_trips + async_stub.round_trips
+
+    trips = _Trips()
+    results: list[CaseResult] = []
+    with patch.object(pricing, "get_supabase", return_value=stub), patch.object(
+        pricing, "get_async_supabase", _get_async_stub
+    ), patch.dict(os.environ, {"QUOTE_MEMO_MAX_ENTRIES": "0"}):
+        pricing.invalidate_pricing_cache()
+        refresh_measured_rules_snapshot(stub)
+        compiled = get_measured_rules_snapshot().compiled
+        client = TestClient(backend_main.app)
+        for size in sizes:
+            elements = all_elements[size]
+            iterations = max(3, ITERATIONS.get(size, 20) // (10 if quick else 1))
+            body = {"elements": elements, "labour_elements": [{"assetId": "REP-LAB", "quantity": 3.5}]}
+
+            def _expand(elements=elements):
+                expand_elements_with_gutter_accessories(elements, rules_config=compiled)
+
+            def _calculate(body=body):
+                resp = client.post("/api/calculate-quote", json=body)
+                if resp.status_code != 200:
+                    raise RuntimeError(f"calculate-quote failed: {resp.status_code} {resp.text[:200]}")
+
+            results.append(_run_case("expand", size, _expand, iterations, trips))
+            results.append(_run_case("calculate_quote", size, _calculate, iterations, trips))
+    return results
+
+
+def compare_to_baseline(
+    results: list[CaseResult],
+    baseline: dict[str, Any],
+    tolerance: float,
+    alloc_tolerance: float,
+) -> list[str]:
+    """Regression messages (empty when every case is within tolerance of its baseline)."""
+    by_key = {f"{c['case']}/{c['elements']}": c for c in baseline.get("cases", [])}
+    regressions = []
+    for r in results:
+        base = by_key.get(f"{r.case}/{r.elements}")
+        if not base:
+            continue
+        if r.p50_ms > base["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{r.case}/{r.elements}: p50 {r.p50_ms:.3f} ms vs baseline {base['p50_ms']:.3f} ms "
+                f"(+{(r.p50_ms / base['p50_ms'] - 1) * 100:.0f}%, limit +{tolerance * 100:.0f}%)"
+            )
+        if base["peak_alloc_kib"] > 0 and r.peak_alloc_kib > base["peak_alloc_kib"] * (1 + alloc_tolerance):
+            regressions.append(
+                f"{r.case}/{r.elements}: peak alloc {r.peak_alloc_kib:.1f} KiB vs baseline "
+                f"{base['peak_alloc_kib']:.1f} KiB (limit +{alloc_tolerance * 100:.0f}%)"
+            )
+        if r.round_trips_per_call > base["round_trips_per_call"]:
+            regressions.append(
+                f"{r.case}/{r.elements}: {r.round_trips_per_call} Supabase round trips per call "
+                f"vs baseline {base['round_trips_per_call']}"
+            )
+    return regressions
+
+
+def _print_results(results: list[CaseResult]) -> None:
+    print(f"{'case':<16}{'elements':>9}{'ops/sec':>12}{'p50 ms':>11}{'p99 ms':>11}{'peak KiB':>11}{'trips':>7}")
+    for r in results:
+        print(
+            f"{r.case:<16}{r.elements:>9}{r.ops_per_sec:>12.1f}{r.p50_ms:>11.3f}{r.p99_ms:>11.3f}"
+            f"{r.peak_alloc_kib:>11.1f}{r.round_trips_per_call:>7.2f}"
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Quote path benchmark suite")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated diagram sizes")
+    parser.add_argument("--quick", action="store_true", help="10x fewer iterations (smoke run)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed p50 slowdown vs baseline (default 0.5 = +50%%)")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.25, help="Allowed peak allocation growth (default 0.25)")
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s.strip())
+    results = run_suite(sizes, quick=args.quick)
+    _print_results(results)
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cases": [asdict(r) for r in results],
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return 0
+    regressions = compare_to_baseline(
+        results, json.loads(args.baseline.read_text()), args.tolerance, args.alloc_tolerance
+    )
+    if regressions:
+        print("\nREGRESSIONS against baseline:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    print("\nAll cases within baseline tolerance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Bulk update-pricing benchmark (user-014): N product price updates written the old way (one
+UPDATE ... WHERE id per product) vs app.pricing.update_product_pricing (one bulk_update_product_pricing
+call per chunk of 500), against the in-memory Supabase stub with simulated round-trip latency.
+Every product gets its own cost price, as in a normal pricing edit.
+
+Usage (from backend/):
+  python -m benchmarks.bench_update_pricing [--items 500] [--latency-ms 20] [--missing 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import pricing  # noqa: E402
+from benchmarks.stub_supabase import StubSupabase  # noqa: E402
+
+
+def _products(n: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": f"P-{i:05d}",
+            "name": f"Product {i}",
+            "category": "fitting",
+            "thumbnail_url": "/assets/marley/gutter.svg",
+            "diagram_url": "/assets/marley/gutter.svg",
+            "cost_price": 1.0 + i % 50,
+            "markup_percentage": 30.0,
+        }
+        for i in range(n)
+    ]
+
+
+def _updates(n: int, missing: int) -> list[dict[str, Any]]:
+    ups = [
+        {"id": f"P-{i:05d}", "cost_price": round(2.0 + i * 0.37, 2), "markup_percentage": 40.0 + i % 3 * 5}
+        for i in range(n - missing)
+    ]
+    ups += [{"id": f"MISSING-{i}", "cost_price": 1.0, "markup_percentage": 10.0} for i in range(missing)]
+    return ups
+
+
+def per_row_update(supabase: Any, updates: list[dict[str, Any]]) -> int:
+    """Reference: the pre-batching api_update_pricing loop."""
+    updated = 0
+    for item in updates:
+        resp = (
+            supabase.table("products")
+            .update({"cost_price": item["cost_price"], "markup_percentage": item["markup_percentage"]})
+            .eq("id", item["id"])
+            .execute()
+        )
+        if resp.data:
+            updated += len(resp.data)
+    return updated
+
+
+def run(items: int, latency: float, missing: int) -> dict[str, dict[str, float]]:
+    updates = _updates(items, missing)
+    results = {}
+
+    stub = StubSupabase({"products": _products(items)}, latency=latency)
+    t0 = time.perf_counter()
+    updated = per_row_update(stub, updates)
+    results["per_row"] = {"seconds": time.perf_counter() - t0, "round_trips": stub.round_trips, "updated": updated}
+
+    stub = StubSupabase({"products": _products(items)}, latency=latency)
+    with patch.object(pricing, "get_supabase", return_value=stub):
+        t0 = time.perf_counter()
+        out = pricing.update_product_pricing(updates)
+    results["batched"] = {"seconds": time.perf_counter() - t0, "round_trips": stub.round_trips, "updated": out["updated"]}
+    if len(out["not_found"]) != missing:
+        raise RuntimeError(f"expected {missing} not_found, got {out['not_found']}")
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk update-pricing benchmark")
+    parser.add_argument("--items", type=int, default=500, help="Products updated (default 500)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated Supabase round trip (default 20)")
+    parser.add_argument("--missing", type=int, default=5, help="Updates for unknown product ids (default 5)")
+    args = parser.parse_args(argv)
+
+    results = run(args.items, args.latency_ms / 1000, args.missing)
+    print(f"{args.items} updates ({args.missing} unknown ids), {args.latency_ms:.0f} ms simulated round trip")
+    for label, r in results.items():
+        print(f"  {label:<8} {r['seconds'] * 1000:9.1f} ms   {r['round_trips']:4d} round trips   {r['updated']} updated")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
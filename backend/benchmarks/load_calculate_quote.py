@@ -0,0 +1,165 @@
+"""
+Local load test: /api/calculate-quote under concurrent estimators (user-007).
+
+Starts the app under uvicorn in a child process with simulated Supabase latency on every
+pricing read (pricing cache and quote memo disabled so each request pays the round trip),
+then drives it from this process with N concurrent clients. Two routes are measured on the
+same server and middleware stack:
+  blocking  a sync reference handler doing the same expand/price/build work with the blocking
+            client (the pre-async shape: one threadpool worker held per in-flight read)
+  async     the real /api/calculate-quote on the shared async client
+While quotes are in flight a probe hits a trivial sync endpoint (/api/health), which shares the
+threadpool with blocking handlers.
+
+Usage (from backend/):
+  python -m benchmarks.load_calculate_quote [--concurrency 50] [--requests 1000] [--latency-ms 80]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import synthetic_elements  # noqa: E402
+
+BLOCKING_PATH = "/bench/calculate-quote-blocking"
+
+
+def _priced(product_ids: list[str]) -> dict[str, Any]:
+    return {
+        pid: {"id": pid, "name": pid, "cost_price": 10.0, "markup_percentage": 40.0, "unit": "each"}
+        for pid in product_ids
+    }
+
+
+def _serve(port: int, latency: float) -> None:
+    """Child process: patch Supabase reads with simulated latency and run the app."""
+    os.environ["PRICING_CACHE_TTL_SECONDS"] = "0"
+    os.environ["QUOTE_MEMO_MAX_ENTRIES"] = "0"
+    import uvicorn
+
+    import main as backend_main
+    from app import pricing
+    from app.gutter_accessories import expand_elements_with_gutter_accessories
+    from app.material_rules import _publish_measured_rules_snapshot
+    from app.quote_engine import build_quote, quote_product_ids
+
+    def _blocking_fetch(ids):
+        time.sleep(latency)
+        return _priced(ids)
+
+    async def _async_fetch(ids):
+        await asyncio.sleep(latency)
+        return _priced(ids)
+
+    pricing._fetch_product_pricing = _blocking_fetch
+    pricing._fetch_product_pricing_async = _async_fetch
+    _publish_measured_rules_snapshot(None, None)
+    app = backend_main.app
+    app.router.on_startup.clear()
+    app.router.on_shutdown.clear()
+
+    @app.post(BLOCKING_PATH)
+    def blocking_quote(body: backend_main.CalculateQuoteRequest):
+        raw_elements, labour_elements = backend_main._quote_request_elements(body)
+        elements_for_quote = expand_elements_with_gutter_accessories(raw_elements)
+        all_ids = list(quote_product_ids(elements_for_quote, labour_elements))
+        return {"quote": build_quote(elements_for_quote, labour_elements, pricing.get_product_pricing(all_ids))}
+
+    # Registered after the SPA routes; move it ahead so it is matched.
+    app.router.routes.insert(0, app.router.routes.pop())
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _drive(base_url: str, path: str, body: dict, concurrency: int, total: int) -> tuple[list[float], list[float], float]:
+    """Returns (quote latencies ms, health-probe latencies ms, elapsed s)."""
+    latencies: list[float] = []
+    probes: list[float] = []
+    remaining = [total]
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker() -> None:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                t0 = time.perf_counter()
+                resp = await client.post(path, json=body)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                resp.raise_for_status()
+
+        async def prober() -> None:
+            while remaining[0] > 0:
+                t0 = time.perf_counter()
+                await client.get("/api/health")
+                probes.append((time.perf_counter() - t0) * 1000)
+                await asyncio.sleep(0.02)
+
+        t_start = time.perf_counter()
+        await asyncio.gather(prober(), *(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t_start
+    return latencies, probes, elapsed
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent estimators (default 50)")
+    parser.add_argument("--requests", type=int, default=1000, help="Quote requests per route (default 1000)")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Simulated Supabase round trip (default 80)")
+    parser.add_argument("--elements", type=int, default=20, help="Elements per quote (default 20)")
+    args = parser.parse_args(argv)
+
+    port = _free_port()
+    server = multiprocessing.get_context("spawn").Process(target=_serve, args=(port, args.latency_ms / 1000), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(200):
+            try:
+                httpx.get(f"{base_url}/api/health", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.05)
+        else:
+            print("Server did not start", file=sys.stderr)
+            return 1
+
+        body = {"elements": synthetic_elements(args.elements), "labour_elements": [{"assetId": "REP-LAB", "quantity": 2}]}
+        print(
+            f"{args.concurrency} concurrent estimators, {args.requests} quotes per route, "
+            f"{args.elements} elements each, {args.latency_ms:.0f} ms simulated Supabase latency"
+        )
+        for label, path in (("blocking", BLOCKING_PATH), ("async", "/api/calculate-quote")):
+            latencies, probes, elapsed = asyncio.run(_drive(base_url, path, body, args.concurrency, args.requests))
+            print(
+                f"  {label:<9} {len(latencies) / elapsed:7.1f} req/s   p50 {_pct(latencies, 50):7.1f} ms   "
+                f"p99 {_pct(latencies, 99):7.1f} ms   /api/health p99 {_pct(probes, 99):7.1f} ms"
+            )
+    finally:
+        server.terminate()
+        server.join(5)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""
+Local ServiceM8 API stand-in for offline load tests and sync benchmarks. Serves the endpoints the
+app uses over plain HTTP (stdlib ThreadingHTTPServer, keep-alive):
+
+  GET  /api_1.0/job.json, jobmaterial.json, jobactivity.json, staff.json, jobcontact.json
+       $filter with `and`-joined eq/ne/gt/lt/ge/le clauses; cursor pagination (cursor=-1, then the
+       x-next-cursor response header) in pages of page_size; no cursor returns everything
+  POST /api_1.0/job.json, jobmaterial.json, jobactivity.json, note.json, jobcontact.json,
+       Attachment.json (create, or update when the body's uuid exists; x-record-uuid header),
+       Attachment/{uuid}.file
+
+The dataset is deterministic for a seed: `jobs` jobs alternating Completed / Invoiced with increasing
+edit_date, materials_per_job materials (drawn from a pool of material uuids) and activities_per_job
+activities each, and `staff` staff. Every request sleeps latency_ms; 429s (with Retry-After) can be
+injected every Nth request and/or at random. Requests without a Bearer token get 401.
+
+Point the app at it with SERVICEM8_API_BASE_URL=<simulator url>. Standalone (from backend/):
+  python -m benchmarks.servicem8_simulator [--jobs 5000] [--latency-ms 40] [--rate-limit-every 50] [--port 8765]
+In tests / benchmarks:
+  with ServiceM8Simulator(SimulatorConfig(jobs=200)) as sim:
+      os.environ["SERVICEM8_API_BASE_URL"] = sim.url
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+_FILTER_CLAUSE = re.compile(r"^\s*(\w+)\s+(eq|ne|gt|lt|ge|le)\s+'((?:[^']|'')*)'\s*$")
+_OPS = {
+    "eq": lambda a, b: a == b,
+    "ne": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "lt": lambda a, b: a < b,
+    "ge": lambda a, b: a >= b,
+    "le": lambda a, b: a <= b,
+}
+# path (lower-case, without /api_1.0/ and .json) -> collection
+_COLLECTIONS = {
+    "job": "jobs",
+    "jobmaterial": "jobmaterials",
+    "jobactivity": "jobactivities",
+    "staff": "staff",
+    "note": "notes",
+    "jobcontact": "jobcontacts",
+    "attachment": "attachments",
+}
+_START = datetime(2026, 1, 1, 8, 0, 0)
+_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+@dataclass
+class SimulatorConfig:
+    jobs: int = 1000
+    materials_per_job: int = 4
+    activities_per_job: int = 2
+    staff: int = 10
+    material_pool: int = 200
+    page_size: int = 500
+    latency_ms: float = 0.0
+    rate_limit_every: int = 0  # every Nth request answers 429 (0 = never)
+    rate_limit_probability: float = 0.0
+    retry_after_seconds: float = 1.0
+    seed: int = 1
+
+
+def parse_filter(expr: Optional[str]) -> list[tuple[str, str, str]]:
+    """ServiceM8 $filter -> [(field, op, value)]. Raises ValueError on anything unsupported (e.g. `or`)."""
+    if not expr:
+        return []
+    clauses = []
+    for part in re.split(r"\s+and\s+", expr.strip()):
+        m = _FILTER_CLAUSE.match(part)
+        if not m:
+            raise ValueError(f"Unsupported filter clause: {part!r}")
+        clauses.append((m.group(1), m.group(2), m.group(3).replace("''", "'")))
+    return clauses
+
+
+def _matches(record: dict[str, Any], clauses: list[tuple[str, str, str]]) -> bool:
+    return all(_OPS[op](str(record.get(field, "")), value) for field, op, value in clauses)
+
+
+def build_dataset(config: SimulatorConfig) -> dict[str, list[dict[str, Any]]]:
+    """Deterministic staff, jobs, job materials and job activities for config."""
+    rng = random.Random(config.seed)
+
+    def uid() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    staff = [
+        {"uuid": uid(), "first": "Tech", "last": str(i), "email": f"tech{i}@example.com", "active": 1}
+        for i in range(config.staff)
+    ]
+    material_uuids = [uid() for _ in range(max(1, config.material_pool))]
+    jobs, materials, activities = [], [], []
+    for i in range(config.jobs):
+        job_uuid = uid()
+        edited = _START + timedelta(minutes=i)
+        jobs.append(
+            {
+                "uuid": job_uuid,
+                "generated_job_id": str(10000 + i),
+                "status": "Completed" if i % 2 == 0 else "Invoiced",
+                "total_invoice_amount": f"{rng.uniform(200, 5000):.2f}",
+                "payment_date": (edited + timedelta(days=3)).strftime(_DATETIME_FORMAT) if i % 2 else "",
+                "edit_date": edited.strftime(_DATETIME_FORMAT),
+                "active": 1,
+            }
+        )
+        for _ in range(config.materials_per_job):
+            qty = rng.randint(1, 10)
+            cost = rng.uniform(2, 80)
+            materials.append(
+                {
+                    "uuid": uid(),
+                    "job_uuid": job_uuid,
+                    "material_uuid": rng.choice(material_uuids),
+                    "name": "Material",
+                    "quantity": str(qty),
+                    "cost": f"{cost:.2f}",
+                    "displayed_cost": f"{cost * qty:.2f}",
+                    "price": f"{cost * 1.4:.2f}",
+                    "edit_date": edited.strftime(_DATETIME_FORMAT),
+                    "active": 1,
+                }
+            )
+        for _ in range(config.activities_per_job):
+            start = edited - timedelta(hours=rng.randint(2, 48))
+            minutes = rng.choice((0, 30, 60, 90, 120, 240))
+            activities.append(
+                {
+                    "uuid": uid(),
+                    "job_uuid": job_uuid,
+                    "staff_uuid": rng.choice(staff)["uuid"] if staff else "",
+                    "start_date": start.strftime(_DATETIME_FORMAT),
+                    "end_date": (start + timedelta(minutes=minutes)).strftime(_DATETIME_FORMAT),
+                    "duration": minutes,
+                    "activity_was_scheduled": "1",
+                    "edit_date": edited.strftime(_DATETIME_FORMAT),
+                    "active": 1,
+                }
+            )
+    return {
+        "staff": staff,
+        "jobs": jobs,
+        "jobmaterials": materials,
+        "jobactivities": activities,
+        "notes": [],
+        "jobcontacts": [],
+        "attachments": [],
+    }
+
+
+class ServiceM8Simulator:
+    """The simulator server; start()/stop() or use as a context manager. Counters are in stats()."""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or SimulatorConfig()
+        self.data = build_dataset(self.config)
+        self._by_uuid = {name: {r["uuid"]: r for r in rows} for name, rows in self.data.items()}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed + 1)
+        self._requests = 0
+        self._rate_limited = 0
+        self._by_endpoint: dict[str, int] = {}
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ServiceM8Simulator":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="servicem8-simulator", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ServiceM8Simulator":
+        return self.start()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.stop()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"requests": self._requests, "rate_limited": self._rate_limited, "by_endpoint": dict(self._by_endpoint)}
+
+    # --- request handling (called from handler threads) ---
+
+    def _admit(self, endpoint: str) -> bool:
+        """Count the request; False when this one is answered with an injected 429."""
+        with self._lock:
+            self._requests += 1
+            self._by_endpoint[endpoint] = self._by_endpoint.get(endpoint, 0) + 1
+            every = self.config.rate_limit_every
+            limited = (every > 0 and self._requests % every == 0) or (
+                self.config.rate_limit_probability > 0 and self._rng.random() < self.config.rate_limit_probability
+            )
+            if limited:
+                self._rate_limited += 1
+            return not limited
+
+    def list_records(self, collection: str, query: dict[str, str]) -> tuple[list[dict[str, Any]], Optional[str]]:
+        clauses = parse_filter(query.get("$filter"))
+        with self._lock:
+            rows = [dict(r) for r in self.data[collection] if _matches(r, clauses)]
+        cursor = query.get("cursor")
+        if cursor is None:
+            return rows, None
+        offset = 0 if cursor == "-1" else int(cursor)
+        page = rows[offset:offset + self.config.page_size]
+        next_offset = offset + self.config.page_size
+        return page, (str(next_offset) if next_offset < len(rows) else None)
+
+    def save_record(self, collection: str, body: dict[str, Any]) -> str:
+        with self._lock:
+            record_uuid = str(body.get("uuid") or uuid.uuid4())
+            existing = self._by_uuid[collection].get(record_uuid)
+            if existing is not None:
+                existing.update(body)
+            else:
+                record = {**body, "uuid": record_uuid, "edit_date": datetime.now().strftime(_DATETIME_FORMAT)}
+                self.data[collection].append(record)
+                self._by_uuid[collection][record_uuid] = record
+            return record_uuid
+
+    def save_attachment_file(self, attachment_uuid: str, size: int) -> bool:
+        with self._lock:
+            record = self._by_uuid["attachments"].get(attachment_uuid)
+            if record is None:
+                return False
+            record["file_size"] = size
+            return True
+
+
+def _make_handler(sim: ServiceM8Simulator) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, *_args: Any) -> None:
+            pass
+
+        def _send_json(self, status: int, payload: Any, headers: Optional[dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self) -> tuple[Optional[str], Optional[str], dict[str, str]]:
+            """(collection, attachment uuid for .file uploads, query) for the request path."""
+            parts = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+            path = parts.path.lower()
+            m = re.fullmatch(r"/api_1\.0/attachment/([0-9a-f-]+)\.file", path)
+            if m:
+                return "attachments", m.group(1), query
+            m = re.fullmatch(r"/api_1\.0/(\w+)\.json", path)
+            return (_COLLECTIONS.get(m.group(1)) if m else None), None, query
+
+        def _handle(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            collection, attachment_uuid, query = self._route()
+            endpoint = f"{method} {urlsplit(self.path).path}"
+            if sim.config.latency_ms:
+                time.sleep(sim.config.latency_ms / 1000)
+            if not sim._admit(endpoint):
+                self._send_json(429, {"errorCode": 429, "message": "Rate limit exceeded"},
+                                {"Retry-After": f"{sim.config.retry_after_seconds:g}"})
+                return
+            if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+                self._send_json(401, {"errorCode": 401, "message": "Unauthorized"})
+                return
+            if collection is None:
+                self._send_json(404, {"errorCode": 404, "message": "Not found"})
+                return
+            if method == "GET":
+                try:
+                    records, next_cursor = sim.list_records(collection, query)
+                except ValueError as e:
+                    self._send_json(400, {"errorCode": 400, "message": str(e)})
+                    return
+                self._send_json(200, records, {"x-next-cursor": next_cursor} if next_cursor else None)
+                return
+            if attachment_uuid is not None:
+                if not sim.save_attachment_file(attachment_uuid, len(raw)):
+                    self._send_json(404, {"errorCode": 404, "message": "No such attachment"})
+                    return
+                self._send_json(200, {"uuid": attachment_uuid, "errorCode": 0, "message": "OK"})
+                return
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                self._send_json(400, {"errorCode": 400, "message": "Body must be JSON"})
+                return
+            record_uuid = sim.save_record(collection, body if isinstance(body, dict) else {})
+            self._send_json(200, {"errorCode": 0, "message": "OK"}, {"x-record-uuid": record_uuid})
+
+        def do_GET(self) -> None:
+            self._handle("GET")
+
+        def do_POST(self) -> None:
+            self._handle("POST")
+
+    return Handler
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local ServiceM8 API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--materials-per-job", type=int, default=4)
+    parser.add_argument("--activities-per-job", type=int, default=2)
+    parser.add_argument("--staff", type=int, default=10)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0, help="Answer this fraction of requests with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    config = SimulatorConfig(
+        jobs=args.jobs,
+        materials_per_job=args.materials_per_job,
+        activities_per_job=args.activities_per_job,
+        staff=args.staff,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        rate_limit_every=args.rate_limit_every,
+        rate_limit_probability=args.rate_limit_probability,
+        retry_after_seconds=args.retry_after,
+        seed=args.seed,
+    )
+    sim = ServiceM8Simulator(config, host=args.host, port=args.port).start()
+    print(f"ServiceM8 simulator on {sim.url} ({config.jobs} jobs); set SERVICEM8_API_BASE_URL={sim.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+        print(f"Stopped. {sim.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
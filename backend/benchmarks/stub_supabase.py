@@ -0,0 +1,457 @@
+"""
+In-memory Supabase stand-in for benchmarks and tests. It implements the subset of the client the app
+uses:
+
+  table(name)    select (column list or *, count="exact") / eq / neq / in_ / is_ / gt / gte / lt /
+                 lte / order / limit / range, plus insert / upsert (on_conflict, composite keys) /
+                 update / delete with the same filters; execute() returns .data (and .count)
+  storage        from_(bucket).upload / get_public_url / list / remove
+  auth.admin     list_users(page, per_page) over the users passed in
+  rpc(name, p)   database functions from the repo's migrations (STUB_FUNCTIONS, extendable per
+                 instance via .functions); an unknown name raises StubRpcError code PGRST202
+
+Filters compare like PostgREST query strings: eq/neq/in_ on text (1 == "1", True == "true"),
+range filters on numbers or ISO dates/timestamps, NULL never matches. Inserted rows without an id
+get a uuid. Rows are shallow-copied in and out.
+
+Every execute (and every storage / auth call) is one round trip: round_trips counts them and
+calls counts them by "<op> <table>" (e.g. "select products", "upload storage:diagrams",
+"rpc bulk_update_product_pricing").
+latency is waited out per round trip, outside the lock so concurrent callers overlap as on a network
+(AsyncStubSupabase awaits asyncio.sleep, so it never blocks the event loop): either seconds, or a
+callable (op, table) -> seconds for per-call latency. Sync and async flavours share the same tables dict.
+
+on_execute, if set, is called with each table query (.op, .table, .values for writes, .filters as
+(op, field, value)) just before it runs: tests use it to record queries, and an exception it raises
+fails that execute as a database error would.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, Optional, Union
+
+Latency = Union[float, Callable[[str, str], float]]
+
+
+class StubStorageError(Exception):
+    """Raised where storage3 raises StorageException: uploading over an existing object without upsert."""
+
+
+class StubRpcError(Exception):
+    """Raised where postgrest raises APIError for an rpc() call; .code as PostgREST reports it."""
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _comparable(value: Any) -> Any:
+    """Number, aware datetime (for ISO dates/timestamps) or text, for range filters and order."""
+    if isinstance(value, bool):
+        return _text(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    text = _text(value)
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return text
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _compare(a: Any, b: Any) -> Optional[int]:
+    """-1 / 0 / 1, or None when either side is NULL or the two are not comparable."""
+    if a is None or b is None:
+        return None
+    ca, cb = _comparable(a), _comparable(b)
+    if type(ca) is not type(cb):
+        ca, cb = _text(a), _text(b)
+    return (ca > cb) - (ca < cb)
+
+
+def _is_value(value: Any) -> Optional[bool]:
+    text = _text(value).lower() if value is not None else "null"
+    return {"null": None, "true": True, "false": False}[text]
+
+
+def _match(row: dict[str, Any], op: str, field: str, value: Any) -> bool:
+    actual = row.get(field)
+    if op == "is":
+        return actual is _is_value(value)
+    if actual is None:
+        return False
+    if op == "eq":
+        return _text(actual) == _text(value)
+    if op == "neq":
+        return _text(actual) != _text(value)
+    if op == "in":
+        return _text(actual) in value
+    cmp = _compare(actual, value)
+    if cmp is None:
+        return False
+    return {"gt": cmp > 0, "gte": cmp >= 0, "lt": cmp < 0, "lte": cmp <= 0}[op]
+
+
+def _order_key(field: str) -> Callable[[dict[str, Any]], tuple]:
+    def key(row: dict[str, Any]) -> tuple:
+        value = row.get(field)
+        if value is None:
+            return (1, 0, "")
+        c = _comparable(value)
+        # Keep mixed kinds sortable: numbers, then datetimes, then text.
+        rank = 0 if isinstance(c, float) else 1 if isinstance(c, datetime) else 2
+        return (0, rank, c if rank != 1 else c.timestamp())
+
+    return key
+
+
+class _StubQuery:
+    def __init__(self, stub: "StubSupabase", table: str):
+        self._stub = stub
+        self._table = table
+        self._op = "select"
+        self._columns: Optional[list[str]] = None
+        self._count: Optional[str] = None
+        self._filters: list[tuple[str, str, Any]] = []
+        self._order: list[tuple[str, bool]] = []
+        self._offset = 0
+        self._limit: Optional[int] = None
+        self._values: Any = None
+        self._on_conflict = "id"
+        self._ignore_duplicates = False
+
+    # -- operations ---------------------------------------------------------------------------
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "_StubQuery":
+        names = [c.strip() for c in (columns or "*").split(",") if c.strip()]
+        # Embedded resources / aliases are not modelled: return whole rows.
+        self._columns = None if any(c == "*" or "(" in c or ":" in c for c in names) else names
+        self._count = count
+        return self
+
+    def insert(self, rows: Any) -> "_StubQuery":
+        self._op = "insert"
+        self._values = [dict(r) for r in (rows if isinstance(rows, list) else [rows])]
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = "id", ignore_duplicates: bool = False) -> "_StubQuery":
+        self._op = "upsert"
+        self._values = [dict(r) for r in (rows if isinstance(rows, list) else [rows])]
+        self._on_conflict = on_conflict or "id"
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: dict[str, Any]) -> "_StubQuery":
+        self._op = "update"
+        self._values = dict(values)
+        return self
+
+    def delete(self) -> "_StubQuery":
+        self._op = "delete"
+        return self
+
+    # -- filters and modifiers ----------------------------------------------------------------
+
+    def _filter(self, op: str, field: str, value: Any) -> "_StubQuery":
+        self._filters.append((op, field, value))
+        return self
+
+    def eq(self, field: str, value: Any) -> "_StubQuery":
+        return self._filter("eq", field, value)
+
+    def neq(self, field: str, value: Any) -> "_StubQuery":
+        return self._filter("neq", field, value)
+
+    def in_(self, field: str, values: Iterable[Any]) -> "_StubQuery":
+        return self._filter("in", field, {_text(v) for v in (values or [])})
+
+    def is_(self, field: str, value: Any) -> "_StubQuery":
+        return self._filter("is", field, value)
+
+    def gt(self, field: str, value: Any) -> "_StubQuery":
+        return self._filter("gt", field, value)
+
+    def gte(self, field: str, value: Any) -> "_StubQuery":
+        return self._filter("gte", field, value)
+
+    def lt(self, field: str, value: Any) -> "_StubQuery":
+        return self._filter("lt", field, value)
+
+    def lte(self, field: str, value: Any) -> "_StubQuery":
+        return self._filter("lte", field, value)
+
+    def order(self, field: str, desc: bool = False) -> "_StubQuery":
+        self._order.append((field, desc))
+        return self
+
+    def limit(self, n: int) -> "_StubQuery":
+        self._limit = int(n)
+        return self
+
+    def range(self, start: int, end: int) -> "_StubQuery":
+        self._offset = int(start)
+        self._limit = int(end) - int(start) + 1
+        return self
+
+    # -- execution ----------------------------------------------------------------------------
+
+    def _matches(self, row: dict[str, Any]) -> bool:
+        return all(_match(row, op, field, value) for op, field, value in self._filters)
+
+    def _project(self, row: dict[str, Any]) -> dict[str, Any]:
+        if self._columns is None:
+            return dict(row)
+        return {c: row.get(c) for c in self._columns}
+
+    def _write(self, table: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self._op == "insert":
+            for row in self._values:
+                row.setdefault("id", str(uuid.uuid4()))
+                table.append(row)
+            return self._values
+        if self._op == "upsert":
+            keys = [k.strip() for k in self._on_conflict.split(",")]
+            by_key = {tuple(_text(r.get(k)) for k in keys): r for r in table}
+            written = []
+            for row in self._values:
+                existing = by_key.get(tuple(_text(row.get(k)) for k in keys))
+                if existing is not None:
+                    if not self._ignore_duplicates:
+                        existing.update(row)
+                        written.append(existing)
+                    continue
+                row.setdefault("id", str(uuid.uuid4()))
+                table.append(row)
+                by_key[tuple(_text(row.get(k)) for k in keys)] = row
+                written.append(row)
+            return written
+        matched = [r for r in table if self._matches(r)]
+        if self._op == "update":
+            for row in matched:
+                row.update(self._values)
+        elif self._op == "delete":
+            ids = {id(r) for r in matched}
+            table[:] = [r for r in table if id(r) not in ids]
+        return matched
+
+    def _run(self) -> SimpleNamespace:
+        self._stub._round_trip(self._op, self._table)
+        return self._apply()
+
+    def _apply(self) -> SimpleNamespace:
+        if self._stub.on_execute is not None:
+            self._stub.on_execute(
+                SimpleNamespace(op=self._op, table=self._table, values=self._values, filters=list(self._filters))
+            )
+        with self._stub._lock:
+            table = self._stub.tables.setdefault(self._table, [])
+            if self._op != "select":
+                return SimpleNamespace(data=[self._project(r) for r in self._write(table)], count=None)
+            rows = [r for r in table if self._matches(r)]
+            count = len(rows) if self._count else None
+            for field, desc in reversed(self._order):
+                rows.sort(key=_order_key(field), reverse=desc)
+            end = None if self._limit is None else self._offset + self._limit
+            return SimpleNamespace(data=[self._project(r) for r in rows[self._offset:end]], count=count)
+
+    def execute(self) -> SimpleNamespace:
+        return self._run()
+
+
+class _AsyncStubQuery(_StubQuery):
+    async def execute(self) -> SimpleNamespace:
+        delay = self._stub._count_round_trip(self._op, self._table)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._apply()
+
+
+class _StubRpc:
+    def __init__(self, stub: "StubSupabase", name: str, params: dict[str, Any]):
+        self._stub = stub
+        self._name = name
+        self._params = dict(params or {})
+
+    def _apply(self) -> SimpleNamespace:
+        if self._stub.on_execute is not None:
+            self._stub.on_execute(SimpleNamespace(op="rpc", table=self._name, values=self._params, filters=[]))
+        fn = self._stub.functions.get(self._name)
+        if fn is None:
+            raise StubRpcError(f"Could not find the function public.{self._name}", "PGRST202")
+        with self._stub._lock:
+            return SimpleNamespace(data=fn(self._stub.tables, self._params), count=None)
+
+    def execute(self) -> SimpleNamespace:
+        self._stub._round_trip("rpc", self._name)
+        return self._apply()
+
+
+class _AsyncStubRpc(_StubRpc):
+    async def execute(self) -> SimpleNamespace:
+        delay = self._stub._count_round_trip("rpc", self._name)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._apply()
+
+
+def _bulk_update_product_pricing(tables: dict[str, list[dict[str, Any]]], params: dict[str, Any]) -> list[dict[str, Any]]:
+    """public.bulk_update_product_pricing (docs/product_pricing_rpc_migration.sql): price columns only."""
+    by_id = {_text(u["id"]): u for u in params.get("updates") or []}
+    updated = []
+    for row in tables.setdefault("products", []):
+        item = by_id.get(_text(row.get("id")))
+        if item is not None:
+            row["cost_price"] = item["cost_price"]
+            row["markup_percentage"] = item["markup_percentage"]
+            updated.append({"id": row["id"]})
+    return updated
+
+
+# Database functions from the repo's migrations, as rpc() sees them: name -> (tables, params) -> data.
+STUB_FUNCTIONS: dict[str, Callable[[dict[str, list[dict[str, Any]]], dict[str, Any]], Any]] = {
+    "bulk_update_product_pricing": _bulk_update_product_pricing,
+}
+
+
+class _StubBucket:
+    def __init__(self, stub: "StubSupabase", bucket: str):
+        self._stub = stub
+        self._bucket = bucket
+
+    @property
+    def _files(self) -> dict[str, bytes]:
+        return self._stub.buckets.setdefault(self._bucket, {})
+
+    def upload(self, path: str, file: bytes, file_options: Optional[dict[str, Any]] = None) -> SimpleNamespace:
+        self._stub._round_trip("upload", f"storage:{self._bucket}")
+        upsert = _text((file_options or {}).get("upsert", "false")).lower() == "true"
+        with self._stub._lock:
+            if path in self._files and not upsert:
+                raise StubStorageError(f"The resource already exists: {self._bucket}/{path}")
+            self._files[path] = bytes(file)
+        return SimpleNamespace(path=path, full_path=f"{self._bucket}/{path}")
+
+    def get_public_url(self, path: str) -> str:
+        # Built client-side by the real client: not a round trip.
+        return f"{self._stub.url}/storage/v1/object/public/{self._bucket}/{path}"
+
+    def remove(self, paths: list[str]) -> list[dict[str, Any]]:
+        self._stub._round_trip("remove", f"storage:{self._bucket}")
+        with self._stub._lock:
+            removed = [p for p in paths if self._files.pop(p, None) is not None]
+        return [{"name": p} for p in removed]
+
+    def list(self, path: str = "") -> list[dict[str, Any]]:
+        self._stub._round_trip("list", f"storage:{self._bucket}")
+        prefix = f"{path.rstrip('/')}/" if path else ""
+        with self._stub._lock:
+            names = {p[len(prefix):].split("/", 1)[0] for p in self._files if p.startswith(prefix)}
+        return [{"name": name} for name in sorted(names)]
+
+
+class _StubStorage:
+    def __init__(self, stub: "StubSupabase"):
+        self._stub = stub
+
+    def from_(self, bucket: str) -> _StubBucket:
+        return _StubBucket(self._stub, bucket)
+
+
+class _StubAuthAdmin:
+    def __init__(self, stub: "StubSupabase"):
+        self._stub = stub
+
+    def list_users(self, page: Optional[int] = None, per_page: Optional[int] = None) -> list[SimpleNamespace]:
+        self._stub._round_trip("list_users", "auth.users")
+        users = self._stub.users
+        if per_page:
+            start = (max(1, page or 1) - 1) * per_page
+            users = users[start:start + per_page]
+        return [SimpleNamespace(**u) for u in users]
+
+
+class StubSupabase:
+    def __init__(
+        self,
+        tables: Optional[dict[str, list[dict[str, Any]]]] = None,
+        latency: Latency = 0.0,
+        users: Optional[list[dict[str, Any]]] = None,
+        url: str = "https://stub.supabase.co",
+    ):
+        self.tables = tables if tables is not None else {}
+        self.latency = latency
+        self.users = list(users or [])
+        self.url = url
+        self.buckets: dict[str, dict[str, bytes]] = {}
+        self.round_trips = 0
+        self.calls: Counter[str] = Counter()
+        self.on_execute: Optional[Callable[[SimpleNamespace], None]] = None
+        self.functions = dict(STUB_FUNCTIONS)
+        self.storage = _StubStorage(self)
+        self.auth = SimpleNamespace(admin=_StubAuthAdmin(self))
+        self._lock = threading.RLock()
+
+    def _count_round_trip(self, op: str, table: str) -> float:
+        """Count one round trip; returns its simulated latency in seconds (the caller waits it out)."""
+        with self._lock:
+            self.round_trips += 1
+            self.calls[f"{op} {table}"] += 1
+        return self.latency(op, table) if callable(self.latency) else self.latency
+
+    def _round_trip(self, op: str, table: str) -> None:
+        delay = self._count_round_trip(op, table)
+        if delay:
+            time.sleep(delay)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.round_trips = 0
+            self.calls.clear()
+
+    def table(self, name: str) -> _StubQuery:
+        return _StubQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[dict[str, Any]] = None) -> _StubRpc:
+        return _StubRpc(self, name, params or {})
+
+
+class AsyncStubSupabase(StubSupabase):
+    def table(self, name: str) -> _StubQuery:
+        return _AsyncStubQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[dict[str, Any]] = None) -> _StubRpc:
+        return _AsyncStubRpc(self, name, params or {})
+
+
+def product_rows(product_ids: Iterable[str]) -> list[dict[str, Any]]:
+    """Deterministic priced product rows for the given IDs."""
+    rows = []
+    for i, pid in enumerate(sorted(product_ids)):
+        rows.append(
+            {
+                "id": pid,
+                "name": pid,
+                "cost_price": round(1.5 + (i % 37) * 2.35, 2),
+                "markup_percentage": float(20 + (i % 5) * 10),
+                "unit": "each",
+            }
+        )
+    return rows
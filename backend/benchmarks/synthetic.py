@@ -0,0 +1,53 @@
+"""
+Synthetic canvas generators for benchmarks. Deterministic for a given seed.
+"""
+import random
+from typing import Any
+
+GUTTER_IDS = (
+    "GUT-SC-MAR-1.5M", "GUT-SC-MAR-3M", "GUT-SC-MAR-5M",
+    "GUT-CL-MAR-1.5M", "GUT-CL-MAR-3M", "GUT-CL-MAR-5M",
+)
+DOWNPIPE_IDS = ("DP-65-1.5M", "DP-65-3M", "DP-80-1.5M", "DP-80-3M", "DPJ-65", "DPJ-80")
+DROPPER_IDS = ("dropper", "DRP-65", "DRP-80")
+CLIP_IDS = ("SCL-65", "SCL-80", "ACL-65", "ACL-80")
+FITTING_IDS = ("EO-SC-MAR-65", "EC-SC-MAR", "IC-CL-MAR", "J-SC-MAR", "LSE-SC-MAR", "EL95-65")
+
+
+def synthetic_elements(count: int, seed: int = 1) -> list[dict[str, Any]]:
+    """
+    Canvas elements mixing gutters, downpipes, droppers, clips and fittings (roughly
+    40/25/10/10/15 %). About half of gutters and downpipes carry a measured length_mm.
+    """
+    rng = random.Random(seed)
+    out: list[dict[str, Any]] = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.40:
+            asset_id = rng.choice(GUTTER_IDS)
+            measured = rng.random() < 0.5
+        elif roll < 0.65:
+            asset_id = rng.choice(DOWNPIPE_IDS)
+            measured = rng.random() < 0.5
+        elif roll < 0.75:
+            asset_id = rng.choice(DROPPER_IDS)
+            measured = False
+        elif roll < 0.85:
+            asset_id = rng.choice(CLIP_IDS)
+            measured = False
+        else:
+            asset_id = rng.choice(FITTING_IDS)
+            measured = False
+        element: dict[str, Any] = {"assetId": asset_id, "quantity": rng.randint(1, 3)}
+        if measured:
+            element["length_mm"] = rng.randint(400, 12000)
+        out.append(element)
+    return out
+
+
+def synthetic_product_ids(elements: list[dict[str, Any]]) -> set[str]:
+    """Every product ID a synthetic canvas can expand to (elements + inferred accessories)."""
+    ids = {str(e["assetId"]) for e in elements}
+    ids.update({"BRK-SC-MAR", "BRK-CL-MAR", "SCR-SS", "REP-LAB"})
+    ids.update(CLIP_IDS)
+    return ids
@@ -2,9 +2,12 @@
 Quote App API – FastAPI backend.
 Blueprint processing, product list, static frontend. API-ready for future integrations.
 """
+import asyncio
 import base64
+import io
 import logging
 import os
+import tempfile
 import uuid as uuid_lib
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
@@ -12,6 +15,7 @@ from typing import Any, Optional
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, UploadFile
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import RedirectResponse
 from pydantic import BaseModel, Field
 
@@ -30,6 +34,7 @@ from app.bonus_dashboard import (
     select_period_jobs,
 )
 from app.blueprint_processor import process_blueprint
+from app.background_jobs import get_job, job_accepted_payload, shutdown_background_jobs, submit_job
 from app.csv_import import import_products_from_csv
 from app.diagrams import (
     create_diagram,
@@ -39,22 +44,41 @@ from app.diagrams import (
     update_diagram,
 )
 from app.gutter_accessories import expand_elements_with_gutter_accessories
+from app.job_performance_sync import run_sync
 from app.material_rules import (
+    DEFAULT_MEASURED_RULES_REFRESH_SECONDS,
     MaterialRulesValidationError,
-    get_measured_material_rules_for_quote,
+    ensure_measured_rules_snapshot,
+    ensure_measured_rules_snapshot_async,
     get_measured_material_rules_or_defaults,
+    get_measured_rules_snapshot,
+    get_measured_rules_snapshot_stats,
     get_quick_quoter_material_rules,
+    refresh_measured_rules_snapshot,
     save_measured_material_rules,
     save_quick_quoter_repair_types,
     save_quick_quoter_templates,
+    start_measured_rules_refresher,
+    stop_measured_rules_refresher,
 )
-from app.pricing import get_product_pricing
-from app.products import get_products
+from app.pricing import (
+    get_pricing_cache_stats,
+    get_pricing_cache_version,
+    get_product_pricing,
+    get_product_pricing_async,
+    invalidate_pricing_cache,
+    update_product_pricing,
+)
+from app.catalog_revision import catalog_headers, is_not_modified, render_catalog
+from app.http_cache import etag_matches
+from app.products import get_product_catalog_index, invalidate_product_catalog_index
 from app.bonus_periods import create_period, list_periods, update_period
 from app.bonus_calc import compute_job_gp, compute_period_pot
 from app.quick_quoter import get_quick_quoter_catalog, resolve_quick_quoter_selection
+from app.quote_engine import QuotePricingError, build_quote, quote_product_ids
+from app.quote_memo import get_memoised_quote, get_quote_memo_stats, memoise_quote, quote_request_key
 from app.quotes import QuoteMaterialLine, insert_quote_for_job
-from app.supabase_client import get_supabase
+from app.supabase_client import close_async_supabase, get_async_supabase, get_supabase
 from app import servicem8 as sm8
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
@@ -76,6 +100,18 @@ def _env_flag(name: str, default: bool = False) -> bool:
     return raw.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _env_float(name: str, default: float) -> float:
+    """Parse a float environment setting; invalid or missing values fall back to default."""
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("Invalid %s=%r; using %s", name, raw, default)
+        return default
+
+
 def _normalize_app_role(role: Any) -> str:
     value = str(role or "").strip().lower()
     if value in ALLOWED_APP_ROLES:
@@ -819,6 +855,10 @@ class CalculateQuoteRequest(BaseModel):
     labour_elements: list[QuoteElement] = Field(default_factory=list, description="Labour lines (assetId e.g. REP-LAB, quantity = hours)")
 
 
+class CalculateQuoteBatchRequest(BaseModel):
+    quotes: list[CalculateQuoteRequest] = Field(..., min_length=1, max_length=500, description="Quote requests priced together; results keep this order")
+
+
 class QuickQuoterSelection(BaseModel):
     repair_type_id: str = Field(..., min_length=1, description="Quick Quoter repair type id")
     quantity: float = Field(..., description="Quick Quoter row quantity")
@@ -1089,22 +1129,57 @@ def api_me(
 
 @app.get("/api/products")
 def api_products(
+    request: Request,
     search: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     profile: Optional[str] = Query(None, description="Filter by profile: storm_cloud | classic | other"),
 ):
-    """List Marley products; optional search, category, and profile filter."""
-    return {"products": get_products(search=search, category=category, profile=profile)}
+    """
+    List Marley products; optional search, category, and profile filter.
+    Sends ETag / Last-Modified; If-None-Match or If-Modified-Since that still match get 304.
+    """
+    try:
+        index = get_product_catalog_index()
+    except Exception as e:
+        logger.exception("Failed to fetch products from Supabase: %s", e)
+        return {"products": []}
+    rendered = render_catalog(
+        ("products", index.build_id, search, category, profile),
+        lambda: {"products": index.query(search=search, category=category, profile=profile)},
+    )
+    return _conditional_catalog_response(request, rendered)
+
 
+def _conditional_catalog_response(request: Request, rendered: Any) -> Response:
+    headers = catalog_headers(rendered)
+    if is_not_modified(rendered, request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
 
-@app.post("/api/products/update-pricing")
+
+def _update_pricing(updates: list[dict[str, Any]], progress: Any = None) -> dict[str, Any]:
+    """Background job body for update-pricing: chunked multi-row upserts, then cache invalidation."""
+    try:
+        return update_product_pricing(updates, progress)
+    except Exception as e:
+        logger.exception("Failed to update product pricing in Supabase: %s", e)
+        raise RuntimeError("Failed to update pricing") from e
+    finally:
+        # Earlier chunks may have been written even when a later one fails.
+        invalidate_pricing_cache()
+        invalidate_product_catalog_index()
+
+
+@app.post("/api/products/update-pricing", status_code=202)
 def api_update_pricing(
     body: list[UpdatePricingItem],
     user_id: Any = Depends(require_role(["admin"])),
 ):
     """
     Update cost_price and markup_percentage for products. Accepts array of {id, cost_price, markup_percentage}.
-    Requires Bearer token and role admin (task 34.3). Returns {success: true, updated: count}. 400 if validation fails; 500 on DB error.
+    Requires Bearer token and role admin (task 34.3). 400 if validation fails.
+    Runs as a background job: returns 202 {job_id, kind, status, status_url}; poll GET /api/jobs/{id}
+    for the result {success: true, updated: count, not_found: [ids]}. Writes are chunked multi-row upserts.
     """
     if not body:
         raise HTTPException(400, "At least one product update is required")
@@ -1113,27 +1188,47 @@ def api_update_pricing(
             raise HTTPException(400, f"Product {item.id}: cost_price must be >= 0")
         if not (0 <= item.markup_percentage <= 1000):
             raise HTTPException(400, f"Product {item.id}: markup_percentage must be between 0 and 1000")
+    updates = [{"id": item.id, "cost_price": item.cost_price, "markup_percentage": item.markup_percentage} for item in body]
+    record = submit_job("update_pricing", lambda progress: _update_pricing(updates, progress), created_by=user_id)
+    return job_accepted_payload(record)
+
+
+@app.get("/api/admin/cache-stats")
+def api_admin_cache_stats(
+    user_id: Any = Depends(require_role(["admin"])),
+):
+    """
+    In-process cache counters (hits, misses, invalidations) for monitoring hit ratio under load,
+    plus the pooled ServiceM8 HTTP client's request/connection stats. Admin only.
+    """
+    _ = user_id
+    return {
+        "pricing": get_pricing_cache_stats(),
+        "measured_rules": get_measured_rules_snapshot_stats(),
+        "quotes": get_quote_memo_stats(),
+        "servicem8_http": sm8.get_http_client_stats(),
+    }
+
+
+def _check_csv_upload(file: UploadFile) -> None:
+    if not file.filename or not file.filename.lower().endswith(".csv"):
+        raise HTTPException(400, "File must be a CSV")
+
+
+def _import_csv_job(upload: Any, progress: Any) -> dict[str, Any]:
+    """Background job body: stream the spooled upload copy through import_products_from_csv."""
     try:
-        supabase = get_supabase()
-        updated = 0
-        for item in body:
-            resp = (
-                supabase.table("products")
-                .update({"cost_price": item.cost_price, "markup_percentage": item.markup_percentage})
-                .eq("id", item.id)
-                .execute()
-            )
-            if resp.data and len(resp.data) > 0:
-                updated += len(resp.data)
-        return {"success": True, "updated": updated}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.exception("Failed to update product pricing in Supabase: %s", e)
-        raise HTTPException(500, "Failed to update pricing")
+        upload.seek(0)
+        stream = io.TextIOWrapper(upload, encoding="utf-8", errors="replace", newline="")
+        result = import_products_from_csv(stream, progress=progress)
+    finally:
+        upload.close()
+    if not result["success"] and result["imported"] == 0 and result["failed"] == 0:
+        raise ValueError("; ".join(result["errors"][:5]))
+    return result
 
 
-@app.post("/api/products/import-csv")
+@app.post("/api/products/import-csv", status_code=202)
 async def api_import_csv(
     file: UploadFile = File(...),
     user_id: Any = Depends(require_role(["admin"])),
@@ -1141,21 +1236,76 @@ async def api_import_csv(
     """
     Import products from CSV. Expected columns: Item Number, Servicem8 Material_uuid, Item Name,
     Purchase Cost, Price. Profile is derived from item number (SC/CL) or name (Storm Cloud/Classic).
-    Requires Bearer token and role admin (task 34.3). Returns {success, imported, failed, errors}.
+    Requires Bearer token and role admin (task 34.3).
+    Only products that differ from the catalog are written, so repeating an import is a no-op.
+    Runs as a background job: returns 202 {job_id, kind, status, status_url}; the job result is
+    {success, imported, inserted, updated, unchanged, failed, errors}.
     """
-    if not file.filename or not file.filename.lower().endswith(".csv"):
-        raise HTTPException(400, "File must be a CSV")
-    content = (await file.read()).decode("utf-8", errors="replace")
+    _check_csv_upload(file)
+    # The request's upload is closed once we respond, so the job gets its own spooled copy.
+    upload = tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024)
+    await file.seek(0)
+    while chunk := await file.read(1024 * 1024):
+        upload.write(chunk)
+    record = submit_job("import_csv", lambda progress: _import_csv_job(upload, progress), created_by=user_id)
+    return job_accepted_payload(record)
+
+
+@app.post("/api/products/import-csv/preview")
+async def api_import_csv_preview(
+    file: UploadFile = File(...),
+    user_id: Any = Depends(require_role(["admin"])),
+):
+    """
+    Dry run of import-csv: nothing is written. Returns {success, imported, inserted, updated,
+    unchanged, failed, errors, dry_run, changes: [{id, action: insert|update, fields: {field: {old, new}}}]}.
+    Admin only.
+    """
+    _check_csv_upload(file)
+    await file.seek(0)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", errors="replace", newline="")
     try:
-        result = import_products_from_csv(content)
+        result = await run_in_threadpool(import_products_from_csv, stream, True)
     except Exception as e:
-        logger.exception("CSV import failed: %s", e)
+        logger.exception("CSV import preview failed: %s", e)
         raise HTTPException(500, str(e))
+    finally:
+        stream.detach()  # leave the spooled upload for UploadFile to close
     if not result["success"] and result["imported"] == 0 and result["failed"] == 0:
         raise HTTPException(400, "; ".join(result["errors"][:5]))
     return result
 
 
+@app.post("/api/admin/job-performance-sync", status_code=202)
+def api_admin_job_performance_sync(
+    full: bool = Query(False, description="Re-sync every job instead of only jobs changed since the last run"),
+    user_id: Any = Depends(require_role(["admin"])),
+):
+    """
+    Run one job_performance sync pass (same as scripts/run_job_performance_sync.py) as a background job.
+    Incremental unless full=true. Returns 202 {job_id, kind, status, status_url}; the job result is
+    run_sync's summary. Admin only.
+    """
+    record = submit_job("job_performance_sync", lambda progress: run_sync(progress, full=full), created_by=user_id)
+    return job_accepted_payload(record)
+
+
+@app.get("/api/jobs/{job_id}")
+def api_get_job(
+    job_id: str,
+    user_id: Any = Depends(require_role(["admin"])),
+):
+    """
+    Background job status: {id, kind, status (queued|running|succeeded|failed), progress {done, total, message},
+    result, error, created_by, created_at, started_at, finished_at}. 404 if unknown. Admin only.
+    """
+    _ = user_id
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
 @app.get("/api/admin/user-permissions")
 def api_admin_user_permissions(
     user_id: Any = Depends(require_role(["admin"])),
@@ -2059,14 +2209,17 @@ def api_labour_rates():
 
 
 @app.get("/api/quick-quoter/catalog")
-def api_quick_quoter_catalog():
+def api_quick_quoter_catalog(request: Request):
+    """Active Quick Quoter repair types. Cached per catalog revision; supports conditional GET (ETag / Last-Modified)."""
     try:
-        supabase = get_supabase()
-        repair_types = get_quick_quoter_catalog(supabase)
-        return {"repair_types": repair_types}
+        rendered = render_catalog(
+            ("quick_quoter_catalog",),
+            lambda: {"repair_types": get_quick_quoter_catalog(get_supabase())},
+        )
     except Exception as e:
         logger.exception("Failed to fetch quick-quoter catalog: %s", e)
         raise HTTPException(500, "Failed to load quick quoter catalog")
+    return _conditional_catalog_response(request, rendered)
 
 
 @app.post("/api/quick-quoter/resolve")
@@ -2188,95 +2341,167 @@ def api_admin_material_rules_measured_save(
         raise HTTPException(500, "Failed to save measured material rules")
 
 
+def _quote_request_elements(body: CalculateQuoteRequest) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Raw material elements and labour lines for one quote request, as plain dicts."""
+    raw_elements = [
+        {"assetId": e.assetId, "quantity": e.quantity, "length_mm": getattr(e, "length_mm", None)}
+        for e in body.elements
+    ]
+    labour_elements = [{"assetId": e.assetId, "quantity": e.quantity} for e in body.labour_elements]
+    return raw_elements, labour_elements
+
+
+async def _quote_pricing_async(product_ids: list[str]) -> dict[str, Any]:
+    """Pricing for a quote via the async client; DB errors become 500."""
+    try:
+        return await get_product_pricing_async(product_ids) if product_ids else {}
+    except Exception as e:
+        logger.exception("Database error while fetching product pricing: %s", e)
+        raise HTTPException(500, "Failed to load product pricing")
+
+
 @app.post("/api/calculate-quote")
-def api_calculate_quote(body: CalculateQuoteRequest):
+async def api_calculate_quote(body: CalculateQuoteRequest, request: Request, response: Response):
     """
     Calculate quote from materials (elements) and labour (labour_elements).
     Materials: assetId + quantity; auto-adds brackets/screws for gutters.
     Labour: labour_elements with assetId e.g. REP-LAB, quantity = hours; priced from public.products.
+    Measured rules come from the in-process snapshot; rules_version / pricing_version in the response
+    are the versions the quote was built from. Identical requests at the same versions are served from
+    an in-process memo (app.quote_memo). The response carries an ETag; a matching If-None-Match gets 304.
+    Supabase reads use the shared async client, so waiting quotes do not hold threadpool workers; large
+    take-offs (QUOTE_THREADPOOL_MIN_LINES lines or more) are expanded and built on the threadpool instead
+    of the event loop.
     Returns 400 if any product not found or missing pricing; 500 on DB errors.
     """
+    raw_elements, labour_elements = _quote_request_elements(body)
+    rules_snapshot = get_measured_rules_snapshot()
+    prefetched: Optional[tuple[list[str], dict[str, Any]]] = None
+    if rules_snapshot.version == 0:
+        # Rules not loaded yet (startup load failed): one load shared by all waiting requests (defaults for
+        # a few seconds after a failure), fetched alongside pricing for the products the request names
+        # directly; only inferred accessories are left to price after expansion.
+        direct_ids = list(quote_product_ids(raw_elements, labour_elements))
+        rules_snapshot, direct_pricing = await asyncio.gather(
+            ensure_measured_rules_snapshot_async(get_async_supabase), _quote_pricing_async(direct_ids)
+        )
+        prefetched = (direct_ids, direct_pricing)
+
+    pricing_version = get_pricing_cache_version()
+    memo_key = quote_request_key(
+        raw_elements,
+        labour_elements,
+        pricing_version=pricing_version,
+        rules_version=rules_snapshot.version,
+    )
+
+    memoised = get_memoised_quote(memo_key)
+    if memoised is not None:
+        payload, etag = memoised
+    else:
+        payload = await _calculate_quote_payload(
+            raw_elements, labour_elements, rules_snapshot, pricing_version, prefetched
+        )
+        etag = memoise_quote(memo_key, payload)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return payload
+
+
+# From this many lines (elements + labour), accessory expansion and build_quote run on the threadpool
+# so a large take-off does not hold the event loop; smaller quotes stay inline (no thread hop).
+QUOTE_THREADPOOL_MIN_LINES = 200
+
+
+async def _run_quote_step(offload: bool, fn: Any, *args: Any, **kwargs: Any) -> Any:
+    if offload:
+        return await run_in_threadpool(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+async def _calculate_quote_payload(
+    raw_elements: list[dict[str, Any]],
+    labour_elements: list[dict[str, Any]],
+    rules_snapshot: Any,
+    pricing_version: int,
+    prefetched: Optional[tuple[list[str], dict[str, Any]]] = None,
+) -> dict[str, Any]:
+    """
+    Expand, price and total one quote; raises HTTPException (400/500) like api_calculate_quote.
+    Quotes of QUOTE_THREADPOOL_MIN_LINES lines or more are expanded and built on the threadpool.
+    """
+    offload = len(raw_elements) + len(labour_elements) >= QUOTE_THREADPOOL_MIN_LINES
     # Expand material elements with inferred brackets and screws from gutters
-    raw_elements = [
-        {"assetId": e.assetId, "quantity": e.quantity, "length_mm": getattr(e, "length_mm", None)}
-        for e in body.elements
-    ]
-    measured_rules = None
+    elements_for_quote = await _run_quote_step(
+        offload, expand_elements_with_gutter_accessories, raw_elements, rules_config=rules_snapshot.compiled
+    )
+
+    all_product_ids = list(quote_product_ids(elements_for_quote, labour_elements))
+    if prefetched is not None:
+        fetched_ids, pricing = prefetched
+        fetched = set(fetched_ids)
+        pricing = {**pricing, **await _quote_pricing_async([pid for pid in all_product_ids if pid not in fetched])}
+    else:
+        pricing = await _quote_pricing_async(all_product_ids)
+
     try:
-        supabase = get_supabase()
-        measured_rules = get_measured_material_rules_for_quote(supabase)
-    except Exception as e:
-        logger.warning("Measured material rules unavailable; using defaults for quote inference: %s", e)
-        measured_rules = None
+        quote = await _run_quote_step(offload, build_quote, elements_for_quote, labour_elements, pricing)
+    except QuotePricingError as e:
+        logger.warning("Product not found or missing pricing: %s", e.product_id)
+        raise HTTPException(400, str(e))
+    logger.debug(
+        "Quote calculated: total=%.2f, materials=%.2f, labour=%.2f",
+        quote["total"],
+        quote["materials_subtotal"],
+        quote["labour_subtotal"],
+    )
+    return {"quote": quote, "rules_version": rules_snapshot.version, "pricing_version": pricing_version}
+
 
-    elements_for_quote = expand_elements_with_gutter_accessories(raw_elements, rules_config=measured_rules)
+@app.post("/api/calculate-quote/batch")
+def api_calculate_quote_batch(body: CalculateQuoteBatchRequest):
+    """
+    Calculate many quotes in one request (e.g. re-pricing saved diagrams after a markup change).
+    Measured rules and pricing for the union of product IDs are loaded once for the whole batch; a snapshot
+    that has never been loaded is loaded first (single-flight; defaults if that fails), as in /api/calculate-quote.
+    Returns {results: [{index, quote, error}], succeeded, failed, rules_version}; a quote with a missing product
+    gets a per-quote error instead of failing the batch. 500 only when pricing cannot be loaded.
+    """
+    rules_snapshot = get_measured_rules_snapshot()
+    if rules_snapshot.version == 0:
+        rules_snapshot = ensure_measured_rules_snapshot(get_supabase)
+
+    expanded: list[tuple[list[dict[str, Any]], list[dict[str, Any]]]] = []
+    all_product_ids: set[str] = set()
+    for quote_body in body.quotes:
+        raw_elements, labour_elements = _quote_request_elements(quote_body)
+        elements_for_quote = expand_elements_with_gutter_accessories(raw_elements, rules_config=rules_snapshot.compiled)
+        expanded.append((elements_for_quote, labour_elements))
+        all_product_ids |= quote_product_ids(elements_for_quote, labour_elements)
 
-    all_product_ids = list({e["assetId"] for e in elements_for_quote} | {e.assetId for e in body.labour_elements})
     try:
-        pricing = get_product_pricing(all_product_ids) if all_product_ids else {}
+        pricing = get_product_pricing(list(all_product_ids)) if all_product_ids else {}
     except Exception as e:
-        logger.exception("Database error while fetching product pricing: %s", e)
+        logger.exception("Database error while fetching product pricing for quote batch: %s", e)
         raise HTTPException(500, "Failed to load product pricing")
 
-    # Build materials lines
-    materials = []
-    materials_subtotal = 0.0
-    for e in elements_for_quote:
-        pid = e["assetId"]
-        if pid not in pricing:
-            logger.warning("Product not found or missing pricing: %s", pid)
-            raise HTTPException(400, f"Product {pid} not found or missing pricing")
-        p = pricing[pid]
-        cost_price = p["cost_price"]
-        markup_pct = p["markup_percentage"]
-        sell_price = round(cost_price * (1 + markup_pct / 100), 2)
-        qty = e["quantity"]
-        line_total = round(sell_price * qty, 2)
-        materials.append({
-            "id": pid,
-            "name": p["name"],
-            "qty": qty,
-            "cost_price": cost_price,
-            "markup_percentage": markup_pct,
-            "sell_price": sell_price,
-            "line_total": line_total,
-        })
-        materials_subtotal += line_total
-    materials_subtotal = round(materials_subtotal, 2)
-
-    # Labour from labour_elements (priced via products, e.g. REP-LAB)
-    labour_hours = 0.0
-    labour_subtotal = 0.0
-    labour_rate = 0.0  # sell price per hour for display
-    for e in body.labour_elements:
-        pid = e.assetId
-        if pid not in pricing:
-            logger.warning("Labour product not found or missing pricing: %s", pid)
-            raise HTTPException(400, f"Labour product {pid} not found or missing pricing")
-        p = pricing[pid]
-        cost_price = p["cost_price"]
-        markup_pct = p["markup_percentage"]
-        sell_price = round(cost_price * (1 + markup_pct / 100), 2)
-        hours = e.quantity
-        line_total = round(sell_price * hours, 2)
-        labour_hours += hours
-        labour_subtotal += line_total
-        if labour_rate == 0:
-            labour_rate = sell_price
-    labour_subtotal = round(labour_subtotal, 2)
-
-    total = round(materials_subtotal + labour_subtotal, 2)
-
-    quote = {
-        "materials": materials,
-        "materials_subtotal": materials_subtotal,
-        "labour_hours": labour_hours,
-        "labour_rate": labour_rate,
-        "labour_subtotal": labour_subtotal,
-        "total": total,
+    results = []
+    failed = 0
+    for index, (elements_for_quote, labour_elements) in enumerate(expanded):
+        try:
+            quote = build_quote(elements_for_quote, labour_elements, pricing)
+            results.append({"index": index, "quote": quote, "error": None})
+        except QuotePricingError as e:
+            failed += 1
+            results.append({"index": index, "quote": None, "error": str(e)})
+    return {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "rules_version": rules_snapshot.version,
     }
-    logger.debug("Quote calculated: total=%.2f, materials=%.2f, labour=%.2f", total, materials_subtotal, labour_subtotal)
-    return {"quote": quote}
 
 
 @app.post("/api/process-blueprint")
@@ -2897,12 +3122,25 @@ def startup():
     except ValueError as e:
         print("ERROR:", e)
         raise
+    try:
+        refresh_measured_rules_snapshot(get_supabase())
+    except Exception as e:
+        logger.warning("Measured rules snapshot not loaded at startup; quotes use defaults until refresh: %s", e)
+    start_measured_rules_refresher(get_supabase, _env_float("MEASURED_RULES_REFRESH_SECONDS", DEFAULT_MEASURED_RULES_REFRESH_SECONDS))
     if FRONTEND_DIR.exists() and INDEX_HTML.exists():
         print("Quote App frontend: serve at http://127.0.0.1:8000/ (or your host:port)")
     else:
         print("WARNING: frontend not found at", FRONTEND_DIR, "- app will not load at /")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    stop_measured_rules_refresher()
+    shutdown_background_jobs()
+    sm8.close_http_client()
+    await close_async_supabase()
+
+
 if FRONTEND_DIR.exists():
     app.mount("/assets", StaticFiles(directory=FRONTEND_DIR / "assets"), name="assets")
     app.mount("/icons", StaticFiles(directory=FRONTEND_DIR / "icons"), name="icons")
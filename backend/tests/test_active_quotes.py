@@ -0,0 +1,66 @@
+"""
+Tests for active-quote selection: get_active_quotes_for_jobs (bulk, used by job_performance sync)
+must pick the same quote per job as get_active_quote_for_job, including NULL is_final_quote/updated_at,
+and must page past the server's row cap.
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import quotes
+from app.quotes import get_active_quote_for_job, get_active_quotes_for_jobs
+from benchmarks.stub_supabase import StubSupabase
+
+
+def _quote(qid, job, final, updated_at):
+    return {
+        "id": qid,
+        "servicem8_job_id": job,
+        "is_final_quote": final,
+        "updated_at": updated_at,
+        "labour_hours": 1,
+        "created_by": None,
+        "co_seller_user_id": None,
+    }
+
+
+class TestActiveQuotesForJobs(unittest.TestCase):
+    def test_bulk_matches_single_selection_with_nulls(self):
+        db = StubSupabase({"quotes": [
+            # NULL updated_at sorts first in updated_at DESC.
+            _quote("a1", "j1", False, "2026-03-01T00:00:00+00:00"),
+            _quote("a2", "j1", False, None),
+            # Final beats a later draft.
+            _quote("b1", "j2", True, "2026-01-01T00:00:00+00:00"),
+            _quote("b2", "j2", False, "2026-05-01T00:00:00+00:00"),
+            # NULL is_final_quote sorts first in is_final_quote DESC.
+            _quote("c1", "j3", True, "2026-05-01T00:00:00+00:00"),
+            _quote("c2", "j3", None, "2026-01-01T00:00:00+00:00"),
+            _quote("d1", "j4", False, "2026-02-01T00:00:00+00:00"),
+            _quote("d2", "j4", False, "2026-04-01T00:00:00+00:00"),
+        ]})
+        bulk = get_active_quotes_for_jobs(db, ["j1", "j2", "j3", "j4", "j5"])
+        self.assertEqual({job: row["id"] for job, row in bulk.items()}, {"j1": "a2", "j2": "b1", "j3": "c2", "j4": "d2"})
+        for job in ("j1", "j2", "j3", "j4"):
+            self.assertEqual(get_active_quote_for_job(db, job)["id"], bulk[job]["id"], job)
+
+    def test_pages_and_chunks_past_row_cap(self):
+        rows = [_quote(f"q{j}-{n:02d}", f"j{j}", False, f"2026-01-{n + 1:02d}T00:00:00+00:00") for j in range(5) for n in range(7)]
+        db = StubSupabase({"quotes": rows})
+        with patch.object(quotes, "_ACTIVE_QUOTES_PAGE_SIZE", 4), patch.object(quotes, "_ACTIVE_QUOTES_ID_CHUNK_SIZE", 2):
+            active = get_active_quotes_for_jobs(db, [f"j{j}" for j in range(5)])
+        self.assertEqual({job: row["id"] for job, row in active.items()}, {f"j{j}": f"q{j}-06" for j in range(5)})
+        # Chunks of 2, 2 and 1 jobs (14, 14 and 7 rows) at 4 rows a page.
+        self.assertEqual(db.calls["select quotes"], 4 + 4 + 2)
+
+    def test_no_jobs_no_query(self):
+        db = StubSupabase({"quotes": []})
+        self.assertEqual(get_active_quotes_for_jobs(db, ["", "  "]), {})
+        self.assertEqual(db.round_trips, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
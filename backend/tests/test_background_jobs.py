@@ -0,0 +1,152 @@
+"""
+Tests for the in-process background job runner (app.background_jobs) and the endpoints that submit
+to it (update-pricing, job performance sync, GET /api/jobs/{id}).
+"""
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main as backend_main
+from app import background_jobs
+from app.background_jobs import get_job, submit_job, wait_for_job
+from benchmarks.stub_supabase import StubSupabase
+
+
+class BackgroundJobsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.supabase = StubSupabase({"background_jobs": []})
+        self.writes = []
+        self.supabase.on_execute = self._record_write
+        p = patch.object(background_jobs, "get_supabase", return_value=self.supabase)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def _record_write(self, query):
+        if query.op == "upsert":
+            self.writes.extend((row["id"], row["status"]) for row in query.values)
+
+    def _persisted(self, job_id):
+        return next(r for r in self.supabase.tables["background_jobs"] if r["id"] == job_id)
+
+
+class TestJobRunner(BackgroundJobsTestCase):
+    def test_job_runs_and_reports_result_and_progress(self):
+        release = threading.Event()
+
+        def work(progress):
+            progress(1, 3, "first")
+            release.wait(5)
+            progress(3, 3)
+            return {"success": True, "count": 3}
+
+        record = submit_job("test", work, created_by="user-1")
+        self.assertEqual(record.status, "queued")
+        release.set()
+        job = wait_for_job(record.id, timeout=5)
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"], {"success": True, "count": 3})
+        self.assertEqual(job["progress"], {"done": 3, "total": 3, "message": None})
+        self.assertEqual(job["created_by"], "user-1")
+        self.assertIsNotNone(job["finished_at"])
+        statuses = [s for jid, s in self.writes if jid == record.id]
+        self.assertEqual(statuses[0], "queued")
+        self.assertEqual(statuses[-1], "succeeded")
+        self.assertIn("running", statuses)
+
+    def test_exception_marks_job_failed(self):
+        def work(_progress):
+            raise RuntimeError("boom")
+
+        record = submit_job("test", work)
+        job = wait_for_job(record.id, timeout=5)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "boom")
+        self.assertEqual(self._persisted(record.id)["status"], "failed")
+
+    def test_unknown_job_falls_back_to_persisted_row(self):
+        job_id = str(uuid4())
+        self.supabase.tables["background_jobs"].append({"id": job_id, "kind": "import_csv", "status": "succeeded"})
+        self.assertEqual(get_job(job_id)["kind"], "import_csv")
+        self.assertIsNone(get_job(str(uuid4())))
+        self.assertIsNone(get_job("not-a-uuid"))
+
+    def test_finished_history_is_trimmed(self):
+        with patch.dict("os.environ", {"BACKGROUND_JOB_HISTORY": "2"}):
+            ids = [submit_job("test", lambda _p: {"ok": True}).id for _ in range(4)]
+            for jid in ids:
+                wait_for_job(jid, timeout=5)
+        with background_jobs._jobs_lock:
+            in_memory = [jid for jid in ids if jid in background_jobs._jobs]
+        self.assertEqual(in_memory, ids[-2:])
+        self.assertEqual(get_job(ids[0])["status"], "succeeded")  # still readable from the table
+
+    def test_persist_failure_does_not_fail_job(self):
+        with patch.object(background_jobs, "get_supabase", side_effect=ValueError("no supabase")):
+            record = submit_job("test", lambda _p: {"ok": True})
+            job = wait_for_job(record.id, timeout=5)
+        self.assertEqual(job["status"], "succeeded")
+
+
+class TestJobEndpoints(BackgroundJobsTestCase):
+    def setUp(self):
+        super().setUp()
+        backend_main.app.dependency_overrides[backend_main.get_current_user_id_and_role] = lambda: (uuid4(), "admin")
+        self.addCleanup(backend_main.app.dependency_overrides.clear)
+        self.client = TestClient(backend_main.app)
+
+    def test_update_pricing_returns_202_and_job_result(self):
+        with patch.object(
+            backend_main, "update_product_pricing", return_value={"success": True, "updated": 2, "not_found": []}
+        ) as update, patch.object(backend_main, "invalidate_pricing_cache") as invalidate:
+            resp = self.client.post(
+                "/api/products/update-pricing",
+                json=[{"id": "A", "cost_price": 1.5, "markup_percentage": 40}, {"id": "B", "cost_price": 2, "markup_percentage": 30}],
+            )
+            self.assertEqual(resp.status_code, 202, resp.text)
+            body = resp.json()
+            self.assertEqual(body["status_url"], f"/api/jobs/{body['job_id']}")
+            wait_for_job(body["job_id"], timeout=5)
+            job = self.client.get(body["status_url"]).json()
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"], {"success": True, "updated": 2, "not_found": []})
+        self.assertEqual([u["id"] for u in update.call_args.args[0]], ["A", "B"])
+        invalidate.assert_called()
+
+    def test_update_pricing_failure_still_invalidates(self):
+        with patch.object(backend_main, "update_product_pricing", side_effect=RuntimeError("db down")), patch.object(
+            backend_main, "invalidate_pricing_cache"
+        ) as invalidate:
+            resp = self.client.post("/api/products/update-pricing", json=[{"id": "A", "cost_price": 1, "markup_percentage": 1}])
+            job = wait_for_job(resp.json()["job_id"], timeout=5)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Failed to update pricing")
+        invalidate.assert_called_once()
+
+    def test_update_pricing_validation_stays_synchronous(self):
+        self.assertEqual(self.client.post("/api/products/update-pricing", json=[]).status_code, 400)
+        resp = self.client.post("/api/products/update-pricing", json=[{"id": "A", "cost_price": -1, "markup_percentage": 40}])
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(self.writes, [])
+
+    def test_job_performance_sync_submits_run_sync(self):
+        with patch.object(backend_main, "run_sync", return_value={"success": True, "jobs_processed": 0}) as run:
+            resp = self.client.post("/api/admin/job-performance-sync")
+            self.assertEqual(resp.status_code, 202, resp.text)
+            job = wait_for_job(resp.json()["job_id"], timeout=5)
+        self.assertEqual(job["result"]["jobs_processed"], 0)
+        run.assert_called_once()
+        self.assertFalse(run.call_args.kwargs["full"])
+
+    def test_unknown_job_is_404(self):
+        self.assertEqual(self.client.get(f"/api/jobs/{uuid4()}").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
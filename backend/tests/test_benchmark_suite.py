@@ -0,0 +1,69 @@
+"""
+Smoke tests for the benchmark scripts (benchmarks/bench_quote_path.py, bench_update_pricing.py,
+bench_end_to_end.py) so they keep running.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import pricing
+from benchmarks import bench_end_to_end, bench_update_pricing
+from benchmarks.bench_quote_path import CaseResult, compare_to_baseline, run_suite
+
+
+class TestQuotePathBenchmarkSuite(unittest.TestCase):
+    def test_quick_run_reports_every_case(self):
+        results = run_suite((10, 100), quick=True)
+
+        self.assertEqual(
+            [(r.case, r.elements) for r in results],
+            [("expand", 10), ("calculate_quote", 10), ("expand", 100), ("calculate_quote", 100)],
+        )
+        for r in results:
+            self.assertGreater(r.ops_per_sec, 0)
+            self.assertLessEqual(r.p50_ms, r.p99_ms)
+            # Warm pricing cache + rules snapshot: no Supabase round trips per quote.
+            self.assertEqual(r.round_trips_per_call, 0)
+
+    def test_regressions_fail_against_baseline(self):
+        result = CaseResult("expand", 100, 10, 100.0, 2.0, 3.0, 50.0, 0.0)
+        baseline = {"cases": [{"case": "expand", "elements": 100, "p50_ms": 1.0, "peak_alloc_kib": 10.0, "round_trips_per_call": 0.0}]}
+
+        regressions = compare_to_baseline([result], baseline, tolerance=0.5, alloc_tolerance=0.25)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(compare_to_baseline([result], baseline, tolerance=2.0, alloc_tolerance=5.0), [])
+
+
+
+class TestUpdatePricingBenchmark(unittest.TestCase):
+    def test_batched_path_matches_per_row_with_fewer_round_trips(self):
+        results = bench_update_pricing.run(items=1200, latency=0.0, missing=3)
+        self.assertEqual(results["per_row"]["updated"], 1197)
+        self.assertEqual(results["batched"]["updated"], 1197)
+        self.assertEqual(results["per_row"]["round_trips"], 1200)
+        # Every product has its own price: round trips follow the 500-product chunks only.
+        chunks = -(-1200 // pricing.DEFAULT_UPDATE_PRICING_CHUNK_SIZE)
+        self.assertEqual(results["batched"]["round_trips"], chunks)
+
+
+class TestEndToEndBenchmark(unittest.TestCase):
+    def test_round_trips_do_not_grow_with_jobs(self):
+        small = {r.scenario: r for r in bench_end_to_end.run_dashboard(10) + bench_end_to_end.run_sync(10)}
+        large = {r.scenario: r for r in bench_end_to_end.run_dashboard(60) + bench_end_to_end.run_sync(60)}
+
+        for scenario in ("bonus_dashboard", "job_sync_full", "job_sync_incremental"):
+            self.assertEqual(small[scenario].calls, large[scenario].calls, scenario)
+        self.assertEqual(large["job_sync_full"].calls["upsert job_performance"], 1)
+        self.assertNotIn("upsert job_performance", large["job_sync_incremental"].calls)
+
+    def test_warm_quote_needs_no_round_trips(self):
+        cold, warm = bench_end_to_end.run_quote(elements=10)
+        self.assertGreater(cold.round_trips, 0)
+        self.assertEqual(warm.round_trips, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,8 @@ from fastapi.testclient import TestClient
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import main as backend_main
+from app.quote_memo import clear_quote_memo
+from app.material_rules import build_measured_rules_snapshot
 
 
 class TestCalculateQuoteAccessoryInferenceBaseline(unittest.TestCase):
@@ -22,6 +24,9 @@ class TestCalculateQuoteAccessoryInferenceBaseline(unittest.TestCase):
     def setUpClass(cls):
         cls.client = TestClient(backend_main.app)
 
+    def setUp(self):
+        clear_quote_memo()
+
     def _pricing_for(self, product_ids):
         return {
             pid: {"name": pid, "cost_price": 1.0, "markup_percentage": 0.0}
@@ -34,7 +39,7 @@ class TestCalculateQuoteAccessoryInferenceBaseline(unittest.TestCase):
         product_ids.update({"BRK-SC-MAR", "SCR-SS", "SCL-65", "ACL-65"})
         with patch.object(
             backend_main,
-            "get_product_pricing",
+            "get_product_pricing_async",
             return_value=self._pricing_for(product_ids),
         ), patch.object(
             backend_main,
@@ -42,8 +47,8 @@ class TestCalculateQuoteAccessoryInferenceBaseline(unittest.TestCase):
             return_value=object(),
         ), patch.object(
             backend_main,
-            "get_measured_material_rules_for_quote",
-            return_value=None,
+            "get_measured_rules_snapshot",
+            return_value=build_measured_rules_snapshot(None, version=1),
         ):
             resp = self.client.post(
                 "/api/calculate-quote",
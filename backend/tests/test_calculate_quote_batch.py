@@ -0,0 +1,149 @@
+"""
+Tests for POST /api/calculate-quote/batch: shared rule/pricing load and per-quote errors.
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main as backend_main
+from app import material_rules
+from app.quote_memo import clear_quote_memo
+from app.material_rules import build_measured_rules_snapshot
+
+DEFAULT_RULES_SNAPSHOT = build_measured_rules_snapshot(None, version=1)
+
+
+class TestCalculateQuoteBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(backend_main.app)
+
+    def setUp(self):
+        clear_quote_memo()
+
+    @staticmethod
+    def _pricing_for(product_ids):
+        return {
+            pid: {"id": pid, "name": pid, "cost_price": 10.0, "markup_percentage": 50.0, "unit": "each"}
+            for pid in product_ids
+        }
+
+    def _post_batch(self, quotes, priced_ids):
+        pricing = self._pricing_for(priced_ids)
+        with patch.object(
+            backend_main, "get_product_pricing", return_value=pricing
+        ) as pricing_mock, patch.object(
+            backend_main, "get_measured_rules_snapshot", return_value=DEFAULT_RULES_SNAPSHOT
+        ) as rules_mock:
+            resp = self.client.post("/api/calculate-quote/batch", json={"quotes": quotes})
+        return resp, pricing_mock, rules_mock
+
+    def test_rules_and_pricing_loaded_once_for_union_of_products(self):
+        quotes = [
+            {"elements": [{"assetId": "GUT-SC-MAR-3M", "quantity": 1, "length_mm": 3000}], "labour_elements": []},
+            {"elements": [{"assetId": "DP-65-3M", "quantity": 1}], "labour_elements": [{"assetId": "REP-LAB", "quantity": 2}]},
+        ]
+        priced = {"GUT-SC-MAR-3M", "BRK-SC-MAR", "SCR-SS", "DP-65-3M", "SCL-65", "REP-LAB"}
+
+        resp, pricing_mock, rules_mock = self._post_batch(quotes, priced)
+
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertEqual(pricing_mock.call_count, 1)
+        self.assertEqual(rules_mock.call_count, 1)
+        self.assertEqual(resp.json()["rules_version"], DEFAULT_RULES_SNAPSHOT.version)
+        self.assertEqual(set(pricing_mock.call_args.args[0]), priced)
+        payload = resp.json()
+        self.assertEqual(payload["succeeded"], 2)
+        self.assertEqual(payload["failed"], 0)
+        self.assertEqual([r["index"] for r in payload["results"]], [0, 1])
+        self.assertEqual(payload["results"][1]["quote"]["labour_hours"], 2)
+        self.assertAlmostEqual(payload["results"][1]["quote"]["labour_subtotal"], 30.0)
+
+    def test_missing_product_fails_only_its_quote(self):
+        quotes = [
+            {"elements": [{"assetId": "DROPPER", "quantity": 1}], "labour_elements": []},
+            {"elements": [{"assetId": "UNKNOWN-PART", "quantity": 1}], "labour_elements": []},
+            {"elements": [], "labour_elements": [{"assetId": "REP-LAB", "quantity": 1}]},
+        ]
+
+        resp, _, _ = self._post_batch(quotes, {"DROPPER", "SCR-SS", "REP-LAB"})
+
+        self.assertEqual(resp.status_code, 200, resp.text)
+        payload = resp.json()
+        self.assertEqual(payload["succeeded"], 2)
+        self.assertEqual(payload["failed"], 1)
+        results = payload["results"]
+        self.assertIsNone(results[0]["error"])
+        self.assertIsNone(results[1]["quote"])
+        self.assertEqual(results[1]["error"], "Product UNKNOWN-PART not found or missing pricing")
+        self.assertAlmostEqual(results[2]["quote"]["total"], 15.0)
+
+    def test_batch_matches_single_quote_endpoint(self):
+        body = {
+            "elements": [
+                {"assetId": "GUT-SC-MAR-3M", "quantity": 2, "length_mm": 5010},
+                {"assetId": "DP-65-3M", "quantity": 1, "length_mm": 2400},
+            ],
+            "labour_elements": [{"assetId": "REP-LAB", "quantity": 1.5}],
+        }
+        priced = {"GUT-SC-MAR-3M", "BRK-SC-MAR", "SCR-SS", "DP-65-3M", "SCL-65", "REP-LAB"}
+        batch_resp, _, _ = self._post_batch([body], priced)
+        with patch.object(
+            backend_main, "get_product_pricing_async", return_value=self._pricing_for(priced)
+        ), patch.object(
+            backend_main, "get_supabase", return_value=object()
+        ), patch.object(
+            backend_main, "get_measured_rules_snapshot", return_value=DEFAULT_RULES_SNAPSHOT
+        ):
+            single_resp = self.client.post("/api/calculate-quote", json=body)
+
+        self.assertEqual(single_resp.status_code, 200, single_resp.text)
+        self.assertEqual(batch_resp.json()["results"][0]["quote"], single_resp.json()["quote"])
+
+    def test_cold_rules_snapshot_is_loaded_once_per_batch(self):
+        quotes = [{"elements": [{"assetId": "DROPPER", "quantity": 1}], "labour_elements": []}] * 3
+        cold = build_measured_rules_snapshot(None, version=0)
+        loaded = build_measured_rules_snapshot(None, version=4)
+        supabase = object()
+        with patch.object(backend_main, "get_product_pricing", return_value=self._pricing_for({"DROPPER", "SCR-SS"})), patch.object(
+            backend_main, "get_measured_rules_snapshot", return_value=cold
+        ), patch.object(material_rules, "_measured_rules_snapshot", cold), patch.object(
+            material_rules, "_cold_load_retry_at", 0.0
+        ), patch.object(backend_main, "get_supabase", return_value=supabase), patch.object(
+            material_rules, "refresh_measured_rules_snapshot", return_value=loaded
+        ) as refresh_mock:
+            resp = self.client.post("/api/calculate-quote/batch", json={"quotes": quotes})
+
+        self.assertEqual(resp.status_code, 200, resp.text)
+        refresh_mock.assert_called_once_with(supabase)
+        self.assertEqual(resp.json()["rules_version"], 4)
+        self.assertEqual(resp.json()["succeeded"], 3)
+
+    def test_cold_rules_snapshot_falls_back_to_defaults_when_load_fails(self):
+        quotes = [{"elements": [{"assetId": "DROPPER", "quantity": 1}], "labour_elements": []}]
+        cold = build_measured_rules_snapshot(None, version=0)
+        with patch.object(backend_main, "get_product_pricing", return_value=self._pricing_for({"DROPPER", "SCR-SS"})), patch.object(
+            backend_main, "get_measured_rules_snapshot", return_value=cold
+        ), patch.object(material_rules, "_measured_rules_snapshot", cold), patch.object(
+            material_rules, "_cold_load_retry_at", 0.0
+        ), patch.object(backend_main, "get_supabase", return_value=object()), patch.object(
+            material_rules, "refresh_measured_rules_snapshot", side_effect=RuntimeError("db down")
+        ):
+            resp = self.client.post("/api/calculate-quote/batch", json={"quotes": quotes})
+
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertEqual(resp.json()["rules_version"], 0)
+        self.assertEqual(resp.json()["succeeded"], 1)
+
+    def test_empty_batch_is_rejected(self):
+        resp = self.client.post("/api/calculate-quote/batch", json={"quotes": []})
+        self.assertEqual(resp.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
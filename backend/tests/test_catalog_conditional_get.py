@@ -0,0 +1,96 @@
+"""
+Tests for catalog revisioning and conditional GET on /api/products and /api/quick-quoter/catalog.
+"""
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main as backend_main
+from app.catalog_revision import bump_catalog_revision, get_catalog_revision
+from app.products import ProductCatalogIndex, invalidate_product_catalog_index
+
+ROWS = [
+    {"id": "GUT-SC-MAR-3M", "name": "Storm Cloud Gutter 3m", "category": "channel", "profile": "storm_cloud"},
+    {"id": "DP-65-3M", "name": "Downpipe 65mm 3m", "category": "pipe", "profile": None},
+]
+REPAIR_TYPES = [
+    {"id": "other", "label": "Other", "requires_profile": False, "requires_size_mm": False, "sort_order": 99, "active": True}
+]
+
+
+class TestCatalogConditionalGet(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(backend_main.app)
+
+    def setUp(self):
+        bump_catalog_revision()
+        self.index = ProductCatalogIndex(ROWS)
+        patcher = patch.object(backend_main, "get_product_catalog_index", side_effect=lambda: self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_products_return_validators_and_304(self):
+        first = self.client.get("/api/products")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([p["id"] for p in first.json()["products"]], ["GUT-SC-MAR-3M", "DP-65-3M"])
+        etag = first.headers["etag"]
+        self.assertTrue(first.headers["last-modified"])
+        self.assertEqual(first.headers["cache-control"], "no-cache")
+
+        not_modified = self.client.get("/api/products", headers={"If-None-Match": etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.headers["etag"], etag)
+
+        since = self.client.get("/api/products", headers={"If-Modified-Since": first.headers["last-modified"]})
+        self.assertEqual(since.status_code, 304)
+
+        filtered = self.client.get("/api/products?category=pipe", headers={"If-None-Match": etag})
+        self.assertEqual(filtered.status_code, 200)
+        self.assertNotEqual(filtered.headers["etag"], etag)
+
+    def test_rebuilt_index_with_new_content_changes_etag(self):
+        etag = self.client.get("/api/products").headers["etag"]
+        self.index = ProductCatalogIndex(ROWS + [{"id": "SCR-SS", "name": "Screw", "category": "fixing"}])
+
+        resp = self.client.get("/api/products", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()["products"]), 3)
+
+    def test_invalidating_products_bumps_revision(self):
+        before = get_catalog_revision()
+        invalidate_product_catalog_index()
+        self.assertEqual(get_catalog_revision(), before + 1)
+
+    def test_quick_quoter_catalog_is_cached_per_revision(self):
+        with patch.object(backend_main, "get_supabase", return_value=object()), patch.object(
+            backend_main, "get_quick_quoter_catalog", return_value=REPAIR_TYPES
+        ) as catalog_mock:
+            first = self.client.get("/api/quick-quoter/catalog")
+            cached = self.client.get("/api/quick-quoter/catalog", headers={"If-None-Match": first.headers["etag"]})
+            bump_catalog_revision()
+            after_bump = self.client.get("/api/quick-quoter/catalog", headers={"If-None-Match": first.headers["etag"]})
+
+        self.assertEqual(first.json(), {"repair_types": REPAIR_TYPES})
+        self.assertEqual(cached.status_code, 304)
+        # Reloaded after the bump; same content keeps the same ETag.
+        self.assertEqual(after_bump.status_code, 304)
+        self.assertEqual(catalog_mock.call_count, 2)
+
+    def test_quick_quoter_catalog_not_cached_when_ttl_is_zero(self):
+        with patch.dict(os.environ, {"CATALOG_INDEX_TTL_SECONDS": "0"}), patch.object(
+            backend_main, "get_supabase", return_value=object()
+        ), patch.object(backend_main, "get_quick_quoter_catalog", return_value=REPAIR_TYPES) as catalog_mock:
+            self.client.get("/api/quick-quoter/catalog")
+            self.client.get("/api/quick-quoter/catalog")
+        self.assertEqual(catalog_mock.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+"""
+Tests for the streaming CSV product import (app.csv_import): chunked upserts, diffing against
+stored products (only changed rows written) and the dry-run preview.
+"""
+import io
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main as backend_main
+from app import background_jobs, csv_import
+from app.background_jobs import wait_for_job
+from app.csv_import import _parse_csv_rows, import_products_from_csv
+from benchmarks.stub_supabase import StubSupabase
+
+HEADER = "Item Number,Servicem8 Material_uuid,Item Name,Purchase Cost,Price\n"
+
+
+def _csv(rows):
+    return HEADER + "".join(f"{item},,{name},{cost},{price}\n" for item, name, cost, price in rows)
+
+
+class TestCsvImport(unittest.TestCase):
+    def setUp(self):
+        self.supabase = StubSupabase()
+        self.supabase.on_execute = self._record
+        self.selects = []
+        self.upserts = []
+        self.bad_ids = set()
+        patches = [
+            patch.object(csv_import, "get_supabase", return_value=self.supabase),
+            patch.object(csv_import, "invalidate_pricing_cache"),
+            patch.object(csv_import, "invalidate_product_catalog_index"),
+            patch.dict(os.environ, {"CSV_IMPORT_CHUNK_SIZE": "100"}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _record(self, query):
+        if query.op == "upsert":
+            ids = [r["id"] for r in query.values]
+            self.upserts.append(ids)
+            if self.bad_ids.intersection(ids):
+                raise RuntimeError("constraint violation")
+        elif query.op == "select":
+            self.selects.append(query.filters)
+
+    def _row(self, pid):
+        return next(r for r in self.supabase.tables["products"] if r["id"] == pid)
+
+    def test_chunks_rows_into_multi_row_upserts(self):
+        content = _csv([(f"ITEM-{i}", f"Widget {i}", "1.00", "2.00") for i in range(250)])
+        result = import_products_from_csv(content)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["imported"], 250)
+        self.assertEqual(result["inserted"], 250)
+        self.assertEqual([len(ids) for ids in self.upserts], [100, 100, 50])
+        self.assertEqual(len(self.selects), 3)
+        csv_import.invalidate_pricing_cache.assert_called_once()
+        csv_import.invalidate_product_catalog_index.assert_called_once()
+
+    def test_counts_inserted_updated_unchanged_against_catalog(self):
+        import_products_from_csv(_csv([("GUT-SC-MAR-3M", "Gutter Storm Cloud 3m", "10.00", "20.00"),
+                                       ("BRK-SC-MAR", "Bracket Storm Cloud", "1.00", "2.00")]))
+        result = import_products_from_csv(_csv([
+            ("GUT-SC-MAR-3M", "Gutter Storm Cloud 3m", "$10.00", "20"),  # same values, different formatting
+            ("BRK-SC-MAR", "Bracket Storm Cloud", "1.25", "2.00"),
+            ("SCR-SS", "Screws SS", "0.10", "0.20"),
+        ]))
+        self.assertEqual(
+            {k: result[k] for k in ("imported", "inserted", "updated", "unchanged", "failed")},
+            {"imported": 3, "inserted": 1, "updated": 1, "unchanged": 1, "failed": 0},
+        )
+        self.assertEqual(self._row("BRK-SC-MAR")["cost_price"], 1.25)
+        self.assertEqual(sorted(self.upserts[-1]), ["BRK-SC-MAR", "SCR-SS"])
+
+    def test_repeat_import_writes_nothing(self):
+        content = _csv([(f"ITEM-{i}", f"Widget {i}", "1.00", "2.00") for i in range(150)])
+        import_products_from_csv(content)
+        csv_import.invalidate_pricing_cache.reset_mock()
+        upserts_before = len(self.upserts)
+        result = import_products_from_csv(content)
+        self.assertTrue(result["success"])
+        self.assertEqual((result["imported"], result["unchanged"], result["updated"]), (150, 150, 0))
+        self.assertEqual(len(self.upserts), upserts_before)
+        csv_import.invalidate_pricing_cache.assert_not_called()
+
+    def test_reactivates_inactive_product(self):
+        import_products_from_csv(_csv([("A-1", "Widget", "1.00", "2.00")]))
+        self._row("A-1")["active"] = False
+        result = import_products_from_csv(_csv([("A-1", "Widget", "1.00", "2.00")]))
+        self.assertEqual(result["updated"], 1)
+        self.assertTrue(self._row("A-1")["active"])
+
+    def test_dry_run_returns_change_set_without_writing(self):
+        import_products_from_csv(_csv([("A-1", "Widget", "1.00", "2.00"), ("B-2", "Widget", "1.00", "2.00")]))
+        upserts_before = len(self.upserts)
+        csv_import.invalidate_pricing_cache.reset_mock()
+        result = import_products_from_csv(
+            _csv([("A-1", "Widget", "1.00", "2.00"), ("B-2", "Widget", "1.50", "2.00"), ("C-3", "Gadget", "3", "4")]),
+            dry_run=True,
+        )
+        self.assertTrue(result["dry_run"])
+        self.assertEqual((result["inserted"], result["updated"], result["unchanged"]), (1, 1, 1))
+        by_id = {c["id"]: c for c in result["changes"]}
+        self.assertEqual(set(by_id), {"B-2", "C-3"})
+        self.assertEqual(by_id["B-2"]["action"], "update")
+        self.assertEqual(by_id["B-2"]["fields"], {"cost_price": {"old": 1.0, "new": 1.5}})
+        self.assertEqual(by_id["C-3"]["action"], "insert")
+        self.assertEqual(by_id["C-3"]["fields"]["name"], {"old": None, "new": "Gadget"})
+        self.assertEqual(len(self.upserts), upserts_before)
+        self.assertEqual(self._row("B-2")["cost_price"], 1.0)
+        csv_import.invalidate_pricing_cache.assert_not_called()
+
+    def test_duplicate_item_numbers_keep_last_row(self):
+        result = import_products_from_csv(_csv([("A-1", "Widget", "1.00", "2.00"), ("A-1", "Widget", "3.00", "4.00")]))
+        self.assertEqual(result["inserted"], 1)
+        self.assertEqual(self.upserts, [["A-1"]])
+        self.assertEqual(self._row("A-1")["cost_price"], 3.0)
+
+    def test_failed_chunk_falls_back_to_row_upserts(self):
+        self.bad_ids = {"B-2"}
+        result = import_products_from_csv(_csv([("A-1", "Widget", "1", "2"), ("B-2", "Widget", "1", "2"), ("C-3", "Widget", "1", "2")]))
+        self.assertFalse(result["success"])
+        self.assertEqual((result["inserted"], result["failed"]), (2, 1))
+        self.assertTrue(result["errors"][0].startswith("B-2:"))
+        self.assertEqual({r["id"] for r in self.supabase.tables["products"]}, {"A-1", "C-3"})
+
+    def test_parse_errors_reported_with_row_numbers(self):
+        result = import_products_from_csv(_csv([("A-1", "Widget", "abc", "2"), ("B-2", "Widget", "1", "2")]))
+        self.assertEqual(result["inserted"], 1)
+        self.assertEqual(result["errors"], ["Row 2: Invalid Purchase Cost 'abc'"])
+
+    def test_missing_headers_writes_nothing(self):
+        result = import_products_from_csv("Item Number,Item Name\nA-1,Widget\n")
+        self.assertFalse(result["success"])
+        self.assertEqual(result["imported"], 0)
+        self.assertEqual(self.upserts, [])
+        csv_import.invalidate_pricing_cache.assert_not_called()
+
+    def test_accepts_text_stream(self):
+        result = import_products_from_csv(io.StringIO(_csv([("A-1", "Widget", "1", "2")])))
+        self.assertEqual(result["inserted"], 1)
+
+    def test_parse_csv_rows_still_returns_all_rows(self):
+        rows, errors = _parse_csv_rows(_csv([("DP-65-3M", "Downpipe 65mm 3m", "5", "9")]))
+        self.assertEqual(errors, [])
+        self.assertEqual(rows[0]["category"], "pipe")
+
+
+class TestImportCsvEndpoint(unittest.TestCase):
+    def setUp(self):
+        backend_main.app.dependency_overrides[backend_main.get_current_user_id_and_role] = lambda: (uuid4(), "admin")
+        self.addCleanup(backend_main.app.dependency_overrides.clear)
+        p = patch.object(background_jobs, "get_supabase", side_effect=ValueError("no supabase in tests"))
+        p.start()
+        self.addCleanup(p.stop)
+        self.client = TestClient(backend_main.app)
+
+    def test_import_runs_as_background_job(self):
+        seen = {}
+
+        def fake_import(stream, progress=None):
+            seen["text"] = stream.read()
+            progress(1)
+            return {"success": True, "imported": 1, "inserted": 1, "updated": 0, "unchanged": 0, "failed": 0, "errors": []}
+
+        with patch.object(backend_main, "import_products_from_csv", side_effect=fake_import):
+            resp = self.client.post(
+                "/api/products/import-csv",
+                files={"file": ("stock.csv", _csv([("A-1", "Widget", "1", "2")]).encode("utf-8"), "text/csv")},
+            )
+            self.assertEqual(resp.status_code, 202, resp.text)
+            self.assertEqual(resp.json()["kind"], "import_csv")
+            job = wait_for_job(resp.json()["job_id"], timeout=5)
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"]["inserted"], 1)
+        self.assertEqual(job["progress"]["done"], 1)
+        self.assertIn("A-1,,Widget", seen["text"])
+
+    def test_import_with_only_header_errors_fails_job(self):
+        resp = self.client.post(
+            "/api/products/import-csv",
+            files={"file": ("stock.csv", b"Item Number,Item Name\nA-1,Widget\n", "text/csv")},
+        )
+        self.assertEqual(resp.status_code, 202, resp.text)
+        job = wait_for_job(resp.json()["job_id"], timeout=5)
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("Missing required columns", job["error"])
+
+    def test_rejects_non_csv_upload(self):
+        resp = self.client.post("/api/products/import-csv", files={"file": ("stock.txt", b"x", "text/plain")})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_preview_runs_dry_import(self):
+        with patch.object(
+            backend_main,
+            "import_products_from_csv",
+            return_value={"success": True, "imported": 1, "inserted": 0, "updated": 1, "unchanged": 0,
+                          "failed": 0, "errors": [], "dry_run": True, "changes": []},
+        ) as mock_import:
+            resp = self.client.post(
+                "/api/products/import-csv/preview",
+                files={"file": ("stock.csv", _csv([("A-1", "Widget", "1", "2")]).encode("utf-8"), "text/csv")},
+            )
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertTrue(resp.json()["dry_run"])
+        self.assertTrue(mock_import.call_args.args[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,12 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from app.gutter_accessories import expand_elements_with_gutter_accessories
+from app.gutter_accessories import (
+    CompiledAccessoryRules,
+    classify_asset,
+    compile_accessory_rules,
+    expand_elements_with_gutter_accessories,
+)
 
 
 class TestGutterAccessoriesConfigurable(unittest.TestCase):
@@ -78,5 +83,65 @@ class TestGutterAccessoriesConfigurable(unittest.TestCase):
         self.assertNotIn("SCL-80", out)
 
 
+class TestCompiledAccessoryRules(unittest.TestCase):
+    def test_equal_configs_share_one_compiled_instance(self):
+        a = compile_accessory_rules({"bracket_spacing_mm": 500, "screw_product_id": " SCR-X "})
+        b = compile_accessory_rules({"screw_product_id": "SCR-X", "bracket_spacing_mm": "500"})
+
+        self.assertIs(a, b)
+        self.assertIs(compile_accessory_rules(a), a)
+        self.assertEqual(a.bracket_spacing_mm, 500)
+        self.assertEqual(a.screw_product_id, "SCR-X")
+
+    def test_invalid_values_fall_back_to_defaults(self):
+        compiled = compile_accessory_rules({"bracket_spacing_mm": 0, "clip_selection_mode": "bogus"})
+
+        self.assertIs(compiled, compile_accessory_rules(None))
+        self.assertEqual(compiled.as_dict(), compile_accessory_rules({}).as_dict())
+
+    def test_compiled_rules_are_immutable(self):
+        compiled = compile_accessory_rules()
+        with self.assertRaises(Exception):
+            compiled.bracket_spacing_mm = 1
+
+    def test_classify_asset_kinds(self):
+        rules = compile_accessory_rules({"saddle_clip_product_id_65": "CLIP-S", "adjustable_clip_product_id_80": "CLIP-A"})
+
+        self.assertEqual(classify_asset("GUT-CL-MAR-1.5M", rules).kind, "gutter")
+        self.assertEqual(classify_asset("GUT-CL-MAR-1.5M", rules).gutter_length_m, 1.5)
+        self.assertEqual(classify_asset("DP-80-3M", rules).kind, "downpipe")
+        self.assertEqual(classify_asset("DP-80-3M", rules).clip_size, "80")
+        self.assertTrue(classify_asset("DP-80-3M", rules).is_downpipe_main)
+        self.assertFalse(classify_asset("DPJ-65", rules).is_downpipe_main)
+        self.assertEqual(classify_asset("dropper", rules).kind, "dropper")
+        self.assertEqual(classify_asset("clip-s", rules).kind, "saddle_clip")
+        self.assertEqual(classify_asset("CLIP-A", rules).kind, "adjustable_clip")
+        self.assertEqual(classify_asset("EO-SC-MAR-65", rules).kind, "other")
+
+    def test_compiled_rules_expand_same_as_raw_config(self):
+        config = {"clip_selection_mode": "auto_by_acl_presence", "screws_per_dropper": 6}
+        elements = [
+            {"assetId": "GUT-CL-MAR-5M", "quantity": 2},
+            {"assetId": "DP-80-3M", "quantity": 1, "length_mm": 2500},
+            {"assetId": "DP-80-1.5M", "quantity": 1},
+            {"assetId": "DP-65-3M", "quantity": 2},
+            {"assetId": "ACL-65", "quantity": 1},
+            {"assetId": "DRP-65", "quantity": 3},
+        ]
+
+        compiled = compile_accessory_rules(config)
+        self.assertIsInstance(compiled, CompiledAccessoryRules)
+        self.assertEqual(
+            expand_elements_with_gutter_accessories(elements, rules_config=compiled),
+            expand_elements_with_gutter_accessories(elements, rules_config=config),
+        )
+        out = {r["assetId"]: r["quantity"] for r in expand_elements_with_gutter_accessories(elements, rules_config=compiled)}
+        # ACL present -> adjustable clips; 80mm size has measured length so the 1.5M sub-piece adds none.
+        self.assertAlmostEqual(out["ACL-80"], 3.0)
+        self.assertAlmostEqual(out["ACL-65"], 3.0)
+        self.assertAlmostEqual(out["BRK-CL-MAR"], 26.0)
+        self.assertNotIn("SCL-65", out)
+
+
 if __name__ == "__main__":
     unittest.main()
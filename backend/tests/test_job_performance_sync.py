@@ -0,0 +1,382 @@
+"""
+Tests for the concurrent job_performance sync pipeline (app.job_performance_sync.run_sync)
+and the ServiceM8 rate limiter it uses (app.rate_limit.TokenBucket).
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+import uuid
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import job_performance_sync as sync
+from app import products, servicem8
+from app.rate_limit import TokenBucket
+from benchmarks.servicem8_simulator import ServiceM8Simulator, SimulatorConfig
+from benchmarks.stub_supabase import StubSupabase
+
+
+def _jobs(n):
+    return [
+        {
+            "uuid": str(uuid.UUID(int=i + 1)),
+            "generated_job_id": f"J{i:04d}",
+            "total_invoice_amount": "115.00",
+            "payment_date": "2026-03-01 10:00:00",
+            "edit_date": f"2026-03-01 {8 + i // 60:02d}:{i % 60:02d}:00",
+            "status": "Completed",
+        }
+        for i in range(n)
+    ]
+
+
+class TestRunSyncPipeline(unittest.TestCase):
+    def setUp(self):
+        self.db = StubSupabase({"quotes": [{"id": "q1", "servicem8_job_id": "J0001", "labour_hours": 2.5}]})
+        self.jobs = _jobs(12)
+        self.materials_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.listing_filters = []
+
+        def list_job_materials(_token, job_uuid, strict=False):
+            with self.lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.02)
+            with self.lock:
+                self.in_flight -= 1
+                self.materials_calls.append(job_uuid)
+            return [{"material_uuid": "", "quantity": 1, "cost": "10"}]
+
+        patches = [
+            patch.object(sync, "get_sync_user_id", return_value="sync-user"),
+            patch.object(sync, "get_tokens", return_value={"access_token": "tok"}),
+            patch.object(sync, "get_supabase", return_value=self.db),
+            patch.object(sync, "iter_job_pages", side_effect=self._iter_job_pages),
+            patch.object(sync, "get_staff_uuid_to_technician_id_map", return_value={"staff-1": "tech-1"}),
+            patch.object(sync, "list_job_materials", side_effect=list_job_materials),
+            patch.object(sync, "list_job_activities", return_value=[{"staff_uuid": "staff-1", "duration": 90}]),
+            patch.dict(os.environ, {"SERVICEM8_SYNC_CONCURRENCY": "4"}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _iter_job_pages(self, token, statuses, edited_since=None):
+        for status in statuses:
+            jobs = self._list_jobs(token, status, edited_since)
+            for start in range(0, len(jobs), 5):
+                yield status, jobs[start:start + 5]
+
+    def _list_jobs(self, _token, status, edited_since=None):
+        self.listing_filters.append((status, edited_since))
+        jobs = self.jobs if status == "Completed" else self.jobs[:3]
+        if edited_since:
+            jobs = [j for j in jobs if j["edit_date"] > edited_since]
+        return [dict(j) for j in jobs]
+
+    def test_syncs_every_job_concurrently(self):
+        progress = []
+        result = sync.run_sync(progress=lambda done, total: progress.append((done, total)))
+
+        self.assertTrue(result["success"], result)
+        self.assertEqual(result["jobs_processed"], 12)
+        self.assertEqual(result["rows_upserted"], 12)
+        self.assertEqual(result["jobs_failed"], 0)
+        self.assertGreater(result["jobs_per_second"], 0)
+        self.assertGreater(self.max_in_flight, 1)
+        self.assertLessEqual(self.max_in_flight, 4)
+        self.assertEqual(progress[0], (0, None))
+        self.assertEqual(progress[-1], (12, None))
+
+        rows = {r["servicem8_job_id"]: r for r in self.db.tables["job_performance"]}
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows["J0001"]["quoted_labor_minutes"], 150)
+        self.assertEqual(rows["J0001"]["invoiced_revenue_exc_gst"], 100.0)
+        self.assertEqual(rows["J0001"]["materials_cost"], 10.0)
+        self.assertEqual(len(self.db.tables["job_personnel"]), 12)
+
+    def test_database_round_trips_do_not_grow_with_jobs(self):
+        def trips_for(n):
+            self.db = StubSupabase({"quotes": [{"id": "q1", "servicem8_job_id": "J0001", "labour_hours": 2.5}]})
+            self.jobs = _jobs(n)
+            with patch.object(sync, "get_supabase", return_value=self.db):
+                result = sync.run_sync(full=True)
+            self.assertTrue(result["success"], result)
+            self.assertEqual(len(self.db.tables["job_performance"]), n)
+            return self.db.round_trips
+
+        self.assertEqual(trips_for(40), trips_for(5))
+
+    def test_material_costs_come_from_one_products_query(self):
+        self.db.tables["products"] = [{"id": "GUT-1", "servicem8_material_uuid": "mat-1", "cost_price": 4}]
+        original = sync.list_job_materials.side_effect
+
+        def with_catalog_line(token, job_uuid, strict=False):
+            return original(token, job_uuid, strict) + [{"material_uuid": "mat-1", "quantity": "2.5"}]
+
+        sync.list_job_materials.side_effect = with_catalog_line
+        sync.run_sync()
+        self.assertEqual(self.db.calls["select products"], 1)
+        row = next(r for r in self.db.tables["job_performance"] if r["servicem8_job_id"] == "J0003")
+        self.assertEqual(row["materials_cost"], 20.0)  # 10 (ServiceM8 cost) + 2.5 x 4 (our cost)
+
+    def test_sellers_from_active_quote_are_added_once(self):
+        self.db.tables["quotes"] = [
+            {"id": "q-old", "servicem8_job_id": "J0001", "labour_hours": 1, "is_final_quote": False,
+             "updated_at": "2026-03-02T00:00:00+00:00", "created_by": "seller-old"},
+            {"id": "q-final", "servicem8_job_id": "J0001", "labour_hours": 3, "is_final_quote": True,
+             "updated_at": "2026-03-01T00:00:00+00:00", "created_by": "seller-1", "co_seller_user_id": "tech-1"},
+        ]
+        sync.run_sync()
+        sync.run_sync(full=True)
+        row = next(r for r in self.db.tables["job_performance"] if r["servicem8_job_id"] == "J0001")
+        self.assertEqual(row["quote_id"], "q-final")
+        self.assertEqual(row["quoted_labor_minutes"], 180)
+        personnel = [r for r in self.db.tables["job_personnel"] if r["job_performance_id"] == row["id"]]
+        self.assertEqual(sorted((r["technician_id"], r["is_seller"]) for r in personnel), [("seller-1", True), ("tech-1", False)])
+
+    def test_failed_job_is_isolated(self):
+        original = sync.list_job_materials.side_effect
+
+        def flaky(token, job_uuid, strict=False):
+            if job_uuid == self.jobs[5]["uuid"]:
+                raise RuntimeError("ServiceM8 exploded")
+            return original(token, job_uuid, strict)
+
+        sync.list_job_materials.side_effect = flaky
+        result = sync.run_sync()
+
+        self.assertFalse(result["success"])
+        self.assertEqual(result["jobs_failed"], 1)
+        self.assertEqual(result["rows_upserted"], 11)
+        self.assertEqual(result["job_errors"], ["J0005: ServiceM8 exploded"])
+        self.assertEqual(result["error"], "1 of 12 jobs failed")
+        self.assertEqual(len(self.db.tables["job_performance"]), 11)
+
+    def test_rerun_preserves_admin_fields(self):
+        sync.run_sync()
+        row = next(r for r in self.db.tables["job_performance"] if r["servicem8_job_id"] == "J0002")
+        row["status"] = "verified"
+        row["admin_notes"] = "checked"
+        sync.run_sync()
+        row = next(r for r in self.db.tables["job_performance"] if r["servicem8_job_id"] == "J0002")
+        self.assertEqual(row["admin_notes"], "checked")
+        self.assertEqual(len(self.db.tables["job_personnel"]), 12)  # baseline not duplicated
+
+    def test_incremental_run_skips_unchanged_jobs(self):
+        first = sync.run_sync()
+        self.assertEqual(first["mode"], "full")  # no watermark yet
+        self.assertEqual(first["watermark"], "2026-03-01 08:11:00")
+        self.assertEqual(len(self.db.tables["servicem8_job_sync_state"]), 12)
+
+        self.materials_calls.clear()
+        self.jobs[4]["total_invoice_amount"] = "230.00"  # changed, edit_date unchanged
+        self.jobs[11]["edit_date"] = "2026-03-02 09:00:00"
+        second = sync.run_sync()
+
+        self.assertTrue(second["success"], second)
+        self.assertEqual(second["mode"], "incremental")
+        self.assertEqual(self.listing_filters[-1], ("Invoiced", "2026-03-01 08:01:00"))
+        self.assertEqual(second["jobs_processed"], 2)
+        self.assertEqual(second["jobs_skipped_unchanged"], second["jobs_listed"] - 2)
+        self.assertEqual(sorted(self.materials_calls), sorted([self.jobs[4]["uuid"], self.jobs[11]["uuid"]]))
+        self.assertEqual(second["watermark"], "2026-03-02 09:00:00")
+        row = next(r for r in self.db.tables["job_performance"] if r["servicem8_job_id"] == "J0004")
+        self.assertEqual(row["invoiced_revenue_exc_gst"], 200.0)
+
+    def test_failed_job_keeps_watermark_and_is_retried(self):
+        sync.run_sync()
+        self.jobs[11]["edit_date"] = "2026-03-02 09:00:00"
+        self.jobs[10]["edit_date"] = "2026-03-02 09:30:00"
+        original = sync.list_job_materials.side_effect
+
+        def flaky(token, job_uuid, strict=False):
+            if job_uuid == self.jobs[11]["uuid"]:
+                raise RuntimeError("timeout")
+            return original(token, job_uuid, strict)
+
+        sync.list_job_materials.side_effect = flaky
+        failed = sync.run_sync()
+        self.assertFalse(failed["success"])
+        self.assertEqual(failed["watermark"], "2026-03-01 08:11:00")
+
+        sync.list_job_materials.side_effect = original
+        retried = sync.run_sync()
+        self.assertTrue(retried["success"])
+        self.assertEqual(retried["jobs_processed"], 1)  # only the job that failed
+        self.assertEqual(retried["watermark"], "2026-03-02 09:30:00")
+
+    def test_bulk_prefetch_replaces_per_job_calls(self):
+        materials = {j["uuid"]: [{"job_uuid": j["uuid"], "material_uuid": "", "quantity": 1, "cost": "7"}] for j in self.jobs}
+        activities = {j["uuid"]: [{"job_uuid": j["uuid"], "staff_uuid": "staff-1", "duration": 30}] for j in self.jobs}
+        with patch.dict(os.environ, {"SERVICEM8_SYNC_BULK_FETCH_MIN_JOBS": "10"}), patch.object(
+            sync, "list_job_materials_bulk", return_value=materials
+        ) as materials_bulk, patch.object(sync, "list_job_activities_bulk", return_value=activities) as activities_bulk:
+            result = sync.run_sync()
+
+        self.assertTrue(result["success"], result)
+        self.assertEqual(self.materials_calls, [])
+        sync.list_job_activities.assert_not_called()
+        self.assertEqual(sorted(materials_bulk.call_args.args[1]), sorted(j["uuid"] for j in self.jobs))
+        activities_bulk.assert_called_once()
+        rows = {r["servicem8_job_id"]: r for r in self.db.tables["job_performance"]}
+        self.assertEqual(rows["J0003"]["materials_cost"], 7.0)
+        self.assertEqual(len(self.db.tables["job_personnel"]), 12)
+
+    def test_bulk_listing_is_scoped_to_each_batch(self):
+        scopes = []
+
+        def materials_bulk(_token, job_uuids):
+            scopes.append(sorted(job_uuids))
+            return {u: [{"job_uuid": u, "material_uuid": "", "quantity": 1, "cost": "7"}] for u in job_uuids}
+
+        env = {"SERVICEM8_SYNC_BULK_FETCH_MIN_JOBS": "4", "SERVICEM8_SYNC_BATCH_SIZE": "5"}
+        with patch.dict(os.environ, env), patch.object(
+            sync, "list_job_materials_bulk", side_effect=materials_bulk
+        ), patch.object(sync, "list_job_activities_bulk", return_value={}):
+            result = sync.run_sync()
+
+        self.assertTrue(result["success"], result)
+        # Listing pages of 5 make batches of 5, 5 and 2 changed jobs (the Invoiced page repeats synced
+        # jobs): the last is below the threshold and fetches per job, the others get a listing holding
+        # only their own jobs.
+        uuids = [j["uuid"] for j in self.jobs]
+        self.assertEqual(scopes, [sorted(uuids[0:5]), sorted(uuids[5:10])])
+        self.assertEqual(sorted(self.materials_calls), sorted(uuids[10:12]))
+        rows = {r["servicem8_job_id"]: r for r in self.db.tables["job_performance"]}
+        self.assertEqual((rows["J0004"]["materials_cost"], rows["J0011"]["materials_cost"]), (7.0, 10.0))
+
+    def test_small_runs_fetch_per_job(self):
+        with patch.object(sync, "list_job_materials_bulk") as materials_bulk:
+            sync.run_sync()
+        materials_bulk.assert_not_called()
+        self.assertEqual(len(self.materials_calls), 12)
+
+    def test_batches_sync_while_the_listing_streams(self):
+        events = []
+        original_sync_batch = sync._sync_batch
+
+        def listing(token, statuses, edited_since=None):
+            for status, page in self._iter_job_pages(token, statuses, edited_since):
+                events.append("page")
+                yield status, page
+
+        def sync_batch(*args):
+            events.append("batch")
+            return original_sync_batch(*args)
+
+        sync.iter_job_pages.side_effect = listing
+        with patch.dict(os.environ, {"SERVICEM8_SYNC_BATCH_SIZE": "5"}), patch.object(sync, "_sync_batch", sync_batch):
+            result = sync.run_sync()
+        self.assertTrue(result["success"], result)
+        self.assertEqual(len(self.db.tables["job_performance"]), 12)
+        self.assertLess(events.index("batch"), len(events) - 1 - events[::-1].index("page"))
+
+    def test_failed_listing_keeps_watermark(self):
+        sync.run_sync()
+        self.jobs[2]["edit_date"] = "2026-03-02 09:00:00"
+
+        def failing_listing(token, statuses, edited_since=None):
+            yield from self._iter_job_pages(token, statuses[:1], edited_since)
+            request = httpx.Request("GET", "https://api.servicem8.com/api_1.0/job.json")
+            raise httpx.HTTPStatusError("503", request=request, response=httpx.Response(503, request=request))
+
+        sync.iter_job_pages.side_effect = failing_listing
+        with patch.dict(os.environ, {"SERVICEM8_SYNC_BATCH_SIZE": "1"}):
+            result = sync.run_sync()
+        self.assertFalse(result["success"])
+        self.assertIn("listing failed", result["error"])
+        self.assertEqual(result["jobs_processed"], 1)
+        self.assertEqual(result["watermark"], "2026-03-01 08:11:00")
+
+    def test_full_run_ignores_watermark_and_fingerprints(self):
+        sync.run_sync()
+        result = sync.run_sync(full=True)
+        self.assertEqual(result["mode"], "full")
+        self.assertEqual(result["jobs_processed"], 12)
+        self.assertIsNone(self.listing_filters[-1][1])
+
+
+class TestRunSyncAgainstSimulator(unittest.TestCase):
+    """run_sync through the real ServiceM8 client against the local simulator."""
+
+    def _sync(self, jobs, batch_size):
+        sim = ServiceM8Simulator(SimulatorConfig(jobs=jobs, materials_per_job=2, activities_per_job=1, page_size=50)).start()
+        self.addCleanup(sim.stop)
+        db = StubSupabase({"products": [], "quotes": []})
+        env = {
+            "SERVICEM8_API_BASE_URL": sim.url,
+            "SERVICEM8_RATE_PER_SECOND": "0",
+            "SERVICEM8_SYNC_BATCH_SIZE": str(batch_size),
+            "SERVICEM8_SYNC_BULK_FETCH_MIN_JOBS": "10",
+        }
+        with patch.dict(os.environ, env), patch.object(sync, "get_supabase", return_value=db), patch.object(
+            servicem8, "get_supabase", return_value=db
+        ), patch.object(products, "get_supabase", return_value=db), patch.object(
+            sync, "get_sync_user_id", return_value="sync-user"
+        ), patch.object(sync, "get_tokens", return_value={"access_token": "tok"}):
+            servicem8.reset_rate_limiter()
+            servicem8.close_http_client()
+            products.invalidate_material_cost_map()
+            try:
+                result = sync.run_sync(full=True)
+            finally:
+                servicem8.close_http_client()
+                servicem8.reset_rate_limiter()
+        self.assertTrue(result["success"], result)
+        self.assertEqual(len(db.tables["job_performance"]), jobs)
+        return sim.stats()["by_endpoint"]
+
+    def test_bulk_listing_keeps_only_the_batch_jobs(self):
+        kept = []
+        original = servicem8.list_job_materials_bulk
+
+        def materials_bulk(token, job_uuids=None, edited_since=None):
+            grouped = original(token, job_uuids, edited_since)
+            kept.append((sorted(job_uuids), sorted(grouped), sum(len(lines) for lines in grouped.values())))
+            return grouped
+
+        with patch.object(sync, "list_job_materials_bulk", side_effect=materials_bulk):
+            by_endpoint = self._sync(120, batch_size=40)
+
+        self.assertEqual(len(kept), 3)
+        for wanted, grouped, lines in kept:
+            self.assertEqual(grouped, wanted)  # other jobs' lines are dropped while the listing streams
+            self.assertEqual(lines, 2 * len(wanted))
+        # Unfiltered by edit_date (a changed job's older lines still count): 240 lines in pages of 50
+        # per qualifying batch.
+        self.assertEqual(by_endpoint["GET /api_1.0/jobmaterial.json"], 3 * 5)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_pause_holds_back_acquire(self):
+        bucket = TokenBucket(rate=0)
+        bucket.pause(0.05)
+        self.assertGreaterEqual(bucket.acquire(), 0.04)
+        self.assertEqual(bucket.acquire(), 0)
+
+    def test_paces_calls_to_rate(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        t0 = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - t0, 0.04)
+        self.assertEqual(bucket.acquired, 6)
+        self.assertGreater(bucket.waited_seconds, 0)
+
+    def test_burst_and_unlimited_do_not_wait(self):
+        self.assertEqual(sum(TokenBucket(rate=1, burst=5).acquire() for _ in range(5)), 0)
+        self.assertEqual(sum(TokenBucket(rate=0).acquire() for _ in range(50)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,8 @@
 """API tests for admin material-rules endpoints."""
-import copy
 import sys
 import unittest
 import uuid as uuid_lib
 from pathlib import Path
-from types import SimpleNamespace
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
@@ -12,143 +10,8 @@ from fastapi.testclient import TestClient
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import main as backend_main
-
-
-class FakeQuery:
-    def __init__(self, supabase, table_name):
-        self.supabase = supabase
-        self.table_name = table_name
-        self._op = "select"
-        self._filters = []
-        self._orders = []
-        self._limit = None
-        self._payload = None
-        self._on_conflict = None
-
-    def select(self, _fields):
-        self._op = "select"
-        return self
-
-    def eq(self, field, value):
-        self._filters.append(("eq", field, value))
-        return self
-
-    def in_(self, field, values):
-        self._filters.append(("in", field, set(values or [])))
-        return self
-
-    def order(self, field, desc=False):
-        self._orders.append((field, bool(desc)))
-        return self
-
-    def limit(self, n):
-        self._limit = int(n)
-        return self
-
-    def upsert(self, payload, on_conflict="id"):
-        self._op = "upsert"
-        self._payload = payload
-        self._on_conflict = on_conflict or "id"
-        return self
-
-    def insert(self, payload):
-        self._op = "insert"
-        self._payload = payload
-        return self
-
-    def update(self, payload):
-        self._op = "update"
-        self._payload = payload
-        return self
-
-    def delete(self):
-        self._op = "delete"
-        return self
-
-    def _table_rows(self):
-        return self.supabase.tables.setdefault(self.table_name, [])
-
-    def _matches(self, row):
-        for kind, field, value in self._filters:
-            if kind == "eq" and row.get(field) != value:
-                return False
-            if kind == "in" and row.get(field) not in value:
-                return False
-        return True
-
-    def _filtered_rows(self):
-        rows = [copy.deepcopy(r) for r in self._table_rows() if self._matches(r)]
-        for field, desc in reversed(self._orders):
-            rows.sort(key=lambda r: r.get(field), reverse=desc)
-        if self._limit is not None:
-            rows = rows[: self._limit]
-        return rows
-
-    def execute(self):
-        rows = self._table_rows()
-
-        if self._op == "select":
-            return SimpleNamespace(data=self._filtered_rows())
-
-        if self._op == "insert":
-            payload_rows = self._payload if isinstance(self._payload, list) else [self._payload]
-            inserted = []
-            for raw in payload_rows:
-                row = copy.deepcopy(raw)
-                rows.append(row)
-                inserted.append(copy.deepcopy(row))
-            return SimpleNamespace(data=inserted)
-
-        if self._op == "upsert":
-            payload_rows = self._payload if isinstance(self._payload, list) else [self._payload]
-            conflict_fields = [f.strip() for f in str(self._on_conflict or "id").split(",") if f.strip()]
-            if not conflict_fields:
-                conflict_fields = ["id"]
-
-            upserted = []
-            for raw in payload_rows:
-                incoming = copy.deepcopy(raw)
-                match_index = None
-                for idx, row in enumerate(rows):
-                    if all(row.get(field) == incoming.get(field) for field in conflict_fields):
-                        match_index = idx
-                        break
-                if match_index is None:
-                    rows.append(copy.deepcopy(incoming))
-                    upserted.append(copy.deepcopy(incoming))
-                else:
-                    rows[match_index].update(copy.deepcopy(incoming))
-                    upserted.append(copy.deepcopy(rows[match_index]))
-            return SimpleNamespace(data=upserted)
-
-        if self._op == "update":
-            updated = []
-            for row in rows:
-                if self._matches(row):
-                    row.update(copy.deepcopy(self._payload or {}))
-                    updated.append(copy.deepcopy(row))
-            return SimpleNamespace(data=updated)
-
-        if self._op == "delete":
-            keep = []
-            removed = []
-            for row in rows:
-                if self._matches(row):
-                    removed.append(copy.deepcopy(row))
-                else:
-                    keep.append(row)
-            self.supabase.tables[self.table_name] = keep
-            return SimpleNamespace(data=removed)
-
-        raise RuntimeError(f"Unsupported op: {self._op}")
-
-
-class FakeSupabase:
-    def __init__(self, tables):
-        self.tables = {name: [copy.deepcopy(r) for r in rows] for name, rows in tables.items()}
-
-    def table(self, name):
-        return FakeQuery(self, name)
+from app.catalog_revision import get_catalog_revision
+from benchmarks.stub_supabase import StubSupabase
 
 
 class TestMaterialRulesApi(unittest.TestCase):
@@ -171,7 +34,7 @@ class TestMaterialRulesApi(unittest.TestCase):
         return {str(err.get("code") or "") for err in errors if isinstance(err, dict)}
 
     def _build_fake_supabase(self):
-        return FakeSupabase(
+        return StubSupabase(
             {
                 "products": [
                     {"id": "SCR-SS", "category": "material", "cost_price": 1.0, "markup_percentage": 100.0},
@@ -486,6 +349,7 @@ class TestMaterialRulesApi(unittest.TestCase):
         self._set_role("admin", actor_user_id)
         supabase = self._build_fake_supabase()
 
+        revision_before = get_catalog_revision()
         with patch.object(backend_main, "get_supabase", return_value=supabase):
             repair_types_resp = self.client.put(
                 "/api/admin/material-rules/quick-quoter/repair-types",
@@ -503,6 +367,7 @@ class TestMaterialRulesApi(unittest.TestCase):
                 },
             )
             self.assertEqual(repair_types_resp.status_code, 200, repair_types_resp.text)
+            self.assertGreater(get_catalog_revision(), revision_before, "repair type save bumps catalog revision")
             repair_rows = (repair_types_resp.json() or {}).get("repair_types") or []
             self.assertEqual(len(repair_rows), 1)
             self.assertEqual(repair_rows[0].get("updated_by"), actor_user_id)
@@ -561,6 +426,11 @@ class TestMaterialRulesApi(unittest.TestCase):
             self.assertTrue(rules.get("updated_at"))
             self.assertEqual(rules.get("clip_selection_mode"), "force_saddle")
             self.assertEqual(rules.get("bracket_spacing_mm"), 450)
+            # Save swaps the in-process quote snapshot immediately.
+            snapshot = backend_main.get_measured_rules_snapshot()
+            self.assertEqual(snapshot.compiled.bracket_spacing_mm, 450)
+            self.assertEqual(snapshot.compiled.clip_selection_mode, "force_saddle")
+            self.assertEqual(snapshot.updated_at, rules.get("updated_at"))
 
         # Verify write persistence in fake DB rows as well.
         qq_rt_row = supabase.tables["quick_quoter_repair_types"][0]
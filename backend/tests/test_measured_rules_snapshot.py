@@ -0,0 +1,202 @@
+"""
+Tests for the in-process measured rules snapshot (app.material_rules).
+"""
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main as backend_main
+from app import material_rules
+from app.gutter_accessories import DEFAULT_GUTTER_ACCESSORY_RULES
+from app.quote_memo import clear_quote_memo
+from app.material_rules import (
+    build_measured_rules_snapshot,
+    ensure_measured_rules_snapshot,
+    ensure_measured_rules_snapshot_async,
+    get_measured_rules_snapshot,
+    get_measured_rules_snapshot_stats,
+    refresh_measured_rules_snapshot,
+)
+
+
+def _db_rules(**overrides):
+    rules = dict(DEFAULT_GUTTER_ACCESSORY_RULES)
+    rules.update(overrides)
+    rules["updated_at"] = overrides.get("updated_at", "2026-01-01T00:00:00+00:00")
+    return rules
+
+
+class TestMeasuredRulesSnapshot(unittest.TestCase):
+    def setUp(self):
+        clear_quote_memo()
+        patchers = [
+            patch.object(material_rules, "_measured_rules_snapshot", build_measured_rules_snapshot(None, version=0)),
+            patch.object(
+                material_rules,
+                "_measured_rules_snapshot_stats",
+                {"last_refresh_at": None, "last_refresh_error": None, "refresh_failures": 0},
+            ),
+            patch.object(material_rules, "_cold_load_retry_at", 0.0),
+            patch.object(material_rules, "_cold_load_task", None),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_refresh_publishes_new_version_only_on_change(self):
+        rows = [_db_rules(bracket_spacing_mm=600)]
+        with patch.object(material_rules, "get_measured_material_rules", side_effect=lambda _sb: rows[0]):
+            first = refresh_measured_rules_snapshot(object())
+            same = refresh_measured_rules_snapshot(object())
+            rows[0] = _db_rules(bracket_spacing_mm=500, updated_at="2026-02-01T00:00:00+00:00")
+            changed = refresh_measured_rules_snapshot(object())
+
+        self.assertEqual(first.version, 1)
+        self.assertEqual(first.source, "database")
+        self.assertEqual(first.compiled.bracket_spacing_mm, 600)
+        self.assertIs(same, first)
+        self.assertEqual(changed.version, 2)
+        self.assertEqual(get_measured_rules_snapshot().compiled.bracket_spacing_mm, 500)
+
+    def test_failed_refresh_keeps_previous_snapshot(self):
+        with patch.object(material_rules, "get_measured_material_rules", return_value=_db_rules(clip_spacing_mm=900)):
+            loaded = refresh_measured_rules_snapshot(object())
+        with patch.object(material_rules, "get_measured_material_rules", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                refresh_measured_rules_snapshot(object())
+
+        self.assertIs(get_measured_rules_snapshot(), loaded)
+        stats = get_measured_rules_snapshot_stats()
+        self.assertEqual(stats["refresh_failures"], 1)
+        self.assertEqual(stats["last_refresh_error"], "db down")
+        self.assertEqual(stats["version"], 1)
+
+    def test_no_saved_rules_publishes_defaults(self):
+        with patch.object(material_rules, "get_measured_material_rules", return_value=None):
+            snapshot = refresh_measured_rules_snapshot(object())
+
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.source, "default")
+        self.assertIsNone(snapshot.rules)
+
+    def test_cold_load_is_single_flight(self):
+        calls = []
+
+        def slow_rules(_sb):
+            calls.append(1)
+            time.sleep(0.05)
+            return _db_rules()
+
+        with patch.object(material_rules, "get_measured_material_rules", side_effect=slow_rules):
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(ensure_measured_rules_snapshot(object))) for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            ensure_measured_rules_snapshot(object)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({r.version for r in results}, {1})
+
+    def test_failed_cold_load_is_not_retried_per_request(self):
+        calls = []
+
+        def failing(_sb):
+            calls.append(1)
+            raise RuntimeError("db down")
+
+        with patch.object(material_rules, "get_measured_material_rules", side_effect=failing):
+            snapshots = [ensure_measured_rules_snapshot(object) for _ in range(5)]
+            self.assertEqual(len(calls), 1)
+            self.assertEqual({s.version for s in snapshots}, {0})
+            with patch.object(material_rules, "_cold_load_retry_at", 0.0):  # retry window over
+                ensure_measured_rules_snapshot(object)
+        self.assertEqual(len(calls), 2)
+
+    def test_async_cold_load_is_shared_by_concurrent_requests(self):
+        calls = []
+
+        async def _get_async_supabase():
+            return object()
+
+        async def slow_rules(_sb):
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return _db_rules()
+
+        async def run():
+            return await asyncio.gather(*(ensure_measured_rules_snapshot_async(_get_async_supabase) for _ in range(10)))
+
+        with patch.object(material_rules, "get_measured_material_rules_async", slow_rules):
+            snapshots = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({s.version for s in snapshots}, {1})
+
+    def test_calculate_quote_reads_snapshot_without_database(self):
+        with patch.object(material_rules, "get_measured_material_rules", return_value=_db_rules(screws_per_dropper=7)):
+            refresh_measured_rules_snapshot(object())
+        pricing = {
+            pid: {"id": pid, "name": pid, "cost_price": 1.0, "markup_percentage": 0.0, "unit": "each"}
+            for pid in ("DROPPER", "SCR-SS")
+        }
+        client = TestClient(backend_main.app)
+        with patch.object(backend_main, "get_product_pricing_async", return_value=pricing), patch.object(
+            material_rules, "get_measured_material_rules", side_effect=AssertionError("quote path hit the database")
+        ):
+            resp = client.post(
+                "/api/calculate-quote",
+                json={"elements": [{"assetId": "DROPPER", "quantity": 2}], "labour_elements": []},
+            )
+
+        self.assertEqual(resp.status_code, 200, resp.text)
+        payload = resp.json()
+        self.assertEqual(payload["rules_version"], 1)
+        qty_by_id = {line["id"]: line["qty"] for line in payload["quote"]["materials"]}
+        self.assertEqual(qty_by_id["SCR-SS"], 14)
+
+    def test_cold_snapshot_loads_rules_alongside_direct_pricing(self):
+        priced_calls = []
+
+        async def _pricing(ids):
+            priced_calls.append(set(ids))
+            return {
+                pid: {"id": pid, "name": pid, "cost_price": 1.0, "markup_percentage": 0.0, "unit": "each"}
+                for pid in ids
+            }
+
+        async def _get_async_supabase():
+            return object()
+
+        async def _rules(_supabase):
+            return _db_rules(screws_per_dropper=5)
+
+        client = TestClient(backend_main.app)
+        with patch.object(backend_main, "get_product_pricing_async", _pricing), patch.object(
+            backend_main, "get_async_supabase", _get_async_supabase
+        ), patch.object(material_rules, "get_measured_material_rules_async", _rules):
+            resp = client.post(
+                "/api/calculate-quote",
+                json={"elements": [{"assetId": "DROPPER", "quantity": 1}], "labour_elements": []},
+            )
+
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertEqual(resp.json()["rules_version"], 1)
+        # Named products priced concurrently with the rules load; inferred screws afterwards.
+        self.assertEqual(priced_calls, [{"DROPPER"}, {"SCR-SS"}])
+        qty_by_id = {line["id"]: line["qty"] for line in resp.json()["quote"]["materials"]}
+        self.assertEqual(qty_by_id["SCR-SS"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
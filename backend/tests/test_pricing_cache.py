@@ -0,0 +1,131 @@
+"""
+Tests for the in-process product pricing cache (app.pricing).
+"""
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import pricing
+from app.pricing import (
+    get_pricing_cache_stats,
+    get_pricing_cache_version,
+    get_product_pricing,
+    get_product_pricing_async,
+    invalidate_pricing_cache,
+)
+from benchmarks.stub_supabase import AsyncStubSupabase, StubSupabase
+
+
+def _record_ids(queries):
+    """on_execute hook collecting the sorted ids of each products read."""
+    def record(query):
+        queries.append(sorted(next(v for op, field, v in query.filters if op == "in" and field == "id")))
+
+    return record
+
+
+class TestPricingCache(unittest.TestCase):
+    def setUp(self):
+        invalidate_pricing_cache()
+        self.queries = []
+        self.supabase = StubSupabase({"products": [
+                {"id": "GUT-SC-MAR-3M", "name": "Gutter 3m", "cost_price": 10.0, "markup_percentage": 50.0, "unit": "each"},
+                {"id": "SCR-SS", "name": "Screw", "cost_price": 0.1, "markup_percentage": 100.0, "unit": None},
+                {"id": "BAD-NOPRICE", "name": "No price", "cost_price": None, "markup_percentage": None},
+        ]})
+        self.supabase.on_execute = _record_ids(self.queries)
+        patcher = patch.object(pricing, "get_supabase", return_value=self.supabase)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_second_lookup_is_served_from_memory(self):
+        first = get_product_pricing(["GUT-SC-MAR-3M", "SCR-SS"])
+        second = get_product_pricing(["SCR-SS", "GUT-SC-MAR-3M"])
+
+        self.assertEqual(first, second)
+        self.assertEqual(second["SCR-SS"]["unit"], "each")
+        self.assertEqual(len(self.queries), 1)
+
+    def test_only_unseen_ids_are_fetched(self):
+        get_product_pricing(["GUT-SC-MAR-3M"])
+        get_product_pricing(["GUT-SC-MAR-3M", "SCR-SS"])
+
+        self.assertEqual(self.queries, [["GUT-SC-MAR-3M"], ["SCR-SS"]])
+
+    def test_missing_and_unpriced_products_are_omitted_and_cached(self):
+        out = get_product_pricing(["NOPE", "BAD-NOPRICE"])
+        again = get_product_pricing(["NOPE", "BAD-NOPRICE"])
+
+        self.assertEqual(out, {})
+        self.assertEqual(again, {})
+        self.assertEqual(len(self.queries), 1)
+
+    def test_invalidate_forces_reload_and_bumps_version(self):
+        get_product_pricing(["GUT-SC-MAR-3M"])
+        version = get_pricing_cache_version()
+        self.supabase.tables["products"][0]["cost_price"] = 12.0
+
+        self.assertEqual(invalidate_pricing_cache(), version + 1)
+        out = get_product_pricing(["GUT-SC-MAR-3M"])
+
+        self.assertEqual(out["GUT-SC-MAR-3M"]["cost_price"], 12.0)
+        self.assertEqual(len(self.queries), 2)
+
+    def test_expired_entries_are_refetched(self):
+        with patch.dict(os.environ, {"PRICING_CACHE_TTL_SECONDS": "0"}):
+            get_product_pricing(["SCR-SS"])
+            get_product_pricing(["SCR-SS"])
+        self.assertEqual(len(self.queries), 2)
+
+    def test_invalidation_during_fetch_does_not_store_stale_rows(self):
+        record = self.supabase.on_execute
+
+        def record_and_invalidate(query):
+            record(query)
+            invalidate_pricing_cache()
+
+        self.supabase.on_execute = record_and_invalidate
+        get_product_pricing(["SCR-SS"])
+        self.supabase.on_execute = record
+        get_product_pricing(["SCR-SS"])
+
+        self.assertEqual(len(self.queries), 2)
+
+    def test_stats_count_hits_and_misses(self):
+        before = get_pricing_cache_stats()
+        get_product_pricing(["SCR-SS"])
+        get_product_pricing(["SCR-SS"])
+        get_product_pricing(["SCR-SS"])
+        after = get_pricing_cache_stats()
+
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 2)
+        self.assertEqual(after["entries"], 1)
+
+    def test_async_lookup_shares_the_cache(self):
+        async_queries = []
+        async_supabase = AsyncStubSupabase(self.supabase.tables)
+        async_supabase.on_execute = _record_ids(async_queries)
+
+        async def _get_async_supabase():
+            return async_supabase
+
+        with patch.object(pricing, "get_async_supabase", _get_async_supabase):
+            first = asyncio.run(get_product_pricing_async(["GUT-SC-MAR-3M", "NOPE"]))
+            again = asyncio.run(get_product_pricing_async(["GUT-SC-MAR-3M", "NOPE"]))
+        sync = get_product_pricing(["GUT-SC-MAR-3M"])
+
+        self.assertEqual(list(first), ["GUT-SC-MAR-3M"])
+        self.assertEqual(again, first)
+        self.assertEqual(sync, first)
+        self.assertEqual(async_queries, [["GUT-SC-MAR-3M", "NOPE"]])
+        self.assertEqual(self.queries, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests for the in-memory product catalog index behind /api/products (app.products)
+and the material cost map used by the job performance sync.
+"""
+import os
+import random
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import products
+from app.products import ProductCatalogIndex, _row_to_product, get_products, invalidate_product_catalog_index
+from benchmarks.stub_supabase import StubSupabase
+
+ROWS = [
+    {"id": "GUT-SC-MAR-3M", "name": "Storm Cloud Gutter 3m", "category": "channel", "profile": "storm_cloud", "thumbnail_url": "/a.svg", "diagram_url": "/a.svg"},
+    {"id": "GUT-CL-MAR-3M", "name": "Classic Gutter 3m", "category": "channel", "profile": "classic", "thumbnail_url": "", "diagram_url": ""},
+    {"id": "BRK-SC-MAR", "name": "Storm Cloud Bracket", "category": "bracket", "profile": "storm_cloud", "thumbnail_url": "", "diagram_url": ""},
+    {"id": "DP-65-3M", "name": "Downpipe 65mm 3m", "category": "pipe", "profile": None, "thumbnail_url": "", "diagram_url": ""},
+    {"id": "SCR-SS", "name": "Screw Stainless", "category": "fixing", "profile": "other", "thumbnail_url": "", "diagram_url": ""},
+]
+
+
+def linear_get_products(rows, search=None, category=None, profile=None):
+    """Reference: the original fetch-then-scan implementation of get_products."""
+    if profile and profile in ("storm_cloud", "classic", "other"):
+        rows = [r for r in rows if r.get("profile") == profile]
+    out = [_row_to_product(r) for r in rows]
+    if search:
+        q = search.lower()
+        out = [p for p in out if q in p["name"].lower() or q in p["id"].lower()]
+    if category:
+        out = [p for p in out if p["category"] == category]
+    return out
+
+
+class TestProductCatalogIndex(unittest.TestCase):
+    def setUp(self):
+        invalidate_product_catalog_index()
+        self.addCleanup(invalidate_product_catalog_index)
+        self.db = StubSupabase({"products": [dict(r) for r in ROWS]})
+        patcher = patch.object(products, "get_supabase", return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_queries_match_linear_scan(self):
+        index = ProductCatalogIndex(ROWS)
+        queries = ["", "g", "gu", "gut", "gutter", "storm cloud", "3m", "-sc-", "SCR", "xyz", "bracket", "m"]
+        for search in queries:
+            for category in (None, "channel", "bracket", "nope"):
+                for profile in (None, "storm_cloud", "classic", "other", "bogus"):
+                    with self.subTest(search=search, category=category, profile=profile):
+                        self.assertEqual(
+                            index.query(search=search, category=category, profile=profile),
+                            linear_get_products(ROWS, search=search, category=category, profile=profile),
+                        )
+
+    def test_random_substrings_match_linear_scan(self):
+        rng = random.Random(7)
+        texts = [r["name"] for r in ROWS] + [r["id"] for r in ROWS]
+        index = ProductCatalogIndex(ROWS)
+        for _ in range(300):
+            text = rng.choice(texts)
+            start = rng.randrange(len(text))
+            search = text[start:start + rng.randint(1, 8)]
+            self.assertEqual(index.query(search=search), linear_get_products(ROWS, search=search))
+
+    def test_repeated_calls_read_the_table_once(self):
+        get_products()
+        get_products(search="gutter")
+        get_products(category="pipe", profile="classic")
+
+        self.assertEqual(self.db.round_trips, 1)
+
+    def test_invalidation_rebuilds_from_database(self):
+        self.assertEqual(get_products(search="downpipe 80"), [])
+        self.db.tables["products"].append({"id": "DP-80-3M", "name": "Downpipe 80mm 3m", "category": "pipe", "profile": None})
+        invalidate_product_catalog_index()
+
+        self.assertEqual([p["id"] for p in get_products(search="downpipe 80")], ["DP-80-3M"])
+        self.assertEqual(self.db.round_trips, 2)
+
+    def test_database_error_returns_empty_and_retries(self):
+        def db_down(_query):
+            raise RuntimeError("db down")
+
+        self.db.on_execute = db_down
+        self.assertEqual(get_products(), [])
+        self.db.on_execute = None
+
+        self.assertEqual(len(get_products()), len(ROWS))
+        self.assertEqual(self.db.round_trips, 2)
+
+
+class TestMaterialCostMap(unittest.TestCase):
+    def setUp(self):
+        products.invalidate_material_cost_map()
+        self.addCleanup(products.invalidate_material_cost_map)
+        self.db = StubSupabase({"products": [
+            {"servicem8_material_uuid": "m-1", "cost_price": "4.5"},
+            {"servicem8_material_uuid": " m-2 ", "cost_price": 2},
+            {"servicem8_material_uuid": None, "cost_price": 9},
+            {"servicem8_material_uuid": "m-3", "cost_price": None},
+        ]})
+
+    def test_loads_costs_keyed_by_material_uuid(self):
+        self.assertEqual(products.get_material_cost_map(self.db), {"m-1": 4.5, "m-2": 2.0})
+        products.get_material_cost_map(self.db)
+        self.assertEqual(self.db.round_trips, 2)  # no process cache by default
+
+    def test_process_cache_until_catalog_changes(self):
+        with patch.dict(os.environ, {"MATERIAL_COST_CACHE_TTL_SECONDS": "300"}):
+            products.get_material_cost_map(self.db)
+            products.get_material_cost_map(self.db)
+            self.assertEqual(self.db.round_trips, 1)
+            self.db.tables["products"][0]["cost_price"] = 5
+            invalidate_product_catalog_index()
+            self.assertEqual(products.get_material_cost_map(self.db)["m-1"], 5.0)
+            self.assertEqual(self.db.round_trips, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,58 +4,16 @@ Unit tests for Quick Quoter resolver/catalog service.
 import unittest
 import sys
 from pathlib import Path
-from types import SimpleNamespace
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from app.quick_quoter import get_quick_quoter_catalog, resolve_quick_quoter_selection
-
-
-class FakeQuery:
-    def __init__(self, rows):
-        self._rows = rows
-        self._eq_filters = []
-        self._in_filters = []
-        self._order_fields = []
-
-    def select(self, _fields):
-        return self
-
-    def eq(self, field, value):
-        self._eq_filters.append((field, value))
-        return self
-
-    def in_(self, field, values):
-        self._in_filters.append((field, set(values or [])))
-        return self
-
-    def order(self, field, desc=False):
-        self._order_fields.append((field, bool(desc)))
-        return self
-
-    def execute(self):
-        rows = [dict(r) for r in self._rows]
-        for field, value in self._eq_filters:
-            rows = [r for r in rows if r.get(field) == value]
-        for field, values in self._in_filters:
-            rows = [r for r in rows if r.get(field) in values]
-        # Apply stable sort from last order key to first.
-        for field, desc in reversed(self._order_fields):
-            rows.sort(key=lambda r: r.get(field), reverse=desc)
-        return SimpleNamespace(data=rows)
-
-
-class FakeSupabase:
-    def __init__(self, tables):
-        self._tables = tables
-
-    def table(self, name):
-        return FakeQuery(self._tables.get(name, []))
+from benchmarks.stub_supabase import StubSupabase
 
 
 class TestQuickQuoterCatalog(unittest.TestCase):
     def test_catalog_returns_active_sorted(self):
-        supabase = FakeSupabase(
+        supabase = StubSupabase(
             {
                 "quick_quoter_repair_types": [
                     {"id": "b", "label": "B", "active": True, "sort_order": 20, "requires_profile": False, "requires_size_mm": False},
@@ -72,7 +30,7 @@ class TestQuickQuoterCatalog(unittest.TestCase):
 
 class TestQuickQuoterResolve(unittest.TestCase):
     def test_rejects_unknown_or_inactive_repair_types(self):
-        supabase = FakeSupabase(
+        supabase = StubSupabase(
             {
                 "quick_quoter_repair_types": [
                     {"id": "known_active", "active": True, "requires_profile": False, "requires_size_mm": False},
@@ -97,7 +55,7 @@ class TestQuickQuoterResolve(unittest.TestCase):
         self.assertEqual(payload["missing_measurements"], [])
 
     def test_requires_profile_and_size_from_catalog_flags(self):
-        supabase = FakeSupabase(
+        supabase = StubSupabase(
             {
                 "quick_quoter_repair_types": [
                     {"id": "profile_req", "active": True, "requires_profile": True, "requires_size_mm": False},
@@ -120,7 +78,7 @@ class TestQuickQuoterResolve(unittest.TestCase):
         self.assertIn("size_mm_required", codes)
 
     def test_maps_profile_and_filters_template_profile_conditions(self):
-        supabase = FakeSupabase(
+        supabase = StubSupabase(
             {
                 "quick_quoter_repair_types": [
                     {"id": "joiner", "active": True, "requires_profile": True, "requires_size_mm": False},
@@ -145,7 +103,7 @@ class TestQuickQuoterResolve(unittest.TestCase):
         self.assertNotIn("J-CL-MAR", by_asset)
 
     def test_filters_template_size_conditions(self):
-        supabase = FakeSupabase(
+        supabase = StubSupabase(
             {
                 "quick_quoter_repair_types": [
                     {"id": "clip", "active": True, "requires_profile": False, "requires_size_mm": True},
@@ -166,7 +124,7 @@ class TestQuickQuoterResolve(unittest.TestCase):
         self.assertEqual(payload["elements"], [{"assetId": "ACL-80", "quantity": 6.0}])
 
     def test_routes_length_modes_and_aggregates_duplicates(self):
-        supabase = FakeSupabase(
+        supabase = StubSupabase(
             {
                 "quick_quoter_repair_types": [
                     {"id": "mixed", "active": True, "requires_profile": False, "requires_size_mm": False},
@@ -201,7 +159,7 @@ class TestQuickQuoterResolve(unittest.TestCase):
         self.assertEqual(missing[0]["quantity"], 6.0)
 
     def test_resolve_returns_suggested_labour_minutes_from_default_time(self):
-        supabase = FakeSupabase(
+        supabase = StubSupabase(
             {
                 "quick_quoter_repair_types": [
                     {"id": "rt_a", "active": True, "requires_profile": False, "requires_size_mm": False, "default_time_minutes": 30},
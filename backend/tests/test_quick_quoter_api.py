@@ -11,6 +11,7 @@ from fastapi.testclient import TestClient
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import main as backend_main
+from app.catalog_revision import bump_catalog_revision
 
 
 class TestQuickQuoterApi(unittest.TestCase):
@@ -18,6 +19,9 @@ class TestQuickQuoterApi(unittest.TestCase):
     def setUpClass(cls):
         cls.client = TestClient(backend_main.app)
 
+    def setUp(self):
+        bump_catalog_revision()
+
     def test_catalog_endpoint_success(self):
         payload = {
             "repair_types": [
@@ -0,0 +1,144 @@
+"""
+Parity tests: column-wise app.quote_engine.build_quote vs the original per-line scalar pricing
+(as it lived in api_calculate_quote). Results must match exactly, including 2-dp rounding.
+"""
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.quote_engine import QuotePricingError, build_quote
+
+
+def scalar_build_quote(elements_for_quote, labour_elements, pricing):
+    """Reference: the per-line loop from api_calculate_quote before column-wise pricing."""
+    materials = []
+    materials_subtotal = 0.0
+    for e in elements_for_quote:
+        pid = e["assetId"]
+        if pid not in pricing:
+            raise QuotePricingError(pid, f"Product {pid} not found or missing pricing")
+        p = pricing[pid]
+        cost_price = p["cost_price"]
+        markup_pct = p["markup_percentage"]
+        sell_price = round(cost_price * (1 + markup_pct / 100), 2)
+        qty = e["quantity"]
+        line_total = round(sell_price * qty, 2)
+        materials.append({
+            "id": pid,
+            "name": p["name"],
+            "qty": qty,
+            "cost_price": cost_price,
+            "markup_percentage": markup_pct,
+            "sell_price": sell_price,
+            "line_total": line_total,
+        })
+        materials_subtotal += line_total
+    materials_subtotal = round(materials_subtotal, 2)
+
+    labour_hours = 0.0
+    labour_subtotal = 0.0
+    labour_rate = 0.0
+    for e in labour_elements:
+        pid = e["assetId"]
+        if pid not in pricing:
+            raise QuotePricingError(pid, f"Labour product {pid} not found or missing pricing")
+        p = pricing[pid]
+        sell_price = round(p["cost_price"] * (1 + p["markup_percentage"] / 100), 2)
+        hours = e["quantity"]
+        line_total = round(sell_price * hours, 2)
+        labour_hours += hours
+        labour_subtotal += line_total
+        if labour_rate == 0:
+            labour_rate = sell_price
+    labour_subtotal = round(labour_subtotal, 2)
+
+    total = round(materials_subtotal + labour_subtotal, 2)
+    return {
+        "materials": materials,
+        "materials_subtotal": materials_subtotal,
+        "labour_hours": labour_hours,
+        "labour_rate": labour_rate,
+        "labour_subtotal": labour_subtotal,
+        "total": total,
+    }
+
+
+def _random_case(rng, n_products, n_lines, n_labour):
+    pricing = {}
+    for i in range(n_products):
+        pid = f"P-{i}"
+        pricing[pid] = {
+            "id": pid,
+            "name": f"Product {i}",
+            # Mix of cent values, sub-cent values (screws), and half-cent edge cases.
+            "cost_price": rng.choice([
+                round(rng.uniform(0, 200), 2),
+                round(rng.uniform(0, 1), 4),
+                rng.randint(0, 400) / 100 + 0.005,
+            ]),
+            "markup_percentage": rng.choice([0.0, 15.0, 33.3, 50.0, 100.0, round(rng.uniform(0, 300), 3)]),
+            "unit": "each",
+        }
+    pricing["REP-LAB"] = {"id": "REP-LAB", "name": "Labour", "cost_price": 0.0, "markup_percentage": 0.0, "unit": "hour"}
+    pricing["REP-LAB-2"] = {"id": "REP-LAB-2", "name": "Labour 2", "cost_price": 65.0, "markup_percentage": 35.0, "unit": "hour"}
+    ids = list(pricing)
+    elements = [
+        {"assetId": rng.choice(ids), "quantity": rng.choice([rng.randint(0, 40), rng.randint(1, 400) / 4, rng.uniform(0, 50)])}
+        for _ in range(n_lines)
+    ]
+    labour = [
+        {"assetId": rng.choice(["REP-LAB", "REP-LAB-2"]), "quantity": rng.choice([0.5, 1.0, 1.25, rng.uniform(0, 12)])}
+        for _ in range(n_labour)
+    ]
+    return elements, labour, pricing
+
+
+class TestQuoteEngineParity(unittest.TestCase):
+    def test_randomised_quotes_match_scalar_path_exactly(self):
+        rng = random.Random(20260217)
+        for case in range(300):
+            n_lines = rng.choice([0, 1, 5, 40, 400, 3000])
+            elements, labour, pricing = _random_case(rng, rng.randint(1, 60), n_lines, rng.randint(0, 4))
+            with self.subTest(case=case, lines=n_lines):
+                self.assertEqual(build_quote(elements, labour, pricing), scalar_build_quote(elements, labour, pricing))
+
+    def test_half_cent_rounding_matches(self):
+        pricing = {
+            "A": {"id": "A", "name": "A", "cost_price": 1.005, "markup_percentage": 0.0, "unit": "each"},
+            "B": {"id": "B", "name": "B", "cost_price": 2.675, "markup_percentage": 0.0, "unit": "each"},
+            "C": {"id": "C", "name": "C", "cost_price": 0.125, "markup_percentage": 100.0, "unit": "each"},
+        }
+        elements = [{"assetId": "A", "quantity": 3}, {"assetId": "B", "quantity": 0.5}, {"assetId": "C", "quantity": 7}]
+        self.assertEqual(build_quote(elements, [], pricing), scalar_build_quote(elements, [], pricing))
+
+    def test_labour_rate_is_first_non_zero_rate(self):
+        pricing = {
+            "FREE": {"id": "FREE", "name": "Free", "cost_price": 0.0, "markup_percentage": 0.0, "unit": "hour"},
+            "REP-LAB": {"id": "REP-LAB", "name": "Labour", "cost_price": 80.0, "markup_percentage": 25.0, "unit": "hour"},
+        }
+        labour = [{"assetId": "FREE", "quantity": 1}, {"assetId": "REP-LAB", "quantity": 2}]
+        out = build_quote([], labour, pricing)
+        self.assertEqual(out, scalar_build_quote([], labour, pricing))
+        self.assertEqual(out["labour_rate"], 100.0)
+        self.assertEqual(out["labour_hours"], 3.0)
+
+    def test_missing_products_raise_same_error_as_scalar(self):
+        pricing = {"A": {"id": "A", "name": "A", "cost_price": 1.0, "markup_percentage": 0.0, "unit": "each"}}
+        cases = [
+            ([{"assetId": "A", "quantity": 1}, {"assetId": "X", "quantity": 1}], [{"assetId": "Y", "quantity": 1}]),
+            ([{"assetId": "A", "quantity": 1}], [{"assetId": "Y", "quantity": 1}]),
+        ]
+        for elements, labour in cases:
+            with self.assertRaises(QuotePricingError) as expected:
+                scalar_build_quote(elements, labour, pricing)
+            with self.assertRaises(QuotePricingError) as actual:
+                build_quote(elements, labour, pricing)
+            self.assertEqual(str(actual.exception), str(expected.exception))
+            self.assertEqual(actual.exception.product_id, expected.exception.product_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for memoised /api/calculate-quote results (app.quote_memo) and ETag / If-None-Match handling (app.http_cache).
+"""
+import os
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main as backend_main
+from app.material_rules import build_measured_rules_snapshot
+from app.http_cache import etag_matches
+from app.quote_memo import clear_quote_memo, quote_request_key
+
+BODY = {
+    "elements": [
+        {"assetId": "GUT-SC-MAR-3M", "quantity": 1, "length_mm": 3000},
+        {"assetId": "DROPPER", "quantity": 2},
+    ],
+    "labour_elements": [{"assetId": "REP-LAB", "quantity": 1.5}],
+}
+PRICED = ("GUT-SC-MAR-3M", "BRK-SC-MAR", "SCR-SS", "DROPPER", "REP-LAB")
+
+
+class TestQuoteMemo(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(backend_main.app)
+
+    def setUp(self):
+        clear_quote_memo()
+        self.pricing = {
+            pid: {"id": pid, "name": pid, "cost_price": 10.0, "markup_percentage": 50.0, "unit": "each"}
+            for pid in PRICED
+        }
+        self.pricing_mock = patch.object(backend_main, "get_product_pricing_async", side_effect=lambda ids: self.pricing).start()
+        self.version = patch.object(backend_main, "get_pricing_cache_version", return_value=1).start()
+        self.rules = patch.object(
+            backend_main, "get_measured_rules_snapshot", return_value=build_measured_rules_snapshot(None, version=1)
+        ).start()
+        self.addCleanup(patch.stopall)
+
+    def test_repeated_request_is_served_from_memo_with_same_etag(self):
+        first = self.client.post("/api/calculate-quote", json=BODY)
+        second = self.client.post("/api/calculate-quote", json=BODY)
+
+        self.assertEqual(first.status_code, 200, first.text)
+        self.assertEqual(second.json(), first.json())
+        self.assertTrue(first.headers["etag"])
+        self.assertEqual(second.headers["etag"], first.headers["etag"])
+        self.assertEqual(self.pricing_mock.call_count, 1)
+        self.assertEqual(first.json()["pricing_version"], 1)
+
+    def test_if_none_match_returns_304(self):
+        first = self.client.post("/api/calculate-quote", json=BODY)
+        etag = first.headers["etag"]
+
+        resp = self.client.post("/api/calculate-quote", json=BODY, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.headers["etag"], etag)
+        self.assertEqual(resp.content, b"")
+
+        stale = self.client.post("/api/calculate-quote", json=BODY, headers={"If-None-Match": '"not-it"'})
+        self.assertEqual(stale.status_code, 200)
+
+    def test_pricing_or_rules_version_change_recomputes(self):
+        first = self.client.post("/api/calculate-quote", json=BODY)
+        self.pricing["REP-LAB"] = dict(self.pricing["REP-LAB"], cost_price=20.0)
+        self.version.return_value = 2
+        repriced = self.client.post("/api/calculate-quote", json=BODY, headers={"If-None-Match": first.headers["etag"]})
+
+        self.assertEqual(repriced.status_code, 200)
+        self.assertNotEqual(repriced.headers["etag"], first.headers["etag"])
+        self.assertEqual(self.pricing_mock.call_count, 2)
+
+        self.rules.return_value = build_measured_rules_snapshot({"screws_per_dropper": 6}, version=5)
+        rerules = self.client.post("/api/calculate-quote", json=BODY)
+        self.assertEqual(rerules.json()["rules_version"], 5)
+        self.assertEqual(self.pricing_mock.call_count, 3)
+
+    def test_memo_disabled_when_pricing_cache_ttl_is_zero(self):
+        with patch.dict(os.environ, {"PRICING_CACHE_TTL_SECONDS": "0"}):
+            self.client.post("/api/calculate-quote", json=BODY)
+            again = self.client.post("/api/calculate-quote", json=BODY)
+        self.assertEqual(self.pricing_mock.call_count, 2)
+        self.assertTrue(again.headers["etag"])
+
+    def test_errors_are_not_memoised(self):
+        del self.pricing["REP-LAB"]
+        self.assertEqual(self.client.post("/api/calculate-quote", json=BODY).status_code, 400)
+        self.assertEqual(self.client.post("/api/calculate-quote", json=BODY).status_code, 400)
+        self.assertEqual(self.pricing_mock.call_count, 2)
+
+    def test_large_quotes_are_built_off_the_event_loop(self):
+        threads = {}
+        build_quote = backend_main.build_quote
+
+        async def pricing(ids):
+            threads["loop"] = threading.get_ident()
+            return self.pricing
+
+        def recording_build_quote(*args):
+            threads["build"] = threading.get_ident()
+            return build_quote(*args)
+
+        small = {"elements": [{"assetId": "DROPPER", "quantity": 1}], "labour_elements": []}
+        large = {
+            "elements": [{"assetId": "DROPPER", "quantity": 1}] * backend_main.QUOTE_THREADPOOL_MIN_LINES,
+            "labour_elements": [],
+        }
+        with patch.object(backend_main, "get_product_pricing_async", pricing), patch.object(
+            backend_main, "build_quote", recording_build_quote
+        ):
+            self.assertEqual(self.client.post("/api/calculate-quote", json=small).status_code, 200)
+            self.assertEqual(threads["build"], threads["loop"])
+            resp = self.client.post("/api/calculate-quote", json=large)
+        self.assertEqual(resp.status_code, 200, resp.text)
+        self.assertNotEqual(threads["build"], threads["loop"])
+
+    def test_request_key_is_canonical(self):
+        a = quote_request_key(
+            [{"assetId": "X", "quantity": 2, "length_mm": None}], [], pricing_version=1, rules_version=0
+        )
+        b = quote_request_key(
+            [{"length_mm": None, "quantity": 2.0, "assetId": "X"}], [], pricing_version=1, rules_version=0
+        )
+        c = quote_request_key(
+            [{"assetId": "X", "quantity": 2, "length_mm": None}], [], pricing_version=2, rules_version=0
+        )
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_etag_matching(self):
+        self.assertTrue(etag_matches('"abc"', '"abc"'))
+        self.assertTrue(etag_matches('W/"abc", "def"', '"abc"'))
+        self.assertTrue(etag_matches("*", '"abc"'))
+        self.assertFalse(etag_matches(None, '"abc"'))
+        self.assertFalse(etag_matches('"abcd"', '"abc"'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+"""
+Tests for the pooled ServiceM8 HTTP client (app.servicem8.get_http_client / make_api_request)
+and its rate limiting / retry behaviour (app.servicem8._send_api).
+"""
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import servicem8 as sm8
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def _reply(self):
+        self.server.client_ports.add(self.client_address[1])
+        self.server.paths.append(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.server.bodies.append(json.loads(self.rfile.read(length)))
+        status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+        body = json.dumps([{"uuid": "job-1", "path": self.path}] if status == 200 else {"error": status}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *_args):
+        pass
+
+
+class _ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        sm8.close_http_client()
+        self.addCleanup(sm8.close_http_client)
+        env = patch.dict(os.environ, {"SERVICEM8_RATE_PER_SECOND": "0"})
+        env.start()
+        self.addCleanup(env.stop)
+        sm8.reset_rate_limiter()
+        self.addCleanup(sm8.reset_rate_limiter)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.client_ports = set()
+        self.server.paths = []
+        self.server.bodies = []
+        self.server.script = []  # (status, headers) per request; 200 once exhausted
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        p = patch.object(sm8, "API_BASE_URL", f"http://127.0.0.1:{self.server.server_port}")
+        p.start()
+        self.addCleanup(p.stop)
+
+
+class TestPooledServiceM8Client(_ServerTestCase):
+    def test_sequential_requests_reuse_one_connection(self):
+        before = sm8.get_http_client_stats()
+        for _ in range(5):
+            resp = sm8.make_api_request("GET", "/api_1.0/job.json", "tok", params={"$filter": "status eq 'Completed'"})
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(self.server.client_ports), 1)
+        stats = sm8.get_http_client_stats()
+        self.assertEqual(stats["requests"] - before["requests"], 5)
+        self.assertEqual(stats["clients_created"] - before["clients_created"], 1)
+        self.assertEqual(stats["connections"]["open"], 1)
+        self.assertGreaterEqual(stats["http_versions"].get("HTTP/1.1", 0), 5)
+
+    def test_helpers_share_the_pool(self):
+        sm8.list_staff("tok")
+        sm8.list_job_materials("tok", "6129948b-4f79-4fc1-b611-23bbc4f9726b")
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_iter_helpers_stream_records(self):
+        self.assertEqual([s["uuid"] for s in sm8.iter_staff("tok")], ["job-1"])
+        self.assertEqual(len(list(sm8.iter_job_activities("tok", "6129948b-4f79-4fc1-b611-23bbc4f9726b"))), 1)
+        self.assertEqual(list(sm8.iter_job_materials("tok", "not-a-uuid")), [])
+        self.assertEqual(len(self.server.paths), 2)
+        self.assertIn("cursor=-1", self.server.paths[0])
+
+    def test_client_is_recreated_after_close(self):
+        first = sm8.get_http_client()
+        self.assertIs(sm8.get_http_client(), first)
+        sm8.close_http_client()
+        self.assertIsNot(sm8.get_http_client(), first)
+
+    def test_transport_errors_are_counted(self):
+        before = sm8.get_http_client_stats()["errors"]
+        with patch.object(sm8, "API_BASE_URL", "http://127.0.0.1:1"), patch.dict(os.environ, {"SERVICEM8_MAX_RETRIES": "0"}):
+            with self.assertRaises(httpx.TransportError):
+                sm8.make_api_request("GET", "/api_1.0/job.json", "tok")
+        self.assertEqual(sm8.get_http_client_stats()["errors"], before + 1)
+
+
+class TestServiceM8Retries(_ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        p = patch.object(sm8, "_RETRY_BASE_SECONDS", 0.001)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_429_honours_retry_after_and_is_recorded(self):
+        self.server.script = [(429, {"Retry-After": "0.2"}), (503, {}), (200, {})]
+        before = sm8.get_http_client_stats()
+        t0 = time.monotonic()
+        resp = sm8.make_api_request("GET", "/api_1.0/jobmaterial.json", "tok")
+        self.assertEqual(resp.status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - t0, 0.2)
+        stats = sm8.get_http_client_stats()
+        self.assertEqual(stats["retries"] - before["retries"], 2)
+        self.assertEqual(stats["rate_limited"] - before["rate_limited"], 1)
+        self.assertGreaterEqual(stats["throttle_wait_seconds"], 0.15)
+        self.assertEqual(len(self.server.paths), 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.server.script = [(503, {})] * 5
+        with patch.dict(os.environ, {"SERVICEM8_MAX_RETRIES": "2"}):
+            before = sm8.get_http_client_stats()["gave_up"]
+            resp = sm8.make_api_request("GET", "/api_1.0/job.json", "tok")
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(len(self.server.paths), 3)
+        self.assertEqual(sm8.get_http_client_stats()["gave_up"], before + 1)
+
+    def test_post_without_uuid_is_not_retried_on_5xx(self):
+        self.server.script = [(500, {})]
+        resp = sm8.make_api_request("POST", "/api_1.0/jobcontact.json", "tok", json_data={"job_uuid": "x"})
+        self.assertEqual(resp.status_code, 500)
+        self.assertEqual(len(self.server.paths), 1)
+
+    def test_add_job_note_retries_with_the_same_uuid(self):
+        self.server.script = [(502, {}), (200, {})]
+        ok, err = sm8.add_job_note("tok", "6129948b-4f79-4fc1-b611-23bbc4f9726b", "hello")
+        self.assertTrue(ok, err)
+        self.assertEqual(len(self.server.bodies), 2)
+        self.assertEqual(self.server.bodies[0]["uuid"], self.server.bodies[1]["uuid"])
+
+    def test_list_jobs_raises_instead_of_returning_partial_pages(self):
+        self.server.script = [(200, {"x-next-cursor": "page-2"})] + [(503, {})] * 3
+        with patch.dict(os.environ, {"SERVICEM8_MAX_RETRIES": "2"}):
+            with self.assertRaises(httpx.HTTPStatusError):
+                sm8.list_jobs("tok", "Completed")
+
+    def test_list_jobs_recovers_a_throttled_page(self):
+        self.server.script = [(200, {"x-next-cursor": "page-2"}), (429, {"Retry-After": "0"}), (200, {})]
+        jobs = sm8.list_jobs("tok", "Completed")
+        self.assertEqual(len(jobs), 2)
+        self.assertIn("cursor=page-2", self.server.paths[-1])
+
+    def test_bulk_materials_are_paged_and_grouped_by_job(self):
+        pages = {
+            "-1": ([{"uuid": "m1", "job_uuid": "job-a"}, {"uuid": "m2", "job_uuid": "job-b"}], "c2"),
+            "c2": ([{"uuid": "m3", "job_uuid": "job-a"}, {"uuid": "m4", "job_uuid": "job-z"}], None),
+        }
+        calls = []
+
+        def fake_request(method, endpoint, token, params=None, **_kw):
+            calls.append((endpoint, dict(params)))
+            records, next_cursor = pages[params["cursor"]]
+            return httpx.Response(
+                200,
+                json=records,
+                headers={"x-next-cursor": next_cursor} if next_cursor else {},
+                request=httpx.Request(method, "http://sm8" + endpoint),
+            )
+
+        with patch.object(sm8, "make_api_request", side_effect=fake_request):
+            grouped = sm8.list_job_materials_bulk("tok", ["job-a", "job-b", "job-c"])
+            windowed = sm8.list_job_activities_bulk("tok", edited_since="2026-03-01 00:00:00")
+        self.assertEqual([m["uuid"] for m in grouped["job-a"]], ["m1", "m3"])
+        self.assertEqual(len(grouped["job-b"]), 1)
+        self.assertEqual(grouped["job-c"], [])
+        self.assertNotIn("job-z", grouped)
+        self.assertEqual(sorted(windowed), ["job-a", "job-b", "job-z"])
+        self.assertEqual(calls[0], ("/api_1.0/jobmaterial.json", {"cursor": "-1"}))
+        self.assertEqual(calls[-1][1]["$filter"], "edit_date gt '2026-03-01 00:00:00'")
+        self.assertEqual(len(calls), 4)
+
+    def test_retry_after_http_date(self):
+        resp = httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        self.assertEqual(sm8._retry_after_seconds(resp), 0.0)
+        self.assertEqual(sm8._retry_after_seconds(httpx.Response(429, headers={"Retry-After": "3"})), 3.0)
+        self.assertIsNone(sm8._retry_after_seconds(httpx.Response(429)))
+
+
+class TestPagedListings(unittest.TestCase):
+    """iter_pages / iter_job_pages over a fake make_api_request with per-page latency."""
+
+    PAGE_SECONDS = 0.05
+
+    def setUp(self):
+        self.requests = []
+        self.lock = threading.Lock()
+        p = patch.object(sm8, "make_api_request", side_effect=self._fake_request)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def _fake_request(self, method, endpoint, token, params=None, **_kw):
+        time.sleep(self.PAGE_SECONDS)
+        status = params["$filter"].split("'")[1]
+        page = 0 if params["cursor"] == "-1" else int(params["cursor"].split("-")[1])
+        with self.lock:
+            self.requests.append((status, page))
+        if status == "Broken" and page == 1:
+            return httpx.Response(500, request=httpx.Request(method, "http://sm8" + endpoint))
+        headers = {"x-next-cursor": f"{status}-{page + 1}"} if page < 3 else {}
+        records = [{"uuid": f"{status}-{page}-{i}", "status": status} for i in range(2)]
+        return httpx.Response(200, json=records, headers=headers, request=httpx.Request(method, "http://sm8" + endpoint))
+
+    def test_prefetch_overlaps_download_with_consumer(self):
+        t0 = time.monotonic()
+        pages = []
+        for page in sm8.iter_pages("tok", "/api_1.0/job.json", "status eq 'Completed'"):
+            time.sleep(self.PAGE_SECONDS)  # consumer work per page
+            pages.append(page)
+        elapsed = time.monotonic() - t0
+        self.assertEqual(len(pages), 4)
+        # sequential would be 8 x 0.05 s; overlapped is about 5 x 0.05 s
+        self.assertLess(elapsed, 7 * self.PAGE_SECONDS)
+
+    def test_statuses_are_listed_concurrently(self):
+        t0 = time.monotonic()
+        got = list(sm8.iter_job_pages("tok", ["Completed", "Invoiced"]))
+        elapsed = time.monotonic() - t0
+        self.assertEqual(sorted(status for status, _ in got), ["Completed"] * 4 + ["Invoiced"] * 4)
+        self.assertEqual(sum(len(page) for _, page in got), 16)
+        self.assertLess(elapsed, 7 * self.PAGE_SECONDS)  # sequential would be 8 pages
+
+    def test_listing_error_is_raised(self):
+        with self.assertRaises(httpx.HTTPStatusError):
+            list(sm8.iter_job_pages("tok", ["Completed", "Broken"]))
+
+    def test_list_jobs_and_iter_jobs_agree(self):
+        self.assertEqual(list(sm8.iter_jobs("tok", "Completed")), sm8.list_jobs("tok", "Completed"))
+        self.assertEqual(sm8.list_jobs("tok", " "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests for the local ServiceM8 simulator (benchmarks.servicem8_simulator) driven through the real
+app.servicem8 helpers via SERVICEM8_API_BASE_URL.
+"""
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import servicem8 as sm8
+from benchmarks.servicem8_simulator import ServiceM8Simulator, SimulatorConfig, parse_filter
+
+
+class TestServiceM8Simulator(unittest.TestCase):
+    def start(self, **config):
+        sim = ServiceM8Simulator(SimulatorConfig(**config)).start()
+        self.addCleanup(sim.stop)
+        env = patch.dict(
+            os.environ,
+            {"SERVICEM8_API_BASE_URL": sim.url, "SERVICEM8_RATE_PER_SECOND": "0", "SERVICEM8_MAX_RETRIES": "4"},
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        sm8.reset_rate_limiter()
+        self.addCleanup(sm8.reset_rate_limiter)
+        sm8.close_http_client()
+        self.addCleanup(sm8.close_http_client)
+        return sim
+
+    def test_job_listing_is_paginated_and_filtered(self):
+        sim = self.start(jobs=30, page_size=7)
+        completed = sm8.list_jobs("tok", "Completed")
+        self.assertEqual(len(completed), 15)
+        self.assertTrue(all(j["status"] == "Completed" for j in completed))
+        self.assertEqual(sim.stats()["by_endpoint"]["GET /api_1.0/job.json"], 3)
+        recent = sm8.list_jobs("tok", "Invoiced", edited_since="2026-01-01 08:20:00")
+        self.assertEqual([j["generated_job_id"] for j in recent], ["10021", "10023", "10025", "10027", "10029"])
+
+    def test_injected_429s_are_retried_without_losing_pages(self):
+        sim = self.start(jobs=40, page_size=5, rate_limit_every=3, retry_after_seconds=0)
+        pages = list(sm8.iter_job_pages("tok", ["Completed", "Invoiced"]))
+        self.assertEqual(sum(len(page) for _, page in pages), 40)
+        self.assertGreater(sim.stats()["rate_limited"], 0)
+
+    def test_bulk_materials_match_per_job_listing(self):
+        self.start(jobs=6, materials_per_job=3, page_size=4)
+        jobs = sm8.list_jobs("tok", "Completed")
+        bulk = sm8.list_job_materials_bulk("tok", [j["uuid"] for j in jobs])
+        for job in jobs:
+            self.assertEqual(bulk[job["uuid"]], sm8.list_job_materials("tok", job["uuid"]))
+            self.assertEqual(len(bulk[job["uuid"]]), 3)
+
+    def test_add_to_job_writes(self):
+        sim = self.start(jobs=2)
+        job_uuid = sim.data["jobs"][0]["uuid"]
+        self.assertEqual(sm8.add_job_note("tok", job_uuid, "hello"), (True, None))
+        self.assertEqual(sm8.add_job_material("tok", job_uuid, "Gutter", "1", "10.00"), (True, None))
+        ok, err, body = sm8.upload_job_attachment("tok", job_uuid, b"\x89PNG....")
+        self.assertTrue(ok, err)
+        self.assertEqual(sim.data["notes"][0]["note"], "hello")
+        self.assertEqual(len(sim.data["jobmaterials"]), 2 * 4 + 1)
+        self.assertGreater(sim.data["attachments"][0]["file_size"], 8)  # multipart body
+        self.assertEqual(body["uuid"], sim.data["attachments"][0]["uuid"])
+
+    def test_missing_token_is_401(self):
+        sim = self.start(jobs=1)
+        resp = httpx.get(f"{sim.url}/api_1.0/staff.json")
+        self.assertEqual(resp.status_code, 401)
+
+    def test_filter_parser_rejects_or(self):
+        self.assertEqual(parse_filter("status eq 'Completed' and edit_date gt '2026-01-01 00:00:00'"),
+                         [("status", "eq", "Completed"), ("edit_date", "gt", "2026-01-01 00:00:00")])
+        with self.assertRaises(ValueError):
+            parse_filter("job_uuid eq 'a' or job_uuid eq 'b'")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""
+Tests for the in-memory Supabase stand-in (benchmarks.stub_supabase) the benchmarks run against:
+PostgREST-like filtering, ordering and writes, storage, auth listing and round-trip accounting.
+"""
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_supabase import AsyncStubSupabase, StubRpcError, StubStorageError, StubSupabase
+
+
+def _jobs():
+    return [
+        {"id": "1", "period": "p1", "created_at": "2026-01-02T09:00:00+00:00", "revenue": 100, "upsell": True},
+        {"id": "2", "period": None, "created_at": "2026-01-05T09:00:00+00:00", "revenue": 300, "upsell": False},
+        {"id": "3", "period": None, "created_at": "2026-02-01T09:00:00+00:00", "revenue": None, "upsell": True},
+    ]
+
+
+class TestStubQueries(unittest.TestCase):
+    def test_filters_match_postgrest_semantics(self):
+        db = StubSupabase({"jobs": _jobs()})
+        ids = lambda resp: [r["id"] for r in resp.data]  # noqa: E731
+
+        self.assertEqual(ids(db.table("jobs").select("id").eq("id", 1).execute()), ["1"])
+        self.assertEqual(ids(db.table("jobs").select("id").eq("upsell", "true").execute()), ["1", "3"])
+        self.assertEqual(ids(db.table("jobs").select("id").in_("id", ["2", "3", "9"]).execute()), ["2", "3"])
+        self.assertEqual(ids(db.table("jobs").select("id").is_("period", "null").execute()), ["2", "3"])
+        window = (
+            db.table("jobs").select("id").is_("period", "null")
+            .gte("created_at", "2026-01-01T00:00:00+00:00").lte("created_at", "2026-01-14T23:59:59.999999+00:00")
+            .execute()
+        )
+        self.assertEqual(ids(window), ["2"])
+        # NULL never satisfies a comparison.
+        self.assertEqual(ids(db.table("jobs").select("id").gt("revenue", 50).execute()), ["1", "2"])
+        self.assertEqual(ids(db.table("jobs").select("id").neq("period", "p1").execute()), [])
+
+    def test_select_projects_orders_and_limits(self):
+        db = StubSupabase({"jobs": _jobs()})
+        resp = db.table("jobs").select("id, revenue", count="exact").order("revenue", desc=True).limit(2).execute()
+        # Postgres default: NULLs first when descending.
+        self.assertEqual(resp.data, [{"id": "3", "revenue": None}, {"id": "2", "revenue": 300}])
+        self.assertEqual(resp.count, 3)
+        resp = db.table("jobs").select("*").order("upsell").order("created_at", desc=True).range(1, 2).execute()
+        self.assertEqual([r["id"] for r in resp.data], ["3", "1"])
+
+    def test_writes(self):
+        db = StubSupabase()
+        inserted = db.table("personnel").insert([{"job": "j1", "tech": "a"}, {"job": "j1", "tech": "b"}]).execute()
+        self.assertTrue(all(r["id"] for r in inserted.data))
+
+        db.table("state").upsert({"job": "j1", "kind": "x", "n": 1}, on_conflict="job,kind").execute()
+        db.table("state").upsert(
+            [{"job": "j1", "kind": "x", "n": 2}, {"job": "j1", "kind": "y", "n": 1}], on_conflict="job,kind"
+        ).execute()
+        db.table("state").upsert({"job": "j1", "kind": "y", "n": 9}, on_conflict="job,kind", ignore_duplicates=True).execute()
+        self.assertEqual(sorted((r["kind"], r["n"]) for r in db.tables["state"]), [("x", 2), ("y", 1)])
+
+        updated = db.table("personnel").update({"onsite": 30}).eq("tech", "a").execute()
+        self.assertEqual([r["tech"] for r in updated.data], ["a"])
+        deleted = db.table("personnel").delete().eq("job", "j1").eq("tech", "b").execute()
+        self.assertEqual([r["tech"] for r in deleted.data], ["b"])
+        self.assertEqual(db.tables["personnel"], [{"job": "j1", "tech": "a", "id": inserted.data[0]["id"], "onsite": 30}])
+
+    def test_rpc_runs_migration_functions(self):
+        db = StubSupabase({"products": [{"id": "P1", "name": "a", "cost_price": 1, "markup_percentage": 10}]})
+        resp = db.rpc(
+            "bulk_update_product_pricing",
+            {"updates": [{"id": "P1", "cost_price": 2, "markup_percentage": 20}, {"id": "P9", "cost_price": 1, "markup_percentage": 1}]},
+        ).execute()
+        self.assertEqual(resp.data, [{"id": "P1"}])
+        self.assertEqual(db.tables["products"], [{"id": "P1", "name": "a", "cost_price": 2, "markup_percentage": 20}])
+        with self.assertRaises(StubRpcError) as ctx:
+            db.rpc("no_such_function", {}).execute()
+        self.assertEqual(ctx.exception.code, "PGRST202")
+        self.assertEqual(dict(db.calls), {"rpc bulk_update_product_pricing": 1, "rpc no_such_function": 1})
+
+    def test_returned_rows_are_copies(self):
+        db = StubSupabase({"jobs": _jobs()})
+        db.table("jobs").select("*").eq("id", "1").execute().data[0]["revenue"] = 0
+        self.assertEqual(db.tables["jobs"][0]["revenue"], 100)
+
+    def test_async_client_shares_tables(self):
+        tables = {"jobs": _jobs()}
+        sync_db, async_db = StubSupabase(tables), AsyncStubSupabase(tables)
+        sync_db.table("jobs").update({"revenue": 1}).eq("id", "2").execute()
+        resp = asyncio.run(async_db.table("jobs").select("revenue").eq("id", "2").execute())
+        self.assertEqual(resp.data, [{"revenue": 1}])
+
+
+class TestStubStorageAndAuth(unittest.TestCase):
+    def test_storage_upload_list_remove(self):
+        db = StubSupabase()
+        bucket = db.storage.from_("diagrams")
+        bucket.upload("u1/d1/blueprint.png", b"png")
+        with self.assertRaises(StubStorageError):
+            bucket.upload("u1/d1/blueprint.png", b"png2")
+        bucket.upload("u1/d1/blueprint.png", b"png2", {"content-type": "image/png", "upsert": "true"})
+        bucket.upload("u1/d1/thumbnail.png", b"t")
+        self.assertEqual(db.buckets["diagrams"]["u1/d1/blueprint.png"], b"png2")
+        self.assertEqual(bucket.list("u1/d1"), [{"name": "blueprint.png"}, {"name": "thumbnail.png"}])
+        self.assertTrue(bucket.get_public_url("u1/d1/thumbnail.png").endswith("/object/public/diagrams/u1/d1/thumbnail.png"))
+        bucket.remove(["u1/d1/blueprint.png"])
+        self.assertEqual(bucket.list("u1/d1"), [{"name": "thumbnail.png"}])
+
+    def test_list_users_pages(self):
+        db = StubSupabase(users=[{"id": str(i), "email": f"u{i}@example.com"} for i in range(5)])
+        self.assertEqual([u.id for u in db.auth.admin.list_users(page=2, per_page=2)], ["2", "3"])
+        self.assertEqual(len(db.auth.admin.list_users()), 5)
+
+
+class TestStubRoundTrips(unittest.TestCase):
+    def test_round_trips_counted_by_op_and_table(self):
+        db = StubSupabase({"jobs": _jobs()})
+        db.table("jobs").select("id").execute()
+        db.table("jobs").update({"revenue": 0}).eq("id", "1").execute()
+        db.storage.from_("diagrams").upload("a.png", b"")
+        db.storage.from_("diagrams").get_public_url("a.png")
+        self.assertEqual(db.round_trips, 3)
+        self.assertEqual(
+            dict(db.calls), {"select jobs": 1, "update jobs": 1, "upload storage:diagrams": 1}
+        )
+        db.reset_stats()
+        self.assertEqual((db.round_trips, dict(db.calls)), (0, {}))
+
+    def test_per_call_latency(self):
+        seen = []
+
+        def latency(op, table):
+            seen.append((op, table))
+            return 0.0
+
+        db = StubSupabase({"jobs": _jobs()}, latency=latency)
+        db.table("jobs").select("id").execute()
+        db.table("jobs").delete().eq("id", "3").execute()
+        self.assertEqual(seen, [("select", "jobs"), ("delete", "jobs")])
+
+    def test_async_latency_does_not_block_the_event_loop(self):
+        db = AsyncStubSupabase({"jobs": _jobs()}, latency=0.05)
+
+        async def run():
+            return await asyncio.gather(*(db.table("jobs").select("id").execute() for _ in range(10)))
+
+        started = time.perf_counter()
+        responses = asyncio.run(run())
+        self.assertLess(time.perf_counter() - started, 0.3)  # overlapped, not 10 x 50 ms
+        self.assertEqual([len(r.data) for r in responses], [3] * 10)
+        self.assertEqual(db.round_trips, 10)
+
+    def test_on_execute_sees_query_and_can_fail_it(self):
+        seen = []
+        db = StubSupabase({"jobs": _jobs()})
+        db.on_execute = seen.append
+        db.table("jobs").upsert({"id": "4"}).execute()
+        db.table("jobs").select("id").in_("id", ["1", "2"]).execute()
+        self.assertEqual((seen[0].op, seen[0].table, seen[0].values), ("upsert", "jobs", [{"id": "4"}]))
+        self.assertEqual(seen[1].filters[0][0], "in")
+
+        def fail(query):
+            raise RuntimeError("db down")
+
+        db.on_execute = fail
+        with self.assertRaises(RuntimeError):
+            db.table("jobs").delete().eq("id", "1").execute()
+        self.assertEqual(len(db.tables["jobs"]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
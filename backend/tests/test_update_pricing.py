@@ -0,0 +1,107 @@
+"""
+Tests for batched product pricing writes (app.pricing.update_product_pricing) against the stub's
+bulk_update_product_pricing function (docs/product_pricing_rpc_migration.sql).
+"""
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import pricing
+from app.pricing import update_product_pricing
+from benchmarks.stub_supabase import StubSupabase
+
+
+def _product(pid, cost=1.0, markup=30.0):
+    return {
+        "id": pid,
+        "name": pid,
+        "category": "fitting",
+        "thumbnail_url": "/assets/marley/gutter.svg",
+        "diagram_url": "/assets/marley/gutter.svg",
+        "cost_price": cost,
+        "markup_percentage": markup,
+        "unit": "each",
+    }
+
+
+class TestUpdateProductPricing(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubSupabase({"products": [_product(f"P-{i}") for i in range(5)]})
+        p = patch.object(pricing, "get_supabase", return_value=self.stub)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def _row(self, pid):
+        return next(r for r in self.stub.tables["products"] if r["id"] == pid)
+
+    def test_one_call_per_chunk_whatever_the_prices(self):
+        updates = [{"id": f"P-{i}", "cost_price": 9.0 + i, "markup_percentage": 50.0 + i} for i in range(5)]
+        with patch.dict(os.environ, {"UPDATE_PRICING_CHUNK_SIZE": "3"}):
+            progress = []
+            result = update_product_pricing(updates, lambda done, total: progress.append((done, total)))
+        self.assertEqual(result, {"success": True, "updated": 5, "not_found": []})
+        self.assertEqual(dict(self.stub.calls), {"rpc bulk_update_product_pricing": 2})
+        self.assertEqual(progress, [(3, 5), (5, 5)])
+        self.assertEqual((self._row("P-3")["cost_price"], self._row("P-3")["markup_percentage"]), (12.0, 53.0))
+        self.assertEqual((self._row("P-4")["cost_price"], self._row("P-4")["markup_percentage"]), (13.0, 54.0))
+
+    def test_falls_back_to_price_pair_updates_without_the_function(self):
+        del self.stub.functions["bulk_update_product_pricing"]
+        updates = [{"id": f"P-{i}", "cost_price": 9.0 if i < 4 else 20.0, "markup_percentage": 50.0} for i in range(5)]
+        updates.append({"id": "NOPE", "cost_price": 9.0, "markup_percentage": 50.0})
+        with patch.dict(os.environ, {"UPDATE_PRICING_CHUNK_SIZE": "3"}):
+            result = update_product_pricing(updates)
+        self.assertEqual(result, {"success": True, "updated": 5, "not_found": ["NOPE"]})
+        # The function is probed once; chunk 1 is all (9.0, 50.0), chunk 2 has both pairs.
+        self.assertEqual(dict(self.stub.calls), {"rpc bulk_update_product_pricing": 1, "update products": 3})
+        self.assertEqual(self._row("P-4")["cost_price"], 20.0)
+
+    def test_database_errors_are_not_swallowed(self):
+        def fail(query):
+            raise RuntimeError("connection reset")
+
+        self.stub.on_execute = fail
+        with self.assertRaises(RuntimeError):
+            update_product_pricing([{"id": "P-0", "cost_price": 2.0, "markup_percentage": 10.0}])
+
+    def test_concurrent_edits_survive_and_deleted_rows_stay_deleted(self):
+        def concurrent_writer(op, table):
+            # Runs just before the pricing write lands: a CSV import renames P-2, an admin deletes P-3.
+            if op == "rpc":
+                self._row("P-2")["name"] = "Renamed"
+                self.stub.tables["products"].remove(self._row("P-3"))
+            return 0.0
+
+        self.stub.latency = concurrent_writer
+        result = update_product_pricing([
+            {"id": "P-2", "cost_price": 4.0, "markup_percentage": 25.0},
+            {"id": "P-3", "cost_price": 4.0, "markup_percentage": 25.0},
+        ])
+        self.assertEqual(result, {"success": True, "updated": 1, "not_found": ["P-3"]})
+        self.assertEqual((self._row("P-2")["name"], self._row("P-2")["cost_price"]), ("Renamed", 4.0))
+        self.assertNotIn("P-3", [r["id"] for r in self.stub.tables["products"]])
+
+    def test_reports_unknown_ids_without_inserting(self):
+        result = update_product_pricing([
+            {"id": "P-1", "cost_price": 2.0, "markup_percentage": 10.0},
+            {"id": "NOPE", "cost_price": 2.0, "markup_percentage": 10.0},
+        ])
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual(result["not_found"], ["NOPE"])
+        self.assertEqual(len(self.stub.tables["products"]), 5)
+
+    def test_repeated_id_keeps_last_entry(self):
+        result = update_product_pricing([
+            {"id": "P-0", "cost_price": 2.0, "markup_percentage": 10.0},
+            {"id": "P-0", "cost_price": 3.0, "markup_percentage": 20.0},
+        ])
+        self.assertEqual(result["updated"], 1)
+        self.assertEqual((self._row("P-0")["cost_price"], self._row("P-0")["markup_percentage"]), (3.0, 20.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+-- Background jobs migration (in-process job runner: CSV import, update-pricing, job performance sync)
+-- Job records mirrored by backend/app/background_jobs.py so GET /api/jobs/{id} works after a restart
+-- and from any worker. Written with the service role key only.
+
+create table if not exists public.background_jobs (
+  id uuid primary key,
+  kind text not null,
+  status text not null check (status in ('queued', 'running', 'succeeded', 'failed')),
+  progress jsonb not null default '{}'::jsonb,
+  result jsonb null,
+  error text null,
+  created_by uuid null references auth.users(id),
+  created_at timestamptz not null default now(),
+  started_at timestamptz null,
+  finished_at timestamptz null,
+  updated_at timestamptz not null default now()
+);
+
+create index if not exists background_jobs_created_at_idx on public.background_jobs (created_at desc);
+
+alter table public.background_jobs enable row level security;
@@ -0,0 +1,23 @@
+-- Bulk product pricing migration (POST /api/products/update-pricing)
+-- One UPDATE per chunk of products, each row getting its own cost_price / markup_percentage, called by
+-- backend/app/pricing.py update_product_pricing via rpc(). Only the price columns are written, so
+-- concurrent edits to other columns survive and an id with no row (deleted meanwhile) is not re-created.
+-- Returns the ids actually updated. Executed with the service role key only.
+
+create or replace function public.bulk_update_product_pricing(updates jsonb)
+returns table (id text)
+language sql
+volatile
+security invoker
+set search_path = ''
+as $$
+  update public.products p
+     set cost_price = u.cost_price,
+         markup_percentage = u.markup_percentage
+    from jsonb_to_recordset(updates) as u(id text, cost_price numeric, markup_percentage numeric)
+   where p.id = u.id
+  returning p.id;
+$$;
+
+revoke execute on function public.bulk_update_product_pricing(jsonb) from anon, authenticated, public;
+grant execute on function public.bulk_update_product_pricing(jsonb) to service_role;
@@ -0,0 +1,22 @@
+-- ServiceM8 incremental sync state (job_performance sync)
+-- servicem8_sync_state: one row per sync; watermark = largest ServiceM8 edit_date seen by the last
+-- fully successful run ('YYYY-MM-DD HH:MM:SS', ServiceM8 account time).
+-- servicem8_job_sync_state: per-job fingerprint (edit_date, invoice amount, status) of the last
+-- successful sync, so unchanged jobs are skipped. Written with the service role key only.
+
+create table if not exists public.servicem8_sync_state (
+  sync_name text primary key,
+  watermark text null,
+  last_run_at timestamptz null,
+  last_result jsonb null
+);
+
+create table if not exists public.servicem8_job_sync_state (
+  servicem8_job_uuid uuid primary key,
+  fingerprint text not null,
+  edit_date text null,
+  synced_at timestamptz not null default now()
+);
+
+alter table public.servicem8_sync_state enable row level security;
+alter table public.servicem8_job_sync_state enable row level security;
@@ -124,6 +124,22 @@ function getAuthHeaders() {
   return authState.token ? { Authorization: `Bearer ${authState.token}` } : {};
 }
 
+/**
+ * Poll GET /api/jobs/{id} until a background job (update-pricing, CSV import, sync) finishes.
+ * Resolves with the job record; rejects on HTTP errors or after timeoutMs.
+ */
+async function waitForBackgroundJob(jobId, { intervalMs = 500, timeoutMs = 120000 } = {}) {
+  const deadline = Date.now() + timeoutMs;
+  while (true) {
+    const res = await fetch(`/api/jobs/${encodeURIComponent(jobId)}`, { headers: getAuthHeaders() });
+    if (!res.ok) throw new Error(`Job status request failed (${res.status})`);
+    const job = await res.json();
+    if (job.status === 'succeeded' || job.status === 'failed') return job;
+    if (Date.now() > deadline) throw new Error('Timed out waiting for background job');
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 function getAppConfig(options = {}) {
   const force = !!options.force;
   if (!force && appConfigPromise) return appConfigPromise;
@@ -1023,6 +1039,10 @@ let diagramToolbarApi = null;
 /** Last successful quote response for edit mode: { materials, materials_subtotal, labour_hours, labour_rate, labour_subtotal, total } */
 let lastQuoteData = null;
 
+/** Last /api/calculate-quote response body and its ETag; re-sent as If-None-Match so unchanged quotes return 304. */
+let lastCalculateQuoteResponse = null;
+let lastCalculateQuoteEtag = null;
+
 const quoteLocalOverrides = {
   markupPctByAssetId: Object.create(null),
   inferredQtyByAssetId: Object.create(null),
@@ -4235,9 +4255,22 @@ function initQuoteModal() {
         updateSavePricingButtonState();
         return;
       }
+      // Pricing is saved by a background job (202 + job id); wait for it to finish.
+      const job = data.job_id ? await waitForBackgroundJob(data.job_id) : null;
+      if (job && job.status !== 'succeeded') {
+        showMessage(job.error || 'Failed to save pricing', 'error');
+        savePricingBtn.disabled = false;
+        updateSavePricingButtonState();
+        return;
+      }
       hasPricingChanges = false;
       updateSavePricingButtonState();
-      showMessage('Pricing updated successfully.', 'success');
+      const notFound = job?.result?.not_found || [];
+      if (notFound.length > 0) {
+        showMessage(`Pricing updated; not found: ${notFound.join(', ')}`, 'error');
+      } else {
+        showMessage('Pricing updated successfully.', 'success');
+      }
     } catch (err) {
       console.error('Save pricing failed', err);
       showMessage(err.message || 'Failed to save pricing.', 'error');
@@ -5337,14 +5370,20 @@ async function calculateAndDisplayQuote() {
   }
 
   try {
+    const quoteHeaders = { 'Content-Type': 'application/json' };
+    if (lastCalculateQuoteEtag && lastCalculateQuoteResponse) quoteHeaders['If-None-Match'] = lastCalculateQuoteEtag;
     const res = await fetch('/api/calculate-quote', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
+      headers: quoteHeaders,
       body: JSON.stringify({ elements, labour_elements }),
     });
-    const data = await res.json().catch(() => ({}));
+    const data = res.status === 304 ? lastCalculateQuoteResponse : await res.json().catch(() => ({}));
+    if (res.ok) {
+      lastCalculateQuoteEtag = res.headers.get('ETag');
+      lastCalculateQuoteResponse = data;
+    }
 
-    if (!res.ok) {
+    if (!res.ok && res.status !== 304) {
       let msgText = 'Failed to calculate quote.';
       if (data.detail !== undefined) {
         if (typeof data.detail === 'string') msgText = data.detail;
@@ -7018,7 +7057,7 @@ async function fetchQuickQuoterCatalog() {
   renderQuickQuoterRows();
 
   try {
-    const resp = await fetch('/api/quick-quoter/catalog', { cache: 'no-store' });
+    const resp = await fetch('/api/quick-quoter/catalog', { cache: 'no-cache' });
     const data = await resp.json().catch(() => ({}));
     if (!resp.ok) {
       const message = typeof data?.detail === 'string'
@@ -14176,7 +14215,7 @@ async function ensurePanelProductsLoaded(options = {}) {
 /** Fetch products from backend GET /api/products (used when logged out or Supabase fails). */
 async function fetchPanelProductsFromApi() {
   try {
-    const res = await fetch('/api/products', { cache: 'no-store' });
+    const res = await fetch('/api/products', { cache: 'no-cache' });
     if (!res.ok) throw new Error(res.statusText);
     const data = await res.json();
     const list = (data.products || data) || [];
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """
 Run job_performance sync (Section 59.6/59.7): list Completed/Invoiced jobs from ServiceM8, resolve active quote, upsert job_performance (including invoiced_revenue_exc_gst and materials_cost).
-Usage (from project root): python scripts/run_job_performance_sync.py (requires backend deps; or run from backend/ with venv: python -c "from app.job_performance_sync import run_sync; print(run_sync())").
+Usage (from project root): python scripts/run_job_performance_sync.py [--full] (requires backend deps; or run from backend/ with venv: python -c "from app.job_performance_sync import run_sync; print(run_sync())").
 Requires: backend/.env with SUPABASE_*, SERVICEM8_*, and SERVICEM8_COMPANY_USER_ID or SERVICEM8_COMPANY_EMAIL.
 ServiceM8 must be connected (OAuth) for the company user so tokens exist.
+Incremental by default (only jobs edited since the last successful run); --full re-syncs every job.
 """
 import json
 import sys
@@ -22,6 +23,6 @@ sys.path.insert(0, str(backend_dir))
 from app.job_performance_sync import run_sync
 
 if __name__ == "__main__":
-    result = run_sync()
+    result = run_sync(full="--full" in sys.argv[1:])
     print(json.dumps(result, indent=2))
     sys.exit(0 if result.get("success") else 1)